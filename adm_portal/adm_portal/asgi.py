@@ -1,3 +1,35 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+from threading import Thread
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict
+
 from django.core.asgi import get_asgi_application
 
-application = get_asgi_application()
+start = perf_counter()
+django_application = get_asgi_application()
+getLogger(__name__).info(f"django setup: {(perf_counter() - start) * 1000:.1f} ms")
+
+# the templates and the interface need the apps to be loaded
+from common.templates import precompile_templates  # noqa: E402 isort:skip
+from interface import interface  # noqa: E402 isort:skip
+
+precompile_templates()
+
+# in a thread: the server may import this module from its event loop, where the database can't be used
+warmup = Thread(target=interface.warmup)
+warmup.start()
+warmup.join()
+
+# the async views call the clients (storage uploads, grading, emails) in the event loop's default executor
+# (`StorageClient.asave`, ...): `ASGI_THREADS` threads, instead of python's min(32, cpus + 4)
+clients_executor = ThreadPoolExecutor(max_workers=int(os.environ.get("ASGI_THREADS", "32")))
+
+
+async def application(
+    scope: Dict[str, Any], receive: Callable[[], Awaitable[Any]], send: Callable[[Any], Awaitable[None]]
+) -> None:
+    asyncio.get_running_loop().set_default_executor(clients_executor)
+    await django_application(scope, receive, send)
@@ -25,9 +25,11 @@ INSTALLED_APPS = [
     "applications",
     "common",
     "selection",
+    "storage_client",
 ]
 
 MIDDLEWARE = [
+    "common.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -35,6 +37,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "common.middleware.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "adm_portal.urls"
@@ -73,10 +76,15 @@ DATETIME_FORMAT = "Y/m/d H:i:s"
 
 STATIC_URL = "/static/"
 
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
 AUTHENTICATION_BACKENDS = ["users.backends.EmailModelBackend"]
 
 AUTH_USER_MODEL = "users.User"
 
+# the primary keys of the existing tables
+DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -84,3 +92,19 @@ LOGGING = {
     "root": {"handlers": ["console"], "level": "INFO"},
     "loggers": {"django": {"handlers": ["console"], "level": "INFO", "propagate": False}},
 }
+
+# bearer token of the monitoring requests to the `/ops/` routes (staff login otherwise)
+OPS_TOKEN: typing.Optional[str] = None
+
+# profiled requests (see `common.middleware.ProfilingMiddleware`):
+# this fraction of all the requests and the staff requests with this header
+PROFILING_SAMPLE_RATE = 0.0
+PROFILING_HEADER = "X-Profile"
+
+# store uploads once per content (see `storage_client.content_addressed`)
+STORAGE_CONTENT_ADDRESSED = False
+
+# Email outbox delivery (`deliver_emails` worker, see `email_client.outbox`)
+EMAIL_OUTBOX_WORKERS = 8
+# emails per second, per delivery client
+EMAIL_OUTBOX_RATE_LIMITS: typing.Dict[str, float] = {"ELASTIC": 40.0}
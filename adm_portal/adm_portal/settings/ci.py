@@ -16,6 +16,8 @@ DATABASES = {
 # Custom Settings
 EMAIL_CLIENT = "LOCAL"
 EMAIL_LOCAL_DIR = os.path.join(os.path.dirname(BASE_DIR), ".ci-mailbox")  # noqa: F405
+EMAIL_LOCAL_MODE = "MEMORY"
+EMAIL_OUTBOX_DELIVERY_CLIENT = "LOCAL"
 
 STORAGE_CLIENT = "LOCAL"
 STORAGE_LOCAL_DIR = os.path.join(os.path.dirname(BASE_DIR), ".ci-storage")  # noqa: F405
@@ -23,3 +25,15 @@ STORAGE_LOCAL_DIR = os.path.join(os.path.dirname(BASE_DIR), ".ci-storage")  # no
 FF_CLIENT = "MOCK"
 
 GRADER_CLIENT = "FAKE"
+
+# request metrics only when they are warnings (duplicate / repeated queries)
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "root": {"handlers": ["console"], "level": "INFO"},
+    "loggers": {
+        "django": {"handlers": ["console"], "level": "INFO", "propagate": False},
+        "common.middleware": {"level": "WARNING"},
+    },
+}
@@ -19,6 +19,8 @@ DATABASES = {
 # Custom Settings
 EMAIL_CLIENT = "LOCAL"
 EMAIL_LOCAL_DIR = os.path.join(os.path.dirname(BASE_DIR), ".mailbox")  # noqa: F405
+EMAIL_LOCAL_MODE = "FILES"
+EMAIL_OUTBOX_DELIVERY_CLIENT = "LOCAL"
 
 STORAGE_CLIENT = "LOCALSERVER"
 STORAGE_LOCAL_DIR = os.path.join(os.path.dirname(BASE_DIR), ".storage")  # noqa: F405
@@ -0,0 +1,49 @@
+from .base import *  # noqa: F401 F403
+
+ENV = "loadtest"
+
+
+# Django Settings
+SECRET_KEY = "LOADTEST-SECRET"
+
+DEBUG = False
+
+if "POSTGRES_NAME" in os.environ:  # noqa: F405
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql_psycopg2",
+            "NAME": os.environ["POSTGRES_NAME"],  # noqa: F405
+            "USER": os.environ["POSTGRES_USER"],  # noqa: F405
+            "PASSWORD": os.environ["POSTGRES_PASSWORD"],  # noqa: F405
+            "HOST": os.environ["POSTGRES_HOST"],  # noqa: F405
+            "PORT": os.environ["POSTGRES_PORT"],  # noqa: F405
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.path.join(BASE_DIR, "loadtest-db.sqlite3"),  # noqa: F405
+        }
+    }
+
+# shared by the gunicorn workers, as in prod (the candidate state cache must be invalidated across processes)
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "adm_portal_cache"}}
+
+
+# Custom Settings
+EMAIL_CLIENT = "LOCAL"
+# the load test reads the signup emails (confirmation urls) from here
+EMAIL_LOCAL_DIR = os.environ.get(  # noqa: F405
+    "ADM_LOADTEST_MAILBOX", os.path.join(os.path.dirname(BASE_DIR), ".loadtest-mailbox")  # noqa: F405
+)
+EMAIL_LOCAL_MODE = "FILES"
+EMAIL_OUTBOX_DELIVERY_CLIENT = "LOCAL"
+
+STORAGE_CLIENT = "LOCALSERVER"
+STORAGE_LOCAL_DIR = os.path.join(os.path.dirname(BASE_DIR), ".loadtest-storage")  # noqa: F405
+STORAGE_BUCKET = STORAGE_LOCAL_DIR
+
+FF_CLIENT = "DB"
+
+GRADER_CLIENT = "FAKE"
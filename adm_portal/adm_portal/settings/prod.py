@@ -22,13 +22,44 @@ DATABASES = {
     }
 }
 
+# compiled templates kept in memory by each worker (precompiled at startup, see `common.templates`)
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": ["templates", "users", "profiles", "candidate", "staff"],
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+            ],
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                )
+            ],
+        },
+    }
+]
+
+# shared by all workers (the candidate state cache must be invalidated across processes)
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "adm_portal_cache"}}
+
 # Custom Settings
-EMAIL_CLIENT = "ELASTIC"
+EMAIL_CLIENT = "OUTBOX"
+EMAIL_OUTBOX_DELIVERY_CLIENT = "ELASTIC"
 ELASTIC_EMAIL_API_KEY = os.environ["ELASTIC_EMAIL_API_KEY"]  # noqa: F405
 ELASTIC_EMAIL_SENDER = os.environ["ELASTIC_EMAIL_SENDER"]  # noqa: F405
 
 STORAGE_CLIENT = "S3"
 STORAGE_BUCKET = os.environ["S3_BUCKET_NAME"]  # noqa: F405
+STORAGE_S3_PART_SIZE = 8 * 1024 * 1024  # multipart uploads part size (bytes)
+STORAGE_S3_MAX_CONCURRENCY = 4  # parts uploaded at a time
 
 FF_CLIENT = "DB"
 
@@ -36,6 +67,8 @@ GRADER_CLIENT = "HTTP"
 GRADER_CLIENT_URL = os.environ["ADM_GRADER_URL"]  # noqa: F405
 GRADER_CLIENT_AUTH_TOKEN = os.environ["ADM_GRADER_AUTH_TOKEN"]  # noqa: F405
 
+OPS_TOKEN = os.environ.get("ADM_OPS_TOKEN")  # noqa: F405
+
 
 # Custom Integrations
 sentry_sdk.init(dsn=os.environ["SENTRY_URL"], integrations=[DjangoIntegration()], send_default_pii=True)  # noqa: F405
@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep
+from typing import Any, List
+
+from django.test import TestCase
+
+from common.metrics import client_metrics
+from email_client.elastic import ElasticCallMetrics
+from feature_flags_client import FeatureFlagsClient, MockFeatureFlagsClient
+from grader_client import GraderClient
+from interface import _Interface, elastic_metrics_hook
+
+
+class SlowInterface(_Interface):
+    def __init__(self) -> None:
+        super().__init__()
+        self.built: List[Any] = []
+
+    def new_feature_flag_client(self, client_id: Any = None) -> FeatureFlagsClient:  # type: ignore
+        sleep(0.05)
+        client = MockFeatureFlagsClient()
+        self.built.append(client)
+        return client
+
+    def new_grader_client(self, client_id: Any = None) -> GraderClient:  # type: ignore
+        raise Exception("grader down")
+
+
+class TestInterface(TestCase):
+    def test_concurrent_build(self) -> None:
+        interface = SlowInterface()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            clients = list(executor.map(lambda _: interface.feature_flag_client, range(8)))
+
+        self.assertEqual(len(interface.built), 1)
+        self.assertTrue(all(c is interface.built[0] for c in clients))
+
+    def test_warmup(self) -> None:
+        interface = SlowInterface()
+
+        with self.assertLogs("interface", level="INFO") as logs:
+            timings = interface.warmup()
+
+        self.assertEqual(sorted(timings), ["email", "flags", "grader", "storage"])
+        self.assertGreaterEqual(timings["flags"], 0.05)
+        self.assertIsNotNone(interface._storage_client)
+        self.assertIsNotNone(interface._email_client)
+        self.assertIs(interface._feature_flag_client, interface.built[0])
+        # built on first use
+        self.assertIsNone(interface._grader_client)
+        self.assertIn("can't build the grader client: grader down", logs.output[0])
+        self.assertIn('"total_ms"', logs.output[-1])
+
+    def test_elastic_metrics_hook(self) -> None:
+        client_metrics.reset()
+        elastic_metrics_hook(ElasticCallMetrics(template_id=2034, recipients=1, status="ok", latency=0.1))
+        elastic_metrics_hook(ElasticCallMetrics(template_id=2687, recipients=1000, status="http_429", latency=0.2))
+
+        text = client_metrics.render()
+        self.assertIn('adm_client_calls_total{client="elastic_api",method="ok"} 1', text)
+        self.assertIn('adm_client_errors_total{client="elastic_api",method="http_429"} 1', text)
@@ -0,0 +1,256 @@
+import json
+import os
+import re
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from adm_portal import urls
+from applications.models import Application, Submission, SubmissionTypes
+from common.storage_health import get_expected_keys
+from grader_client import GraderClientFakeScores
+from grader_client.client import SubmissionResult
+from interface import interface
+from profiles.models import Profile, ProfileGenders, ProfileTicketTypes
+from selection.models import Selection, SelectionDocument, SelectionLogs
+from selection.status import SelectionStatus
+from users.models import User, UserConfirmEmail, UserResetPassword
+
+# per route query budgets (see `TestQueryBudgets`)
+# after an intended change, rewrite it with: QUERY_BUDGETS_UPDATE=1 python manage.py test adm_portal.tests
+BUDGETS_PATH = os.path.join(os.path.dirname(__file__), "query_budgets.json")
+
+# route list -> who requests it (None: anonymous)
+ROUTE_GROUPS = [
+    (urls.account_routs, None),
+    (urls.staff_routes, "staff"),
+    (urls.ops_routes, "staff"),
+    (urls.candidate_routes, "candidate"),
+    (urls.confirmed_candidate_routes, "candidate"),
+    (urls.coc_candidate_routes, "candidate"),
+    (urls.scholarship_candidate_routes, "candidate"),
+    (urls.candidate_with_profile_routes, "candidate"),
+]
+
+
+class RouteRequest(NamedTuple):
+    # how a route is measured, `status` is its success response (the downloads redirect to the storage)
+    method: str = "get"
+    status: int = 200
+    as_user: Optional[str] = None  # instead of the route group's user
+
+
+# routes that aren't measured with a GET answering 200
+ROUTE_REQUESTS = {
+    "accounts-logout": RouteRequest(status=302),
+    "accounts-confirm-email": RouteRequest(status=302),
+    "accounts-send-confirmation-email": RouteRequest(as_user="candidate"),
+    "staff-submissions-download": RouteRequest(status=302),
+    "staff-submissions-download-feedback": RouteRequest(status=302),
+    "staff-selections-draw": RouteRequest(method="post", status=302),
+    "staff-selections-candidates-reject-draw": RouteRequest(method="post", status=302),
+    "staff-selections-select": RouteRequest(method="post", status=302),
+    "staff-reset-payment": RouteRequest(method="post", status=302),
+    "candidate-assignment-download": RouteRequest(status=302),
+    "candidate-submissions-upload": RouteRequest(method="post", status=302),
+    "candidate-coding-submission-download": RouteRequest(status=302),
+    "candidate-coding-feedback-download": RouteRequest(status=302),
+    "candidate-payment-document-download": RouteRequest(status=302),
+    "candidate-payment-proof-upload": RouteRequest(method="post", status=302),
+    "candidate-student-id-upload": RouteRequest(method="post", status=302),
+}
+
+# bulk staff actions, their queries grow with the number of candidates they process
+# (only checked against their budget, measured with the biggest data size)
+PER_CANDIDATE_ROUTES = ["staff-selections-draw", "staff-selections-select"]
+
+# the staff routes about a candidate in a given status (the first one, when they're requested)
+ROUTE_STATUSES = {
+    "staff-selections-candidates-reject-draw": SelectionStatus.DRAWN,
+    "staff-interview": SelectionStatus.INTERVIEW,
+    "staff-payment": SelectionStatus.SELECTED,
+    "staff-reset-payment": SelectionStatus.SELECTED,
+}
+
+STATUSES = [
+    SelectionStatus.PASSED_TEST,
+    SelectionStatus.DRAWN,
+    SelectionStatus.INTERVIEW,
+    SelectionStatus.SELECTED,
+    SelectionStatus.TO_BE_ACCEPTED,
+    SelectionStatus.ACCEPTED,
+    SelectionStatus.REJECTED,
+    SelectionStatus.NOT_SELECTED,
+]
+
+TICKET_TYPES = [ProfileTicketTypes.regular, ProfileTicketTypes.student, ProfileTicketTypes.company]
+
+
+def new_candidate(email: str, i: int) -> User:
+    # a candidate with everything (profile, application, submissions, selection, documents, logs)
+    user = User.objects.create(
+        email=email, email_confirmed=True, code_of_conduct_accepted=True, applying_for_scholarship=False
+    )
+    Profile.objects.create(
+        user=user,
+        full_name=f"Candidate {i}",
+        profession="Student",
+        gender=ProfileGenders.other,
+        ticket_type=TICKET_TYPES[i % 3],
+    )
+    application = Application.objects.create(user=user, coding_test_started_at=datetime.now() - timedelta(hours=1))
+    for submission_type in [
+        SubmissionTypes.coding_test,
+        SubmissionTypes.slu01,
+        SubmissionTypes.slu02,
+        SubmissionTypes.slu03,
+    ]:
+        for score in [60, 90]:
+            Submission.objects.create(
+                application=application,
+                submission_type=submission_type.uname,
+                score=score,
+                file_location=f"submissions/{i}.ipynb",
+                feedback_location=f"feedback/{i}.html",
+            )
+
+    selection = Selection.objects.create(
+        user=user,
+        status=STATUSES[i % len(STATUSES)],
+        draw_rank=i,
+        payment_value=250,
+        ticket_type=TICKET_TYPES[i % 3],
+        payment_due_date=datetime.now() + timedelta(days=7),
+    )
+    for doc_type in ["payment_proof", "student_id"]:
+        SelectionDocument.objects.create(selection=selection, file_location=f"docs/{i}.png", doc_type=doc_type)
+    for event in ["draw", "interview"]:
+        SelectionLogs.objects.create(selection=selection, event=event, message="")
+
+    return user
+
+
+class PassingGrader(GraderClientFakeScores):
+    # the uploads always pass (the fake scores are random)
+    def grade(self, *args: Any, **kwargs: Any) -> SubmissionResult:
+        return super().grade(*args, **kwargs)._replace(score=20)
+
+
+class TestQueryBudgets(TestCase):
+    # every route costs at most its budget, and the same number of queries whatever the amount of data
+    # (a count that grows with the data is an N+1)
+    sizes = [3, 12]
+
+    def setUp(self) -> None:
+        # a storage with the expected keys (storage health, assignment download) and the uploads
+        self.tmp = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(STORAGE_LOCAL_DIR=self.tmp.name, STORAGE_BUCKET=self.tmp.name)
+        self.settings_override.enable()
+        self.storage_client = interface._storage_client
+        interface._storage_client = None
+        for key in get_expected_keys():
+            interface.storage_client.save(key, b"content")
+
+        self.grader_client = interface._grader_client
+        interface._grader_client = PassingGrader()
+
+        interface.feature_flag_client.open_signups()
+        self.staff = User.objects.create_staff_user(email="staff@adm.com", password="staff")
+        self.candidate = new_candidate("candidate@adm.com", 3)
+        self.others: List[User] = []
+
+    def tearDown(self) -> None:
+        interface.feature_flag_client.close_signups()
+        interface._storage_client = self.storage_client
+        interface._grader_client = self.grader_client
+        self.settings_override.disable()
+        self.tmp.cleanup()
+
+    def add_candidates(self, n: int) -> None:
+        while len(self.others) < n:
+            self.others.append(new_candidate(f"other_{len(self.others)}@adm.com", len(self.others)))
+
+    def get_url(self, route: urls.Route, as_user: Optional[str]) -> str:
+        # route params are filled with the logged in candidate's data (or an other candidate's, for staff)
+        if as_user == "candidate":
+            user = self.candidate
+        elif route.name in ROUTE_STATUSES:
+            user = Selection.objects.filter(status=ROUTE_STATUSES[route.name]).order_by("id").first().user
+        else:
+            user = self.others[0]
+        values = {
+            "user_id": user.id,
+            # the reject draw route takes the selection id
+            "candidate_id": user.selection.id,
+            "submission_id": Submission.objects.filter(application__user=user, submission_type="slu01").first().id,
+            "submission_type": SubmissionTypes.slu01.uname,
+            "document_id": SelectionDocument.objects.filter(selection__user=user).first().id,
+        }
+        params = re.findall(r"<\w+:(\w+)>", route.route)
+        url = reverse(route.name, kwargs={p: values[p] for p in params})
+
+        # valid tokens / params
+        if route.name == "accounts-confirm-email":
+            unconfirmed = User.objects.create(email=f"unconfirmed_{User.objects.count()}@adm.com")
+            url += f"?token={UserConfirmEmail.objects.create(user=unconfirmed).token}"
+        elif route.name == "accounts-reset-password":
+            url += f"?token={UserResetPassword.objects.get_or_create(user=self.candidate)[0].token}"
+        elif route.name == "candidate-assignment-download":
+            url += f"?assignment_id={SubmissionTypes.slu01.uname}"
+        return url
+
+    def get_data(self, route: urls.Route) -> Dict[str, Any]:
+        # valid POST payloads
+        if route.name in ["candidate-submissions-upload"]:
+            return {"file": SimpleUploadedFile("slu01.ipynb", b"{}")}
+        if route.name in ["candidate-payment-proof-upload", "candidate-student-id-upload"]:
+            return {"file": SimpleUploadedFile("document.png", b"png")}
+        return {}
+
+    def count_queries(self) -> Dict[str, int]:
+        counts = {}
+        for routes, group_user in ROUTE_GROUPS:
+            for route in routes:
+                request = ROUTE_REQUESTS.get(route.name, RouteRequest())
+                as_user = request.as_user or group_user
+                url = self.get_url(route, as_user)
+                data = self.get_data(route)
+                client = Client()
+                if as_user is not None:
+                    client.force_login(self.staff if as_user == "staff" else self.candidate)
+                cache.clear()
+                with CaptureQueriesContext(connection) as ctx:
+                    resp = getattr(client, request.method)(url, data)
+                self.assertEqual(resp.status_code, request.status, f"{request.method.upper()} {url}")
+                counts[route.name] = len(ctx)
+        return counts
+
+    def test_query_budgets(self) -> None:
+        counts = []
+        for size in self.sizes:
+            self.add_candidates(size)
+            counts.append(self.count_queries())
+
+        if os.environ.get("QUERY_BUDGETS_UPDATE"):
+            with open(BUDGETS_PATH, "w") as f:
+                json.dump(counts[-1], f, indent=2, sort_keys=True)
+                f.write("\n")
+
+        with open(BUDGETS_PATH) as f:
+            budgets = json.load(f)
+
+        for name in counts[0]:
+            with self.subTest(route=name):
+                self.assertIn(name, budgets, "route without a query budget")
+                if name not in PER_CANDIDATE_ROUTES:
+                    self.assertEqual(
+                        [c[name] for c in counts], [counts[0][name]] * len(counts), "query count grows with data size"
+                    )
+                self.assertLessEqual(counts[-1][name], budgets[name], "over the query budget")
@@ -1,13 +1,9 @@
-import json
-import time
 from typing import Any, Callable, NamedTuple
 
 from django.contrib import admin
-from django.contrib.auth import authenticate
-from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.http import HttpRequest, HttpResponse
 from django.shortcuts import redirect
 from django.urls import path
-from django.views.decorators.csrf import csrf_exempt
 
 from candidate.application_views import (
     candidate_assignment_download_view,
@@ -41,7 +37,9 @@ from staff.candidates_views import staff_candidate_view, staff_candidates_view
 from staff.events_view import staff_events_view
 from staff.exports_views import export_candidates_view, staff_exports_view
 from staff.interview_views import staff_interview_view, staff_interviews_view
+from staff.ops_views import ops_metrics_view, ops_storage_health_view
 from staff.payment_views import reset_payment_view, staff_payment_view, staff_payments_view
+from staff.profiling_views import staff_profiling_view
 from staff.selection_views import (
     staff_draw_candidates_view,
     staff_reject_selection_view,
@@ -56,6 +54,7 @@ from users.decorators import (
     requires_candidate_profile,
     requires_scholarship_decision,
     requires_staff_login,
+    requires_staff_login_or_ops_token,
 )
 from users.views import (
     confirm_email_view,
@@ -128,6 +127,12 @@ staff_routes = [
     Route(route="staff/payments/<int:user_id>/reset", view=reset_payment_view, name="staff-reset-payment"),
     Route(route="staff/exports", view=staff_exports_view, name="staff-exports"),
     Route(route="staff/export-candidates", view=export_candidates_view, name="staff-export-candidates"),
+    Route(route="staff/profiling", view=staff_profiling_view, name="staff-profiling"),
+]
+
+ops_routes = [
+    Route(route="ops/storage-health", view=ops_storage_health_view, name="ops-storage-health"),
+    Route(route="ops/metrics", view=ops_metrics_view, name="ops-metrics"),
 ]
 
 candidate_routes = [
@@ -201,23 +206,6 @@ candidate_with_profile_routes = [
 ]
 
 
-@csrf_exempt
-def sleep(request: HttpRequest, duration: int) -> HttpResponse:
-    if request.method != "POST":
-        return JsonResponse(status=404, data={})
-
-    payload = json.loads(request.body.decode("utf-8"))
-    user = authenticate(request, email=payload.get("email", ""), password=payload.get("password", ""))
-    try:
-        if not user.is_admin:
-            raise Exception
-    except Exception:
-        return JsonResponse(status=404, data={})
-
-    time.sleep(duration)
-    return JsonResponse(status=200, data={"duration": duration})
-
-
 urlpatterns = [
     path("", lambda req: redirect("account/login")),
     # admin
@@ -226,11 +214,12 @@ urlpatterns = [
     *[path(r.route, r.view, name=r.name) for r in account_routs],
     # staff
     *[path(r.route, requires_staff_login(r.view), name=r.name) for r in staff_routes],
+    # ops
+    *[path(r.route, requires_staff_login_or_ops_token(r.view), name=r.name) for r in ops_routes],
     # candidate
     *[path(r.route, requires_candidate_login(r.view), name=r.name) for r in candidate_routes],
     *[path(r.route, requires_candidate_confirmed(r.view), name=r.name) for r in confirmed_candidate_routes],
     *[path(r.route, requires_candidate_coc(r.view), name=r.name) for r in coc_candidate_routes],
     *[path(r.route, requires_scholarship_decision(r.view), name=r.name) for r in scholarship_candidate_routes],
     *[path(r.route, requires_candidate_profile(r.view), name=r.name) for r in candidate_with_profile_routes],
-    path("loadtest/sleep/<int:duration>", sleep, name="loadtest-sleep"),
 ]
@@ -1,3 +1,15 @@
+from logging import getLogger
+from time import perf_counter
+
 from django.core.wsgi import get_wsgi_application
 
+start = perf_counter()
 application = get_wsgi_application()
+getLogger(__name__).info(f"django setup: {(perf_counter() - start) * 1000:.1f} ms")
+
+# the templates and the interface need the apps to be loaded
+from common.templates import precompile_templates  # noqa: E402 isort:skip
+from interface import interface  # noqa: E402 isort:skip
+
+precompile_templates()
+interface.warmup()
@@ -1,10 +1,12 @@
 from datetime import datetime, timedelta
 from enum import Enum
 from logging import getLogger
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from django.db import models
+from django.db import models, transaction
 
+from common.cache import bump_data_version, invalidate_candidate_state
+from email_client import BulkEmailRecipient
 from interface import interface
 from profiles.models import Profile
 
@@ -40,29 +42,43 @@ class Domain:
         return Domain.get_application_detailed_status(application)["application"]
 
     @staticmethod
-    def get_application_detailed_status(application: Application) -> Dict[str, Status]:
+    def get_application_detailed_status(
+        application: Application, *, best_scores: Optional[Dict[str, Optional[int]]] = None
+    ) -> Dict[str, Status]:
+        # best_scores (by sub type uname) can be provided to avoid querying them
         sub_type_status = {}
         for sub_type in SubmissionTypes.all:
-            sub_type_status[sub_type.uname] = Domain.get_sub_type_status(application, sub_type)
+            sub_type_status[sub_type.uname] = Domain.get_sub_type_status(
+                application, sub_type, best_scores=best_scores
+            )
 
-        application_status = None
+        return {"application": Domain.get_combined_status(sub_type_status), **sub_type_status}
+
+    @staticmethod
+    def get_combined_status(sub_type_status: Dict[str, SubmissionStatus]) -> ApplicationStatus:
+        # the application status, from the status of each submission type
         if any((s == SubmissionStatus.failed for _, s in sub_type_status.items())):
-            application_status = ApplicationStatus.failed
+            return ApplicationStatus.failed
         elif any((s == SubmissionStatus.ongoing for _, s in sub_type_status.items())):
-            application_status = ApplicationStatus.ongoing
+            return ApplicationStatus.ongoing
         elif all((s == SubmissionStatus.passed for _, s in sub_type_status.items())):
-            application_status = ApplicationStatus.passed
+            return ApplicationStatus.passed
         elif all((s == SubmissionStatus.not_started for _, s in sub_type_status.items())):
-            application_status = ApplicationStatus.not_started
+            return ApplicationStatus.not_started
         else:
             # some tests passed, some not started
-            application_status = ApplicationStatus.ongoing
-
-        return {"application": application_status, **sub_type_status}
+            return ApplicationStatus.ongoing
 
     @staticmethod
-    def get_sub_type_status(application: Application, sub_type: SubmissionType) -> SubmissionStatus:
-        if Domain.has_positive_score(application, sub_type):
+    def get_sub_type_status(
+        application: Application, sub_type: SubmissionType, *, best_scores: Optional[Dict[str, Optional[int]]] = None
+    ) -> SubmissionStatus:
+        if best_scores is not None:
+            has_positive_score = Domain.is_positive_score(sub_type, best_scores.get(sub_type.uname))
+        else:
+            has_positive_score = Domain.has_positive_score(application, sub_type)
+
+        if has_positive_score:
             return SubmissionStatus.passed
 
         dt_now = datetime.now()
@@ -110,9 +126,25 @@ class Domain:
             models.Max("score")
         )["score__max"]
 
+    @staticmethod
+    def get_best_scores(application: Application) -> Dict[str, Optional[int]]:
+        best_scores: Dict[str, Optional[int]] = {sub_type.uname: None for sub_type in SubmissionTypes.all}
+        rows = (
+            Submission.objects.filter(application=application)
+            .values("submission_type")
+            .annotate(best_score=models.Max("score"))
+            .order_by()
+        )
+        for row in rows:
+            best_scores[row["submission_type"]] = row["best_score"]
+        return best_scores
+
     @staticmethod
     def has_positive_score(application: Application, sub_type: SubmissionType) -> bool:
-        score = Domain.get_best_score(application, sub_type)
+        return Domain.is_positive_score(sub_type, Domain.get_best_score(application, sub_type))
+
+    @staticmethod
+    def is_positive_score(sub_type: SubmissionType, score: Optional[int]) -> bool:
         return score is not None and score >= sub_type.pass_score
 
     @staticmethod
@@ -148,11 +180,37 @@ class Domain:
         sub.submission_type = sub_type.uname
         sub.save()
 
+        invalidate_candidate_state(application.user_id)
+        bump_data_version()
+
     @staticmethod
     def application_over(application: Application) -> None:
         if application.application_over_email_sent is not None:
             raise DomainException("email was already sent")
 
+        template, recipient = Domain._application_over(application)
+        interface.email_client.send_bulk(template, [recipient])
+
+    @staticmethod
+    def applications_over(applications: Iterable[Application]) -> int:
+        # `application_over` for every application whose email wasn't sent yet, one `send_bulk` per template
+        # returns the number of sent emails
+        recipients: Dict[str, List[BulkEmailRecipient]] = {}
+        with transaction.atomic():
+            for application in applications:
+                if application.application_over_email_sent is not None:
+                    continue
+                template, recipient = Domain._application_over(application)
+                recipients.setdefault(template, []).append(recipient)
+
+            for template, template_recipients in recipients.items():
+                interface.email_client.send_bulk(template, template_recipients)
+
+        return sum(len(r) for r in recipients.values())
+
+    @staticmethod
+    def _application_over(application: Application) -> Tuple[str, BulkEmailRecipient]:
+        # marks the application, returns the email to send
         try:
             to_name = application.user.profile.name
         except Profile.DoesNotExist:
@@ -160,14 +218,21 @@ class Domain:
 
         status = Domain.get_application_status(application)
         if status == ApplicationStatus.passed:
-            interface.email_client.send_application_is_over_passed(to_email=application.user.email, to_name=to_name)
+            template = "send_application_is_over_passed"
             application.application_over_email_sent = "passed"
-            application.save()
-
         else:
-            interface.email_client.send_application_is_over_failed(to_email=application.user.email, to_name=to_name)
+            template = "send_application_is_over_failed"
             application.application_over_email_sent = "failed"
-            application.save()
+        application.save()
+
+        return (
+            template,
+            BulkEmailRecipient(
+                to_email=application.user.email,
+                merge={"to_name": to_name},
+                business_key=f"application:{application.id}",
+            ),
+        )
 
     @staticmethod
     def get_candidate_release_zip(sub_type_uname: str) -> str:
@@ -0,0 +1,23 @@
+# Generated by Django 3.0.14 on 2026-10-19 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("applications", "0006_application_application_over_email_sent")]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="submission",
+            index=models.Index(fields=["-created_at", "-id"], name="submission_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="submission",
+            index=models.Index(fields=["submission_type", "-created_at", "-id"], name="submission_type_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="submission",
+            index=models.Index(fields=["application", "-created_at", "-id"], name="submission_app_created_idx"),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 3.0.14 on 2026-10-19 18:12
+
+from typing import Any, Dict, List
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# `SubmissionTypes` pass scores when the counts were added
+PASS_SCORES = {"coding_test": 16, "slu01": 16, "slu02": 16, "slu03": 16}
+
+
+def count_applications(apps: Any, schema_editor: Any) -> None:
+    # `StatusCounts.rebuild` with the models of this migration
+    Application = apps.get_model("applications", "Application")
+    Submission = apps.get_model("applications", "Submission")
+    ApplicationStatusCount = apps.get_model("applications", "ApplicationStatusCount")
+    ApplicationStatusCountKey = apps.get_model("applications", "ApplicationStatusCountKey")
+
+    passed_q = models.Q()
+    for uname, pass_score in PASS_SCORES.items():
+        passed_q |= models.Q(submission_type=uname, score__gte=pass_score)
+
+    passed: Dict[int, List[str]] = {}
+    for application_id, submission_type in (
+        Submission.objects.filter(passed_q).values_list("application_id", "submission_type").distinct()
+    ):
+        passed.setdefault(application_id, []).append(submission_type)
+
+    keys = []
+    counts: Dict[str, int] = {}
+    for application_id, coding_test_started_at in Application.objects.values_list("id", "coding_test_started_at"):
+        started = "started" if coding_test_started_at is not None else "not_started"
+        key = f"{','.join(sorted(set(passed.get(application_id, []))))}|{started}"
+        keys.append(ApplicationStatusCountKey(application_id=application_id, key=key))
+        counts[key] = counts.get(key, 0) + 1
+
+    ApplicationStatusCountKey.objects.bulk_create(keys, batch_size=1000)
+    ApplicationStatusCount.objects.bulk_create([ApplicationStatusCount(key=k, count=n) for k, n in counts.items()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("applications", "0007_submission_indexes")]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApplicationStatusCount",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("key", models.CharField(max_length=100, unique=True)),
+                ("count", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ApplicationStatusCountKey",
+            fields=[
+                (
+                    "application",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="status_count_key",
+                        serialize=False,
+                        to="applications.Application",
+                    ),
+                ),
+                ("key", models.CharField(max_length=100)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="application",
+            name="coding_test_started_at",
+            field=models.DateTimeField(db_index=True, default=None, null=True),
+        ),
+        migrations.RunPython(count_applications, migrations.RunPython.noop),
+    ]
@@ -38,6 +38,14 @@ class Submission(models.Model):
 
     objects = models.Manager()
 
+    class Meta:
+        # support the staff submissions browser (keyset pagination on `created_at`, see `applications.queries`)
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="submission_created_idx"),
+            models.Index(fields=["submission_type", "-created_at", "-id"], name="submission_type_created_idx"),
+            models.Index(fields=["application", "-created_at", "-id"], name="submission_app_created_idx"),
+        ]
+
 
 class SubmissionsException(Exception):
     detail = "submission error"
@@ -58,7 +66,7 @@ class Application(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     # coding test ##########################################################
-    coding_test_started_at = models.DateTimeField(null=True, default=None)
+    coding_test_started_at = models.DateTimeField(null=True, default=None, db_index=True)
 
     # stores data about sent email
     # None -> email not sent
@@ -69,3 +77,27 @@ class Application(models.Model):
     )
 
     objects = models.Manager()
+
+
+class ApplicationStatusCount(models.Model):
+    # number of applications per `key`: the submission types they passed and whether they started the coding test
+    # kept up to date as applications and submissions are saved (see `applications.status_counts`)
+    key = models.CharField(null=False, max_length=100, unique=True)
+    count = models.IntegerField(default=0, null=False)
+
+    objects = models.Manager()
+
+
+class ApplicationStatusCountKey(models.Model):
+    # the `ApplicationStatusCount` an application is counted in (applications without one aren't counted)
+    # not an `Application` field: saving an application would write back the key it was loaded with
+    application = models.OneToOneField(
+        "applications.Application", on_delete=models.CASCADE, primary_key=True, related_name="status_count_key"
+    )
+    key = models.CharField(null=False, max_length=100)
+
+    objects = models.Manager()
+
+
+# the signal receivers that keep the `ApplicationStatusCount`s up to date
+from . import status_counts  # noqa: E402 F401 isort:skip
@@ -0,0 +1,285 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from django.db.models import Case, CharField, Count, Exists, OuterRef, Q, Value, When
+
+from custom_typing.queryset import QuerySet
+from interface import interface
+
+from .domain import Domain, Status
+from .models import Application, ApplicationStatusCount, Submission, SubmissionType, SubmissionTypes
+from .status_counts import StatusCounts
+
+SubmissionQuerySet = QuerySet[Submission]
+
+
+class SubmissionsQueriesException(Exception):
+    pass
+
+
+class SubmissionsFilter(NamedTuple):
+    submission_type: Optional[str] = None
+    min_score: Optional[int] = None
+    max_score: Optional[int] = None
+    created_from: Optional[datetime] = None  # inclusive
+    created_to: Optional[datetime] = None  # exclusive
+    user_uuid: Optional[str] = None
+    user_email: Optional[str] = None
+
+
+class SubmissionsPage(NamedTuple):
+    submissions: List[Dict[str, Any]]
+    next_cursor: Optional[str]
+
+
+class SubmissionsQueries:
+    # pages are ordered by (-created_at, -id) and walked with a keyset cursor (no OFFSET),
+    # so every page is a bounded index range scan regardless of how many submissions exist
+    default_page_size = 25
+    max_page_size = 100
+
+    values = (
+        "id",
+        "created_at",
+        "application__user__id",
+        "application__user__email",
+        "application__user__uuid",
+        "submission_type",
+        "score",
+    )
+
+    @staticmethod
+    def filter(f: SubmissionsFilter) -> SubmissionQuerySet:
+        q = Submission.objects.all()
+
+        if f.submission_type is not None:
+            q = q.filter(submission_type=f.submission_type)
+        if f.min_score is not None:
+            q = q.filter(score__gte=f.min_score)
+        if f.max_score is not None:
+            q = q.filter(score__lte=f.max_score)
+        if f.created_from is not None:
+            q = q.filter(created_at__gte=f.created_from)
+        if f.created_to is not None:
+            q = q.filter(created_at__lt=f.created_to)
+        if f.user_uuid is not None:
+            q = q.filter(application__user__uuid=f.user_uuid)
+        if f.user_email is not None:
+            q = q.filter(application__user__email=f.user_email)
+
+        return q
+
+    @staticmethod
+    def browse(
+        f: SubmissionsFilter, *, cursor: Optional[str] = None, page_size: Optional[int] = None
+    ) -> SubmissionsPage:
+        page_size = min(page_size or SubmissionsQueries.default_page_size, SubmissionsQueries.max_page_size)
+
+        q = SubmissionsQueries.filter(f)
+        if cursor is not None:
+            created_at, sub_id = SubmissionsQueries.decode_cursor(cursor)
+            q = q.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=sub_id))
+
+        # fetch one extra row to know whether there is a next page
+        rows = list(q.order_by("-created_at", "-id").values(*SubmissionsQueries.values)[: page_size + 1])
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = SubmissionsQueries.encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+        return SubmissionsPage(submissions=rows, next_cursor=next_cursor)
+
+    @staticmethod
+    def encode_cursor(created_at: datetime, sub_id: int) -> str:
+        return f"{created_at.isoformat()}_{sub_id}"
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        try:
+            created_at_s, sub_id_s = cursor.rsplit("_", 1)
+            return datetime.fromisoformat(created_at_s), int(sub_id_s)
+        except ValueError:
+            raise SubmissionsQueriesException(f"invalid cursor `{cursor}`")
+
+
+ApplicationQuerySet = QuerySet[Application]
+
+
+class ApplicationsPage(NamedTuple):
+    applications: List[Dict[str, Any]]
+    next_cursor: Optional[str]
+
+
+class ApplicationsQueries:
+    # application / submission type status computed by the database (mirrors `Domain.get_application_detailed_status`)
+    # annotations are named `application_status` and `<sub_type.uname>_status` and hold `Status.<x>.name` values
+    default_page_size = 50
+    max_page_size = 200
+
+    @staticmethod
+    def status_annotation_key(sub_type: SubmissionType) -> str:
+        return f"{sub_type.uname}_status"
+
+    @staticmethod
+    def with_status(q: ApplicationQuerySet) -> ApplicationQuerySet:
+        dt_now = datetime.now()
+        opening_date = interface.feature_flag_client.get_applications_opening_date()
+        closing_date = interface.feature_flag_client.get_applications_closing_date()
+        coding_test_duration = timedelta(minutes=interface.feature_flag_client.get_coding_test_duration())
+
+        passed_annotations = {
+            f"{sub_type.uname}_passed": Exists(
+                Submission.objects.filter(
+                    application=OuterRef("pk"), submission_type=sub_type.uname, score__gte=sub_type.pass_score
+                )
+            )
+            for sub_type in SubmissionTypes.all
+        }
+        q = q.annotate(**passed_annotations)
+
+        status_annotations = {}
+        for sub_type in SubmissionTypes.all:
+            passed = When(**{f"{sub_type.uname}_passed": True}, then=Value(Status.passed.name))
+
+            if sub_type == SubmissionTypes.coding_test:
+                # coding test starts when the candidate starts it and ends `coding_test_duration` after that
+                # if the candidate never started it, it ends when applications close
+                whens = [
+                    passed,
+                    When(
+                        coding_test_started_at__isnull=False,
+                        coding_test_started_at__lt=dt_now - coding_test_duration,
+                        then=Value(Status.failed.name),
+                    ),
+                ]
+                if closing_date < dt_now:
+                    whens.append(When(coding_test_started_at__isnull=True, then=Value(Status.failed.name)))
+                whens.append(
+                    When(
+                        Q(coding_test_started_at__isnull=True) | Q(coding_test_started_at__gt=dt_now),
+                        then=Value(Status.not_started.name),
+                    )
+                )
+                default = Status.ongoing.name
+
+            else:
+                # other submission types only depend on the applications opening / closing dates
+                whens = [passed]
+                if closing_date < dt_now:
+                    default = Status.failed.name
+                elif opening_date > dt_now:
+                    default = Status.not_started.name
+                else:
+                    default = Status.ongoing.name
+
+            status_annotations[ApplicationsQueries.status_annotation_key(sub_type)] = Case(
+                *whens, default=Value(default), output_field=CharField()
+            )
+        q = q.annotate(**status_annotations)
+
+        def any_status(s: Status) -> Q:
+            q_ = Q()
+            for sub_type in SubmissionTypes.all:
+                q_ |= Q(**{ApplicationsQueries.status_annotation_key(sub_type): s.name})
+            return q_
+
+        def all_status(s: Status) -> Q:
+            return Q(**{ApplicationsQueries.status_annotation_key(t): s.name for t in SubmissionTypes.all})
+
+        return q.annotate(
+            application_status=Case(
+                When(any_status(Status.failed), then=Value(Status.failed.name)),
+                When(any_status(Status.ongoing), then=Value(Status.ongoing.name)),
+                When(all_status(Status.passed), then=Value(Status.passed.name)),
+                When(all_status(Status.not_started), then=Value(Status.not_started.name)),
+                # some tests passed, some not started
+                default=Value(Status.ongoing.name),
+                output_field=CharField(),
+            )
+        )
+
+    @staticmethod
+    def status_summary(q: ApplicationQuerySet) -> Dict[str, Dict[str, int]]:
+        # single query, counts by status for the application and for each submission type
+        keys = ["application_status", *[ApplicationsQueries.status_annotation_key(t) for t in SubmissionTypes.all]]
+        counts = ApplicationsQueries.with_status(q).aggregate(
+            **{f"{k}__{s.name}": Count("id", filter=Q(**{k: s.name})) for k in keys for s in Status}
+        )
+
+        summary = {"application": {s.name: counts[f"application_status__{s.name}"] for s in Status}}
+        for sub_type in SubmissionTypes.all:
+            key = ApplicationsQueries.status_annotation_key(sub_type)
+            summary[sub_type.uname] = {s.name: counts[f"{key}__{s.name}"] for s in Status}
+
+        return summary
+
+    @staticmethod
+    def cohort_status_summary() -> Dict[str, Dict[str, int]]:
+        # `status_summary` of every application, without scanning them: the status counts (see `StatusCounts`)
+        # give the statuses of the applications whose coding test isn't ongoing, the others (started within the
+        # coding test duration, an index range) get `status_summary`ed, 3 queries whatever the number of applications
+        dt_now = datetime.now()
+        opening_date = interface.feature_flag_client.get_applications_opening_date()
+        closing_date = interface.feature_flag_client.get_applications_closing_date()
+        coding_test_duration = timedelta(minutes=interface.feature_flag_client.get_coding_test_duration())
+
+        counts = dict(ApplicationStatusCount.objects.filter(count__gt=0).values_list("key", "count"))
+        recent = Application.objects.filter(
+            coding_test_started_at__gte=dt_now - coding_test_duration, status_count_key__isnull=False
+        )
+        for key, n in recent.values_list("status_count_key__key").annotate(n=Count("pk")).order_by():
+            counts[key] -= n
+
+        summary = ApplicationsQueries.status_summary(recent)
+        for key, n in counts.items():
+            passed, coding_test_started = StatusCounts.parse_key(key)
+            sub_type_status = {}
+            for sub_type in SubmissionTypes.all:
+                if sub_type.uname in passed:
+                    s = Status.passed
+                elif sub_type == SubmissionTypes.coding_test and coding_test_started:
+                    # started before the coding test duration, it's over
+                    s = Status.failed
+                elif closing_date < dt_now:
+                    s = Status.failed
+                elif sub_type == SubmissionTypes.coding_test or opening_date > dt_now:
+                    s = Status.not_started
+                else:
+                    s = Status.ongoing
+                sub_type_status[sub_type.uname] = s
+
+            for k, s in [("application", Domain.get_combined_status(sub_type_status)), *sub_type_status.items()]:
+                summary[k][s.name] += n
+
+        return summary
+
+    @staticmethod
+    def browse(
+        *, status: Optional[str] = None, cursor: Optional[str] = None, page_size: Optional[int] = None
+    ) -> ApplicationsPage:
+        # ordered by user email and walked with a keyset cursor (the last email of the previous page)
+        page_size = min(page_size or ApplicationsQueries.default_page_size, ApplicationsQueries.max_page_size)
+
+        q = ApplicationsQueries.with_status(Application.objects.all())
+        if status is not None:
+            q = q.filter(application_status=status)
+        if cursor is not None:
+            q = q.filter(user__email__gt=cursor)
+
+        rows = list(
+            q.order_by("user__email").values(
+                "id",
+                "user__id",
+                "user__email",
+                "application_status",
+                *[ApplicationsQueries.status_annotation_key(t) for t in SubmissionTypes.all],
+            )[: page_size + 1]
+        )
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = rows[-1]["user__email"]
+
+        return ApplicationsPage(applications=rows, next_cursor=next_cursor)
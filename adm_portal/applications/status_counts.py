@@ -0,0 +1,161 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Application, ApplicationStatusCount, ApplicationStatusCountKey, Submission, SubmissionTypes
+
+# every application is counted in the `ApplicationStatusCount` of its key, `<passed submission types>|<started>`
+# (e.g. `coding_test,slu01|started`), so the applications status summary doesn't scan the applications
+# (see `ApplicationsQueries.cohort_status_summary`)
+# the signals below keep the counts up to date, bulk inserts / updates skip them: `StatusCounts.rebuild` after those
+
+STARTED = "started"
+NOT_STARTED = "not_started"
+
+
+class StatusCounts:
+    @staticmethod
+    def get_key(passed: Iterable[str], coding_test_started: bool) -> str:
+        return f"{','.join(sorted(set(passed)))}|{STARTED if coding_test_started else NOT_STARTED}"
+
+    @staticmethod
+    def parse_key(key: str) -> Tuple[Set[str], bool]:
+        # (passed submission types, coding test started)
+        passed, started = key.split("|")
+        return {t for t in passed.split(",") if t}, started == STARTED
+
+    @staticmethod
+    def passed_q() -> Q:
+        # submissions with a passing score
+        q = Q()
+        for sub_type in SubmissionTypes.all:
+            q |= Q(submission_type=sub_type.uname, score__gte=sub_type.pass_score)
+        return q
+
+    @staticmethod
+    def add(deltas: Dict[str, int]) -> None:
+        # in key order: concurrent moves lock the counts in the same order
+        for key, delta in sorted(deltas.items()):
+            if delta == 0 or ApplicationStatusCount.objects.filter(key=key).update(count=F("count") + delta):
+                continue
+            ApplicationStatusCount.objects.bulk_create([ApplicationStatusCount(key=key)], ignore_conflicts=True)
+            ApplicationStatusCount.objects.filter(key=key).update(count=F("count") + delta)
+
+    @staticmethod
+    def count_new(application: Application) -> None:
+        # a new application has no submissions
+        key = StatusCounts.get_key([], application.coding_test_started_at is not None)
+        with transaction.atomic():
+            ApplicationStatusCountKey.objects.create(application=application, key=key)
+            StatusCounts.add({key: 1})
+
+    @staticmethod
+    def update(application_id: int) -> None:
+        # moves a counted application to the count of its current key
+        with transaction.atomic():
+            count_key = ApplicationStatusCountKey.objects.select_for_update().filter(application_id=application_id)
+            row = count_key.values_list("key", "application__coding_test_started_at").first()
+            if row is None:
+                return
+
+            old_key, coding_test_started_at = row
+            passed = (
+                Submission.objects.filter(StatusCounts.passed_q(), application_id=application_id)
+                .values_list("submission_type", flat=True)
+                .distinct()
+            )
+            key = StatusCounts.get_key(passed, coding_test_started_at is not None)
+            if key != old_key:
+                count_key.update(key=key)
+                StatusCounts.add({old_key: -1, key: 1})
+
+    @staticmethod
+    def uncount(application_id: int) -> None:
+        with transaction.atomic():
+            count_key = ApplicationStatusCountKey.objects.select_for_update().filter(application_id=application_id)
+            key = count_key.values_list("key", flat=True).first()
+            if key is not None:
+                count_key.delete()
+                StatusCounts.add({key: -1})
+
+    @staticmethod
+    def get_counted_key(application_id: int) -> Optional[str]:
+        return (
+            ApplicationStatusCountKey.objects.filter(application_id=application_id)
+            .values_list("key", flat=True)
+            .first()
+        )
+
+    @staticmethod
+    def rebuild() -> None:
+        # counts every application again, O(applications)
+        with transaction.atomic():
+            passed: Dict[int, List[str]] = {}
+            for application_id, submission_type in (
+                Submission.objects.filter(StatusCounts.passed_q())
+                .values_list("application_id", "submission_type")
+                .distinct()
+            ):
+                passed.setdefault(application_id, []).append(submission_type)
+
+            keys = [
+                ApplicationStatusCountKey(
+                    application_id=application_id,
+                    key=StatusCounts.get_key(passed.get(application_id, []), coding_test_started_at is not None),
+                )
+                for application_id, coding_test_started_at in Application.objects.values_list(
+                    "id", "coding_test_started_at"
+                )
+            ]
+            counts: Dict[str, int] = {}
+            for k in keys:
+                counts[k.key] = counts.get(k.key, 0) + 1
+
+            ApplicationStatusCountKey.objects.all().delete()
+            ApplicationStatusCount.objects.all().delete()
+            ApplicationStatusCountKey.objects.bulk_create(keys, batch_size=1000)
+            ApplicationStatusCount.objects.bulk_create(
+                [ApplicationStatusCount(key=k, count=n) for k, n in counts.items()]
+            )
+
+
+@receiver(post_save, sender=Application)
+def application_saved(sender: Any, instance: Application, created: bool, **kwargs: Any) -> None:
+    if created:
+        StatusCounts.count_new(instance)
+        return
+
+    key = StatusCounts.get_counted_key(instance.id)
+    if key is not None and StatusCounts.parse_key(key)[1] != (instance.coding_test_started_at is not None):
+        StatusCounts.update(instance.id)
+
+
+@receiver(pre_delete, sender=Application)
+def application_deleted(sender: Any, instance: Application, **kwargs: Any) -> None:
+    # before its submissions are deleted (their `post_delete` finds the application isn't counted anymore)
+    StatusCounts.uncount(instance.id)
+
+
+def is_passing(submission: Submission) -> bool:
+    return any(submission.submission_type == t.uname and submission.score >= t.pass_score for t in SubmissionTypes.all)
+
+
+@receiver(post_save, sender=Submission)
+def submission_saved(sender: Any, instance: Submission, **kwargs: Any) -> None:
+    # a passing submission of a type the application didn't pass yet
+    # (submissions are saved once, with their score: lowering a score needs a `rebuild`, as bulk updates do)
+    if not is_passing(instance):
+        return
+    key = StatusCounts.get_counted_key(instance.application_id)
+    if key is not None and instance.submission_type not in StatusCounts.parse_key(key)[0]:
+        StatusCounts.update(instance.application_id)
+
+
+@receiver(post_delete, sender=Submission)
+def submission_deleted(sender: Any, instance: Submission, **kwargs: Any) -> None:
+    key = StatusCounts.get_counted_key(instance.application_id)
+    if key is not None and is_passing(instance):
+        StatusCounts.update(instance.application_id)
@@ -0,0 +1,191 @@
+from datetime import datetime, timedelta
+
+from django.test import TestCase
+
+from applications.domain import Domain, Status
+from applications.models import Application, ApplicationStatusCount, Submission, SubmissionTypes
+from applications.queries import (
+    ApplicationsQueries,
+    SubmissionsFilter,
+    SubmissionsQueries,
+    SubmissionsQueriesException,
+)
+from applications.status_counts import StatusCounts
+from interface import interface
+from users.models import User
+
+
+class TestSubmissionsQueries(TestCase):
+    def setUp(self) -> None:
+        self.u1 = User.objects.create(email="u1@test.com")
+        self.u2 = User.objects.create(email="u2@test.com")
+        a1 = Application.objects.create(user=self.u1)
+        a2 = Application.objects.create(user=self.u2)
+
+        self.dt = datetime(year=2020, month=6, day=1, hour=12)
+        for i in range(10):
+            s = Submission.objects.create(
+                application=a1 if i % 2 == 0 else a2,
+                submission_type=SubmissionTypes.coding_test.uname if i < 6 else SubmissionTypes.slu01.uname,
+                score=i * 2,
+            )
+            # pairs of submissions share the same `created_at`
+            Submission.objects.filter(id=s.id).update(created_at=self.dt + timedelta(days=i // 2))
+
+    def test_browse_pages(self) -> None:
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            page = SubmissionsQueries.browse(SubmissionsFilter(), cursor=cursor, page_size=3)
+            seen.extend([s["id"] for s in page.submissions])
+            pages += 1
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+
+        self.assertEqual(pages, 4)
+        self.assertEqual(seen, list(Submission.objects.order_by("-created_at", "-id").values_list("id", flat=True)))
+
+    def test_browse_page_queries(self) -> None:
+        page = SubmissionsQueries.browse(SubmissionsFilter(), page_size=4)
+        with self.assertNumQueries(1):
+            SubmissionsQueries.browse(SubmissionsFilter(), cursor=page.next_cursor, page_size=4)
+
+    def test_browse_filters(self) -> None:
+        tt = [
+            (SubmissionsFilter(submission_type=SubmissionTypes.slu01.uname), 4),
+            (SubmissionsFilter(min_score=10), 5),
+            (SubmissionsFilter(min_score=4, max_score=8), 3),
+            (SubmissionsFilter(created_from=self.dt + timedelta(days=3)), 4),
+            (SubmissionsFilter(created_to=self.dt + timedelta(days=1)), 2),
+            (SubmissionsFilter(user_uuid=self.u1.uuid), 5),
+            (SubmissionsFilter(user_email=self.u2.email), 5),
+            (SubmissionsFilter(user_email="u"), 0),
+            (SubmissionsFilter(submission_type=SubmissionTypes.coding_test.uname, user_uuid=self.u2.uuid), 3),
+        ]
+
+        for submissions_filter, expected in tt:
+            page = SubmissionsQueries.browse(submissions_filter, page_size=100)
+            self.assertEqual(len(page.submissions), expected)
+            self.assertIsNone(page.next_cursor)
+
+    def test_browse_max_page_size(self) -> None:
+        page = SubmissionsQueries.browse(SubmissionsFilter(), page_size=10**6)
+        self.assertEqual(len(page.submissions), 10)
+
+    def test_browse_invalid_cursor(self) -> None:
+        with self.assertRaises(SubmissionsQueriesException):
+            SubmissionsQueries.browse(SubmissionsFilter(), cursor="not-a-cursor")
+
+
+class TestApplicationsQueries(TestCase):
+    def create_applications(self) -> None:
+        dt_now = datetime.now()
+        coding_test_started_at_list = [None, dt_now - timedelta(minutes=10), dt_now - timedelta(hours=5)]
+        scores_list = [
+            {},
+            {SubmissionTypes.coding_test: 19},
+            {t: 16 for t in SubmissionTypes.all},
+            {t: 3 for t in SubmissionTypes.all},
+        ]
+
+        i = 0
+        for coding_test_started_at in coding_test_started_at_list:
+            for scores in scores_list:
+                a = Application.objects.create(
+                    user=User.objects.create(email=f"u{i}@test.com"), coding_test_started_at=coding_test_started_at
+                )
+                for sub_type, score in scores.items():
+                    Submission.objects.create(application=a, submission_type=sub_type.uname, score=score)
+                i += 1
+
+    def assert_matches_domain(self) -> None:
+        q = ApplicationsQueries.with_status(Application.objects.all())
+        expected_summary = {
+            k: {s.name: 0 for s in Status} for k in ["application", *[t.uname for t in SubmissionTypes.all]]
+        }
+        for a in q:
+            expected = Domain.get_application_detailed_status(a)
+            self.assertEqual(a.application_status, expected["application"].name)
+            for sub_type in SubmissionTypes.all:
+                self.assertEqual(
+                    getattr(a, ApplicationsQueries.status_annotation_key(sub_type)), expected[sub_type.uname].name
+                )
+            for k, s in expected.items():
+                expected_summary[k][s.name] += 1
+
+        self.assertEqual(ApplicationsQueries.status_summary(Application.objects.all()), expected_summary)
+        self.assertEqual(ApplicationsQueries.cohort_status_summary(), expected_summary)
+
+    def test_with_status_applications_open(self) -> None:
+        interface.feature_flag_client.set_applications_opening_date(datetime.now() - timedelta(hours=1))
+        interface.feature_flag_client.set_applications_closing_date(datetime.now() + timedelta(hours=1))
+        self.create_applications()
+        self.assert_matches_domain()
+
+    def test_with_status_applications_not_open(self) -> None:
+        interface.feature_flag_client.set_applications_opening_date(datetime.now() + timedelta(hours=1))
+        interface.feature_flag_client.set_applications_closing_date(datetime.now() + timedelta(hours=2))
+        self.create_applications()
+        self.assert_matches_domain()
+
+    def test_with_status_applications_closed(self) -> None:
+        interface.feature_flag_client.set_applications_opening_date(datetime.now() - timedelta(hours=2))
+        interface.feature_flag_client.set_applications_closing_date(datetime.now() - timedelta(hours=1))
+        self.create_applications()
+        self.assert_matches_domain()
+
+    def test_status_summary_queries(self) -> None:
+        self.create_applications()
+        with self.assertNumQueries(1):
+            ApplicationsQueries.status_summary(Application.objects.all())
+
+    def test_cohort_status_summary_queries(self) -> None:
+        self.create_applications()
+        ApplicationsQueries.cohort_status_summary()  # feature flags
+        with self.assertNumQueries(3):
+            ApplicationsQueries.cohort_status_summary()
+
+    def test_cohort_status_summary_counts(self) -> None:
+        interface.feature_flag_client.set_applications_opening_date(datetime.now() - timedelta(hours=1))
+        interface.feature_flag_client.set_applications_closing_date(datetime.now() + timedelta(hours=1))
+        self.create_applications()
+
+        # the counts follow the coding test starts, new passing submissions and deletions
+        a = Application.objects.filter(coding_test_started_at__isnull=True).first()
+        a.coding_test_started_at = datetime.now() - timedelta(hours=5)  # type: ignore
+        a.save()  # type: ignore
+        Submission.objects.create(application=a, submission_type=SubmissionTypes.slu02.uname, score=20)
+        Submission.objects.filter(application__user__email="u5@test.com", score__gte=16).delete()
+        User.objects.filter(email="u6@test.com").delete()
+        self.assert_matches_domain()
+
+        counts = set(ApplicationStatusCount.objects.filter(count__gt=0).values_list("key", "count"))
+        StatusCounts.rebuild()
+        self.assertEqual(set(ApplicationStatusCount.objects.values_list("key", "count")), counts)
+
+        # bulk updates skip the counts
+        Application.objects.update(coding_test_started_at=datetime.now() - timedelta(hours=5))
+        StatusCounts.rebuild()
+        self.assert_matches_domain()
+
+    def test_browse(self) -> None:
+        interface.feature_flag_client.set_applications_opening_date(datetime.now() - timedelta(hours=1))
+        interface.feature_flag_client.set_applications_closing_date(datetime.now() + timedelta(hours=1))
+        self.create_applications()
+
+        emails = []
+        cursor = None
+        while True:
+            page = ApplicationsQueries.browse(cursor=cursor, page_size=5)
+            emails.extend([a["user__email"] for a in page.applications])
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(emails, sorted(Application.objects.values_list("user__email", flat=True)))
+
+        page = ApplicationsQueries.browse(status=Status.passed.name)
+        self.assertEqual(len(page.applications), 3)
+        for a in page.applications:
+            self.assertEqual(a["application_status"], Status.passed.name)
@@ -0,0 +1 @@
+from .runner import Benchmark, BenchmarkResult, Regression, compare, run_benchmark
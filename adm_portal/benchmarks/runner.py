@@ -0,0 +1,94 @@
+import tracemalloc
+from statistics import median
+from time import perf_counter
+from typing import Any, Callable, Dict, List, NamedTuple
+
+from django.db import connection, reset_queries, transaction
+from django.test.utils import CaptureQueriesContext
+
+
+class Benchmark(NamedTuple):
+    name: str
+    # `run(setup())` is measured, `setup` isn't
+    run: Callable[[Any], Any]
+    setup: Callable[[], Any] = lambda: None
+
+
+class BenchmarkResult(NamedTuple):
+    name: str
+    queries: int
+    wall_time_ms: float  # median
+    min_wall_time_ms: float
+    peak_memory_kb: float
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "queries": self.queries,
+            "wall_time_ms": round(self.wall_time_ms, 3),
+            "min_wall_time_ms": round(self.min_wall_time_ms, 3),
+            "peak_memory_kb": round(self.peak_memory_kb, 1),
+        }
+
+
+class Regression(NamedTuple):
+    name: str
+    metric: str
+    baseline: float
+    value: float
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.metric} {self.baseline} -> {self.value}"
+
+
+def _measure_once(benchmark: Benchmark, *, trace_memory: bool) -> Dict[str, float]:
+    # every run is rolled back, benchmarks that write (draw, select, events) always see the same data
+    with transaction.atomic():
+        arg = benchmark.setup()
+        # the queries log is bounded (9000 queries), it must not be full when capturing
+        reset_queries()
+        with CaptureQueriesContext(connection) as ctx:
+            if trace_memory:
+                tracemalloc.start()
+            start = perf_counter()
+            benchmark.run(arg)
+            wall_time = perf_counter() - start
+            peak_memory = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+            if trace_memory:
+                tracemalloc.stop()
+        transaction.set_rollback(True)
+
+    return {"queries": len(ctx.captured_queries), "wall_time": wall_time, "peak_memory": peak_memory}
+
+
+def run_benchmark(benchmark: Benchmark, *, repeat: int = 5) -> BenchmarkResult:
+    # memory is traced in an extra run (tracing slows down the timed runs)
+    runs = [_measure_once(benchmark, trace_memory=False) for _ in range(repeat)]
+    memory_run = _measure_once(benchmark, trace_memory=True)
+
+    wall_times = [r["wall_time"] * 1000 for r in runs]
+    return BenchmarkResult(
+        name=benchmark.name,
+        queries=int(max(r["queries"] for r in runs)),
+        wall_time_ms=median(wall_times),
+        min_wall_time_ms=min(wall_times),
+        peak_memory_kb=memory_run["peak_memory"] / 1024,
+    )
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], *, tolerance: float = 0.5
+) -> List[Regression]:
+    # any extra query is a regression, wall time / memory regress when above the baseline by more than `tolerance`
+    # benchmarks missing from the baseline are not compared
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        if result["queries"] > base["queries"]:
+            regressions.append(Regression(name, "queries", base["queries"], result["queries"]))
+        for metric in ["wall_time_ms", "peak_memory_kb"]:
+            if result[metric] > base[metric] * (1 + tolerance):
+                regressions.append(Regression(name, metric, base[metric], result[metric]))
+
+    return regressions
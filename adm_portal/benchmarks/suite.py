@@ -0,0 +1,107 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, List
+
+from django.core.cache import cache
+
+from applications.domain import Domain as ApplicationDomain
+from applications.models import Application, SubmissionTypes
+from candidate.domain import Domain as CandidateDomain
+from email_client import LocalEmailClient, LocalEmailClientModes
+from feature_flags_client import MockFeatureFlagsClient
+from interface import interface
+from selection.draw import default_draw_params, draw
+from selection.models import Selection
+from selection.select import select
+from selection.status import SelectionStatus
+from staff.domain import Events
+from staff.export import get_all_candidates
+from users.models import User
+
+from .runner import Benchmark
+
+OPEN_STATUSES = [
+    SelectionStatus.DRAWN,
+    SelectionStatus.INTERVIEW,
+    SelectionStatus.SELECTED,
+    SelectionStatus.TO_BE_ACCEPTED,
+]
+
+
+@contextmanager
+def local_clients() -> Iterator[None]:
+    # in memory emails and feature flags, restored on exit
+    email_client, feature_flag_client = interface._email_client, interface._feature_flag_client
+
+    interface._email_client = LocalEmailClient(root="", mode=LocalEmailClientModes.MEMORY)
+    interface._feature_flag_client = MockFeatureFlagsClient()
+    interface.feature_flag_client.set_applications_opening_date(datetime.now() - timedelta(days=30))
+    try:
+        yield
+    finally:
+        interface._email_client, interface._feature_flag_client = email_client, feature_flag_client
+
+
+def get_benchmarks(sample: int) -> List[Benchmark]:
+    # `sample` candidates per benchmark, for the per candidate functions
+    def open_applications() -> None:
+        interface.feature_flag_client.set_applications_closing_date(datetime.now() + timedelta(days=1))
+
+    def close_applications() -> None:
+        interface.feature_flag_client.set_applications_closing_date(datetime.now() - timedelta(days=1))
+
+    def applications() -> List[Application]:
+        open_applications()
+        return list(Application.objects.select_related("user").order_by("id")[:sample])
+
+    def candidates() -> List[User]:
+        open_applications()
+        cache.clear()
+        return list(User.objects.filter(is_staff=False, is_admin=False).order_by("id")[:sample])
+
+    def reset_selections() -> None:
+        Selection.objects.exclude(status=SelectionStatus.PASSED_TEST).update(
+            status=SelectionStatus.PASSED_TEST, draw_rank=None
+        )
+
+    def drawn_selections() -> None:
+        reset_selections()
+        draw(default_draw_params, scholarships=False)
+
+    def applications_not_over() -> None:
+        close_applications()
+        Selection.objects.all().delete()
+        Application.objects.update(application_over_email_sent=None)
+
+    def selections_closed() -> None:
+        close_applications()
+        Selection.objects.filter(status__in=OPEN_STATUSES).update(status=SelectionStatus.ACCEPTED)
+
+    return [
+        Benchmark(
+            "applications.get_application_detailed_status",
+            lambda apps: [ApplicationDomain.get_application_detailed_status(a) for a in apps],
+            applications,
+        ),
+        Benchmark(
+            "applications.can_add_submission",
+            lambda apps: [ApplicationDomain.can_add_submission(a, t) for a in apps for t in SubmissionTypes.all],
+            applications,
+        ),
+        Benchmark(
+            "candidate.get_candidate_state",
+            lambda users: [CandidateDomain.get_candidate_state(u) for u in users],
+            candidates,
+        ),
+        Benchmark("selection.draw", lambda _: draw(default_draw_params, scholarships=False), reset_selections),
+        Benchmark("selection.select", lambda _: select(), drawn_selections),
+        Benchmark(
+            "staff.trigger_applications_are_over",
+            lambda _: Events.trigger_applications_are_over(),
+            applications_not_over,
+        ),
+        Benchmark(
+            "staff.trigger_admissions_are_over", lambda _: Events.trigger_admissions_are_over(), selections_closed
+        ),
+        Benchmark("staff.get_all_candidates", lambda _: list(get_all_candidates().rows)),
+    ]
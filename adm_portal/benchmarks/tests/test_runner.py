@@ -0,0 +1,41 @@
+from django.test import TestCase
+
+from benchmarks import Benchmark, Regression, compare, run_benchmark
+from users.models import User
+
+
+class TestRunner(TestCase):
+    def test_run_benchmark(self) -> None:
+        def create_users() -> int:
+            for i in range(3):
+                User.objects.create_user(email=f"u{i}@test.com", password="")
+            return 3
+
+        def count_users(n: int) -> None:
+            for _ in range(n):
+                User.objects.count()
+
+        result = run_benchmark(Benchmark("count_users", count_users, create_users), repeat=2)
+
+        self.assertEqual(result.name, "count_users")
+        self.assertEqual(result.queries, 3)
+        self.assertGreater(result.wall_time_ms, 0)
+        self.assertGreater(result.peak_memory_kb, 0)
+        # rolled back
+        self.assertEqual(User.objects.count(), 0)
+
+    def test_compare(self) -> None:
+        baseline = {
+            "a": {"queries": 10, "wall_time_ms": 100, "peak_memory_kb": 50},
+            "b": {"queries": 10, "wall_time_ms": 100, "peak_memory_kb": 50},
+        }
+        results = {
+            "a": {"queries": 11, "wall_time_ms": 140, "peak_memory_kb": 50},
+            "b": {"queries": 9, "wall_time_ms": 160, "peak_memory_kb": 40},
+            "c": {"queries": 100, "wall_time_ms": 1000, "peak_memory_kb": 1000},
+        }
+
+        self.assertEqual(
+            compare(results, baseline, tolerance=0.5),
+            [Regression("a", "queries", 10, 11), Regression("b", "wall_time_ms", 100, 160)],
+        )
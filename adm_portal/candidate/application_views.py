@@ -1,14 +1,18 @@
 from datetime import datetime
 from typing import Any, Dict
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.http import Http404, HttpRequest, HttpResponse, HttpResponseRedirect
 from django.template import loader
-from django.views.decorators.http import require_http_methods
 
 from applications.domain import Domain
 from applications.models import Application, Submission, SubmissionType, SubmissionTypes
+from common.cache import bump_data_version, invalidate_candidate_state
+from common.request_response import aget_files, require_http_methods
+from grader_client.client import SubmissionResult
 from interface import interface
+from users.models import User
 
 from .helpers import applications_are_open, build_context
 
@@ -33,6 +37,8 @@ def candidate_before_coding_test_view(request: HttpRequest) -> HttpResponse:
     if application.coding_test_started_at is None:
         application.coding_test_started_at = datetime.now()
         application.save()
+        invalidate_candidate_state(request.user.id)
+        bump_data_version()
 
     return HttpResponseRedirect("/candidate/coding-test")
 
@@ -42,7 +48,9 @@ def candidate_coding_test_view(request: HttpRequest) -> HttpResponse:
     if not applications_are_open():
         return HttpResponseRedirect("/candidate/home")
 
-    application, _ = Application.objects.get_or_create(user=request.user)
+    application, created = Application.objects.get_or_create(user=request.user)
+    if created:
+        bump_data_version()
     if application.coding_test_started_at is None:
         return HttpResponseRedirect("/candidate/before-coding-test")
 
@@ -79,7 +87,9 @@ def candidate_assignment_download_view(request: HttpRequest) -> HttpResponse:
 def candidate_slu_view(request: HttpRequest, submission_type: str) -> HttpResponse:
     if not applications_are_open():
         return HttpResponseRedirect("/candidate/home")
-    application, _ = Application.objects.get_or_create(user=request.user)
+    application, created = Application.objects.get_or_create(user=request.user)
+    if created:
+        bump_data_version()
     submission_type_ = getattr(SubmissionTypes, submission_type)
     ctx = build_context(request.user, submission_view_ctx(application, submission_type_))
     template = loader.get_template("./candidate_templates/slu.html")
@@ -87,32 +97,40 @@ def candidate_slu_view(request: HttpRequest, submission_type: str) -> HttpRespon
 
 
 @require_http_methods(["POST"])
-def candidate_submission_upload_view(request: HttpRequest, submission_type: str) -> HttpResponse:
+async def candidate_submission_upload_view(request: HttpRequest, submission_type: str) -> HttpResponse:
+    # async: the upload to the storage and the grading don't hold a thread (asgi),
+    # the queries run in django's sync thread
     submission_type_ = getattr(SubmissionTypes, submission_type)
 
-    file = request.FILES["file"]
+    file = (await aget_files(request))["file"]
     now_str = datetime.now().strftime("%m_%d_%Y__%H_%M_%S")
     upload_key = f"{submission_type_.uname}/{request.user.uuid}/{file.name}@{now_str}"
-    interface.storage_client.save(upload_key, file)
+    await interface.storage_client.asave(upload_key, file)
 
-    submission_result = interface.grader_client.grade(
+    submission_result = await interface.grader_client.agrade(
         assignment_id=submission_type_.uname,
         user_uuid=request.user.uuid,
         submission_s3_bucket=settings.STORAGE_BUCKET,
         submission_s3_key=upload_key,
     )
 
-    application = Application.objects.get(user=request.user)
-    sub = Submission(
-        file_location=upload_key, score=submission_result.score, feedback_location=submission_result.feedback_s3_key
-    )
-    Domain.add_submission(application, submission_type_, sub)
+    await sync_to_async(_add_submission)(request.user, submission_type_, upload_key, submission_result)
 
     if submission_type == SubmissionTypes.coding_test.uname:
         return HttpResponseRedirect("/candidate/coding-test")
     return HttpResponseRedirect(f"/candidate/slu/{submission_type}")
 
 
+def _add_submission(
+    user: User, submission_type: SubmissionType, upload_key: str, submission_result: SubmissionResult
+) -> None:
+    application = Application.objects.get(user=user)
+    sub = Submission(
+        file_location=upload_key, score=submission_result.score, feedback_location=submission_result.feedback_s3_key
+    )
+    Domain.add_submission(application, submission_type, sub)
+
+
 # generic
 
 
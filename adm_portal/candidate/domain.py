@@ -1,9 +1,11 @@
-from typing import Dict, NamedTuple, Optional
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional
 
 from applications.domain import ApplicationStatus
 from applications.domain import Domain as ApplicationsDomain
 from applications.domain import SubmissionStatus
 from applications.models import Application, SubmissionTypes
+from common.cache import bump_data_version, get_candidate_state_data, set_candidate_state_data
 from profiles.models import Profile
 from selection.domain import SelectionDomain
 from selection.models import Selection
@@ -25,6 +27,15 @@ class CandidateState(NamedTuple):
     selection_status: Optional[SelectionStatusType]
 
 
+class CandidateStateData(NamedTuple):
+    # everything the candidate state needs from the database (cached per candidate, see `common.cache`)
+    # statuses are computed on read, so they follow time and feature flag (opening/closing dates) changes
+    created_profile: bool
+    coding_test_started_at: Optional[datetime]
+    best_scores: Dict[str, Optional[int]]
+    selection_status: Optional[SelectionStatusType]
+
+
 class DomainException(Exception):
     pass
 
@@ -32,7 +43,47 @@ class DomainException(Exception):
 class Domain:
     @staticmethod
     def get_candidate_state(candidate: User) -> CandidateState:
-        state = {}
+        return Domain.build_candidate_state(candidate, Domain.load_candidate_state_data(candidate))
+
+    @staticmethod
+    def get_cached_candidate_state(candidate: User) -> CandidateState:
+        data = get_candidate_state_data(candidate.id)
+        if data is None:
+            data = Domain.load_candidate_state_data(candidate)
+            set_candidate_state_data(candidate.id, data)
+
+        return Domain.build_candidate_state(candidate, data)
+
+    @staticmethod
+    def load_candidate_state_data(candidate: User) -> CandidateStateData:
+        try:
+            _ = candidate.profile
+            created_profile = True
+        except Profile.DoesNotExist:
+            created_profile = False
+
+        try:
+            application = candidate.application
+        except Application.DoesNotExist:
+            application, created = Application.objects.get_or_create(user=candidate)
+            if created:
+                bump_data_version()
+
+        try:
+            selection_status: Optional[SelectionStatusType] = SelectionDomain.get_status(candidate.selection)
+        except Selection.DoesNotExist:
+            selection_status = None
+
+        return CandidateStateData(
+            created_profile=created_profile,
+            coding_test_started_at=application.coding_test_started_at,
+            best_scores=ApplicationsDomain.get_best_scores(application),
+            selection_status=selection_status,
+        )
+
+    @staticmethod
+    def build_candidate_state(candidate: User, data: CandidateStateData) -> CandidateState:
+        state: Dict[str, Any] = {}
 
         state["confirmed_email"] = candidate.email_confirmed
 
@@ -41,25 +92,18 @@ class Domain:
         state["decided_scholarship"] = candidate.applying_for_scholarship is not None
         state["applying_for_scholarship"] = candidate.applying_for_scholarship
 
-        try:
-            _ = candidate.profile
-            state["created_profile"] = True
-        except Profile.DoesNotExist:
-            state["created_profile"] = False
+        state["created_profile"] = data.created_profile
 
-        application, _ = Application.objects.get_or_create(user=candidate)
-        status = ApplicationsDomain.get_application_detailed_status(application)
+        # unsaved, not bound to the candidate (it would replace the `candidate.application` cache)
+        application = Application(coding_test_started_at=data.coding_test_started_at)
+        status = ApplicationsDomain.get_application_detailed_status(application, best_scores=data.best_scores)
         state["application_status"] = status["application"]
         state["coding_test_status"] = status[SubmissionTypes.coding_test.uname]
         state["slu01_status"] = status[SubmissionTypes.slu01.uname]
         state["slu02_status"] = status[SubmissionTypes.slu02.uname]
         state["slu03_status"] = status[SubmissionTypes.slu03.uname]
 
-        try:
-            state["selection_status"] = SelectionDomain.get_status(candidate.selection)
-
-        except Selection.DoesNotExist:
-            state["selection_status"] = None
+        state["selection_status"] = data.selection_status
 
         return CandidateState(**state)
 
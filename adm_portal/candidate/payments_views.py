@@ -1,13 +1,15 @@
+from asgiref.sync import sync_to_async
 from django.http import Http404, HttpRequest, HttpResponse, HttpResponseRedirect
 from django.template import loader
-from django.views.decorators.http import require_http_methods
 
+from common.request_response import aget_files, require_http_methods
 from interface import interface
 from selection.domain import SelectionDomain
 from selection.models import Selection, SelectionDocument
 from selection.payment import add_document, can_be_updated
 from selection.queries import SelectionDocumentQueries
 from selection.status import SelectionStatus
+from users.models import User
 
 from .helpers import build_context
 
@@ -65,24 +67,28 @@ def candidate_document_download_view(request: HttpRequest, document_id: int) ->
 
 
 @require_http_methods(["POST"])
-def candidate_payment_proof_upload_view(request: HttpRequest) -> HttpResponse:
-    return _candidate_document_upload(request, document_type="payment_proof")
+async def candidate_payment_proof_upload_view(request: HttpRequest) -> HttpResponse:
+    return await _candidate_document_upload(request, document_type="payment_proof")
 
 
 @require_http_methods(["POST"])
-def candidate_student_id_upload_view(request: HttpRequest) -> HttpResponse:
-    return _candidate_document_upload(request, document_type="student_id")
+async def candidate_student_id_upload_view(request: HttpRequest) -> HttpResponse:
+    return await _candidate_document_upload(request, document_type="student_id")
 
 
-def _candidate_document_upload(request: HttpRequest, document_type: str) -> HttpResponse:
-    f = request.FILES["file"]
+async def _candidate_document_upload(request: HttpRequest, document_type: str) -> HttpResponse:
+    # async: the upload to the storage doesn't hold a thread (asgi), the queries run in django's sync thread
+    f = (await aget_files(request))["file"]
     upload_key = f"payments/{document_type}/{request.user.uuid}/{f.name}"
     upload_key_unique = interface.storage_client.key_append_uuid(upload_key)
 
-    interface.storage_client.save(upload_key_unique, f)
+    await interface.storage_client.asave(upload_key_unique, f)
 
-    document = SelectionDocument(file_location=upload_key_unique, doc_type=document_type)
-    selection = request.user.selection
-    add_document(selection, document)
+    await sync_to_async(_add_document)(request.user, upload_key_unique, document_type)
 
     return HttpResponseRedirect("/candidate/payment")
+
+
+def _add_document(user: User, file_location: str, document_type: str) -> None:
+    document = SelectionDocument(file_location=file_location, doc_type=document_type)
+    add_document(user.selection, document)
@@ -4,6 +4,7 @@ from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
 from django.template import loader
 from django.views.decorators.http import require_http_methods
 
+from common.cache import bump_data_version, invalidate_candidate_state
 from profiles.models import Profile, ProfileGenders, ProfileTicketTypes
 
 from .helpers import build_context
@@ -39,6 +40,8 @@ def _post_candidate_profile_view(request: HttpRequest, profile: Optional[Profile
     profile.company = request.POST["company"] if request.user.applying_for_scholarship is False else ""
 
     profile.save()
+    invalidate_candidate_state(request.user.id)
+    bump_data_version()
     return HttpResponseRedirect("/candidate/home")
 
 
@@ -1,12 +1,16 @@
 from datetime import datetime, timedelta
 
+from django.core.cache import cache
 from django.test import TestCase
 
-from applications.domain import ApplicationStatus, SubmissionStatus
-from applications.models import Application
+from applications.domain import ApplicationStatus
+from applications.domain import Domain as ApplicationsDomain
+from applications.domain import SubmissionStatus
+from applications.models import Application, Submission, SubmissionTypes
 from candidate.domain import CandidateState, Domain
 from interface import interface
 from profiles.models import Profile
+from selection.domain import SelectionDomain
 from selection.models import Selection
 from selection.status import SelectionStatus
 from users.models import User
@@ -84,3 +88,38 @@ class TestDomain(TestCase):
             Domain.get_candidate_state(User.objects.create(email="anon@adm.com"))
         )
         self.assertEqual(readable, expected)
+
+    def test_get_cached_candidate_state(self) -> None:
+        cache.clear()
+        interface.feature_flag_client.set_applications_opening_date(datetime.now() - timedelta(minutes=30))
+        interface.feature_flag_client.set_applications_closing_date(datetime.now() + timedelta(minutes=30))
+        candidate = User.objects.create(email="candidate@adm.com")
+        Profile.objects.create(user=candidate)
+        application = Application.objects.create(user=candidate, coding_test_started_at=datetime.now())
+
+        state = Domain.get_cached_candidate_state(candidate)
+        self.assertEqual(state, Domain.get_candidate_state(candidate))
+        self.assertEqual(state.coding_test_status, SubmissionStatus.ongoing)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(Domain.get_cached_candidate_state(candidate), state)
+
+        # invalidated by new submissions
+        ApplicationsDomain.add_submission(application, SubmissionTypes.coding_test, Submission(score=20))
+        state = Domain.get_cached_candidate_state(candidate)
+        self.assertEqual(state.coding_test_status, SubmissionStatus.passed)
+
+        # invalidated by selection changes
+        selection = SelectionDomain.create(candidate)
+        state = Domain.get_cached_candidate_state(candidate)
+        self.assertEqual(state.selection_status, SelectionStatus.PASSED_TEST)
+        SelectionDomain.update_status(selection, SelectionStatus.DRAWN)
+        state = Domain.get_cached_candidate_state(candidate)
+        self.assertEqual(state.selection_status, SelectionStatus.DRAWN)
+
+        # statuses are computed on read (flags changes do not need invalidation)
+        interface.feature_flag_client.set_applications_closing_date(datetime.now() - timedelta(minutes=10))
+        with self.assertNumQueries(0):
+            state = Domain.get_cached_candidate_state(candidate)
+        self.assertEqual(state.slu01_status, SubmissionStatus.failed)
+        self.assertEqual(state.application_status, ApplicationStatus.failed)
@@ -1,14 +1,15 @@
 from datetime import datetime
 
+from asgiref.sync import sync_to_async
 from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
 from django.template import loader
-from django.views.decorators.http import require_http_methods
 
 from applications.domain import Status
-from common.request_response import get_url
+from common.request_response import get_url, require_http_methods
 from interface import interface
 from profiles.models import Profile
 from selection.status import SelectionStatus
+from users.models import User
 
 from .domain import Domain
 from .helpers import build_context
@@ -17,7 +18,7 @@ from .helpers import build_context
 @require_http_methods(["GET"])
 def candidate_home_view(request: HttpRequest) -> HttpResponse:
     template = loader.get_template("./candidate_templates/home.html")
-    state = Domain.get_candidate_state(request.user)
+    state = Domain.get_cached_candidate_state(request.user)
 
     # the action_point is the first open section in the steps accordion
     # accordion_enabled_status say whether each accordion section should be enabled
@@ -146,25 +147,32 @@ def candidate_scholarship_view(request: HttpRequest) -> HttpResponse:
 
 
 @require_http_methods(["GET", "POST"])
-def candidate_contactus_view(request: HttpRequest) -> HttpResponse:
-    user = request.user
+async def candidate_contactus_view(request: HttpRequest) -> HttpResponse:
+    # async: the email is sent without holding a thread (asgi), the queries run in django's sync thread
     if request.method == "GET":
-        template = loader.get_template("./candidate_templates/contactus.html")
-        ctx = build_context(request.user)
-        return HttpResponse(template.render(ctx, request))
+        return await sync_to_async(_render_contactus)(request, "./candidate_templates/contactus.html")
 
+    user = request.user
     user_url = f"{get_url(request)}/staff/candidates/{user.id}/"
     message = request.POST["message"]
+    user_name = await sync_to_async(_get_user_name)(user)
+
+    await interface.email_client.asend(
+        "send_contact_us_email", from_email=user.email, user_name=user_name, user_url=user_url, message=message
+    )
+    await sync_to_async(user.save)()
+
+    return await sync_to_async(_render_contactus)(request, "./candidate_templates/contactus-success.html")
+
+
+def _get_user_name(user: User) -> str:
     try:
-        user_name = user.profile.full_name
+        return user.profile.full_name
     except Profile.DoesNotExist:
-        user_name = "-"
+        return "-"
 
-    interface.email_client.send_contact_us_email(
-        from_email=user.email, user_name=user_name, user_url=user_url, message=message
-    )
-    user.save()
 
-    template = loader.get_template("./candidate_templates/contactus-success.html")
+def _render_contactus(request: HttpRequest, template_name: str) -> HttpResponse:
+    template = loader.get_template(template_name)
     ctx = build_context(request.user)
     return HttpResponse(template.render(ctx, request))
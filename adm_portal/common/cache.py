@@ -0,0 +1,64 @@
+from time import time
+from typing import Any, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+
+# the caches of data derived from the candidates data, invalidated by the domain layer whenever that data changes
+# (here so the domain apps don't depend on the apps that read the caches: `candidate`, `staff`)
+
+# per candidate cache of the (db) data the candidate state is computed from (see `candidate.domain`)
+# it must be invalidated whenever that data changes:
+# submissions, coding test start, profile and selection status
+CANDIDATE_STATE_CACHE_TIMEOUT = 60 * 60
+
+
+def _candidate_state_key(user_id: int) -> str:
+    return f"candidate-state:{user_id}"
+
+
+def get_candidate_state_data(user_id: int) -> Optional[Any]:
+    return cache.get(_candidate_state_key(user_id))
+
+
+def set_candidate_state_data(user_id: int, data: Any) -> None:
+    cache.set(_candidate_state_key(user_id), data, CANDIDATE_STATE_CACHE_TIMEOUT)
+
+
+def invalidate_candidate_state(user_id: int) -> None:
+    key = _candidate_state_key(user_id)
+    cache.delete(key)
+    # and after the commit: a request could have cached the state it read before the commit
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+# version of the candidates data (applications, submissions, profiles, selections, flags) the heavy staff tables
+# are rendered from, part of their template fragments cache keys (see `staff.cache`)
+# it must be bumped whenever that data changes, so a fragment is never served stale
+_DATA_VERSION_KEY = "staff-data-version"
+
+
+def _new_data_version() -> int:
+    # after an eviction the version starts over from a value that was never used
+    return int(time() * 1000)
+
+
+def get_data_version() -> int:
+    version = cache.get(_DATA_VERSION_KEY)
+    if version is None:
+        cache.add(_DATA_VERSION_KEY, _new_data_version(), None)
+        version = cache.get(_DATA_VERSION_KEY)
+    return version
+
+
+def _bump_data_version() -> None:
+    try:
+        cache.incr(_DATA_VERSION_KEY)
+    except ValueError:
+        cache.set(_DATA_VERSION_KEY, _new_data_version(), None)
+
+
+def bump_data_version() -> None:
+    _bump_data_version()
+    # and after the commit: a request could have cached the data it read before the commit with the new version
+    transaction.on_commit(_bump_data_version)
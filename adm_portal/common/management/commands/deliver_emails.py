@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from email_client.outbox import OutboxWorker, RateLimiter
+from interface import interface
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--client", type=str, default=None)
+        parser.add_argument("--workers", type=int, default=settings.EMAIL_OUTBOX_WORKERS)
+        parser.add_argument("--batch-size", type=int, default=200)
+        parser.add_argument("--max-attempts", type=int, default=6)
+        parser.add_argument("--backoff", type=int, default=30, help="first retry delay (seconds), doubles every retry")
+        parser.add_argument("--poll-interval", type=float, default=5)
+        parser.add_argument("--once", action="store_true", help="deliver the due emails and exit")
+
+    def handle(self, *args, **options) -> None:
+        client_id = options["client"] or settings.EMAIL_OUTBOX_DELIVERY_CLIENT
+        rate = settings.EMAIL_OUTBOX_RATE_LIMITS.get(client_id)
+
+        worker = OutboxWorker(
+            interface.new_outbox_delivery_client(client_id),
+            rate_limiter=RateLimiter(rate, burst=max(1, int(rate or 1))),
+            workers=options["workers"],
+            batch_size=options["batch_size"],
+            max_attempts=options["max_attempts"],
+            backoff=timedelta(seconds=options["backoff"]),
+        )
+
+        self.stdout.write(f"delivering outbox emails with `{client_id}` (workers={worker.workers}, rate={rate}/s)")
+        report = worker.run(once=options["once"], poll_interval=options["poll_interval"])
+        self.stdout.write(
+            self.style.SUCCESS(f"sent: {report.sent}, retried: {report.retried}, failed: {report.failed}")
+        )
@@ -2,12 +2,15 @@ import os
 import random
 from datetime import datetime, timedelta
 from logging import getLogger
-from typing import Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 
 from applications.models import Application, Submission, SubmissionType, SubmissionTypes
+from applications.status_counts import StatusCounts
 from profiles.models import Profile, ProfileGenders, ProfileTicketTypes
 from selection.domain import SelectionDomain
 from selection.models import Selection, SelectionDocument
@@ -24,7 +27,7 @@ ASSET_PAYMENT_PROOF_PNG = os.path.join(_assets, "payment-proof.png")
 ASSET_STUDENT_ID_PNG = os.path.join(_assets, "student-id.png")
 
 
-storage_cli = LocalStorageClient(settings.STORAGE_BUCKET)
+storage_cli = LocalStorageClient(settings.STORAGE_LOCAL_DIR)
 
 UserOption = Callable[[User], None]
 
@@ -129,6 +132,21 @@ def new_user(uid: str, *opts: Callable[[User], None]) -> User:
 class Command(BaseCommand):
     help = "Generates Fixtures for tests"
 
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--size", type=str, default="small", help=f"random candidates: {' | '.join(SIZES)} | <number>"
+        )
+        parser.add_argument("--seed", type=int, default=0, help="random seed (same seed, same data)")
+
+    @staticmethod
+    def get_size(size: str) -> int:
+        if size in SIZES:
+            return SIZES[size]
+        try:
+            return int(size)
+        except ValueError:
+            raise CommandError(f"invalid --size `{size}`")
+
     @staticmethod
     def summary() -> Dict[str, int]:
         return {
@@ -136,6 +154,8 @@ class Command(BaseCommand):
             "profiles": Profile.objects.count(),
             "applications": Application.objects.count(),
             "submissions": Submission.objects.count(),
+            "selections": Selection.objects.count(),
+            "documents": SelectionDocument.objects.count(),
         }
 
     def handle(self, *args, **options) -> None:
@@ -216,62 +236,143 @@ class Command(BaseCommand):
         # new_user("with_company_payment", with_profile(ticket_type=ProfileTicketTypes.company),
         # with_payment(), with_document())
 
-        # randoms (will be bulk created)
-        users: List[User] = []
-        # random - users
-        logger.info(f"creating {_random_n} random users with profiles and applications")
-        for i in range(0, _random_n):
-            u = User(email=f"random_{i}@adm.com")
-            users.append(u)
-
-        User.objects.bulk_create(users)
-        users = User.objects.filter(email__in=[u.email for u in users])
-
-        # random - profiles
-        profiles: List[Profile] = []
-        for prof_u in users:
-            gender = random.choice([ProfileGenders.female, ProfileGenders.male, ProfileGenders.other])
-            ticket_type = random.choice(
-                [ProfileTicketTypes.regular, ProfileTicketTypes.company, ProfileTicketTypes.student]
-            )
-            p = Profile(
-                user=prof_u,
-                full_name=f"Random User {prof_u.id}",
-                profession=f"Random Profession {prof_u.id}",
-                gender=gender,
-                ticket_type=ticket_type,
-            )
-            profiles.append(p)
-        Profile.objects.bulk_create(profiles)
-
-        # random - applications
-        applications: List[Application] = []
-        for app_u in users:
-            minutes_delta = random.randrange(0, 300, 20)
-            a = Application(user=app_u, coding_test_started_at=datetime.now() - timedelta(minutes=minutes_delta))
-            applications.append(a)
-        Application.objects.bulk_create(applications)
-        applications = Application.objects.filter(user__in=users)
-
-        # random - submissions
-        submissions: List[Submission] = []
-        for sub_a in applications:
-            for j in range(0, 15):
-                s_type = random.choice(
-                    [
-                        SubmissionTypes.coding_test.uname,
-                        SubmissionTypes.slu01.uname,
-                        SubmissionTypes.slu02.uname,
-                        SubmissionTypes.slu03.uname,
-                    ]
-                )
-                score = random.randrange(60, 100, 2)
-                s = Submission(application=sub_a, submission_type=s_type, score=score, feedback_location="404")
-                submissions.append(s)
-
-        Submission.objects.bulk_create(submissions)
+        # randoms (bulk created)
+        n = self.get_size(options["size"])
+        logger.info(f"creating {n} random candidates: email=random_<i>@adm.com; pw={RANDOM_PASSWORD}")
+        generate_random_candidates(n, rng=random.Random(options["seed"]))
 
         logger.info(self.summary())
 
 
-_random_n = 500
+# `--size` presets (random candidates)
+SIZES = {"small": 500, "medium": 5_000, "large": 20_000}
+
+# (value, weight)
+GENDERS = [(ProfileGenders.female, 35), (ProfileGenders.male, 60), (ProfileGenders.other, 5)]
+TICKET_TYPES = [
+    (ProfileTicketTypes.regular, 55),
+    (ProfileTicketTypes.student, 30),
+    (ProfileTicketTypes.company, 10),
+    (ProfileTicketTypes.scholarship, 5),
+]
+SUBMISSION_TYPES = [SubmissionTypes.coding_test, SubmissionTypes.slu01, SubmissionTypes.slu02, SubmissionTypes.slu03]
+# candidates that passed the coding test
+SELECTION_STATUSES = [
+    (SelectionStatus.PASSED_TEST, 50),
+    (SelectionStatus.DRAWN, 10),
+    (SelectionStatus.INTERVIEW, 5),
+    (SelectionStatus.SELECTED, 10),
+    (SelectionStatus.TO_BE_ACCEPTED, 5),
+    (SelectionStatus.ACCEPTED, 10),
+    (SelectionStatus.REJECTED, 2),
+    (SelectionStatus.NOT_SELECTED, 8),
+]
+
+RANDOM_EMAIL = "random_{i}@adm.com"
+RANDOM_PASSWORD = "random"
+# rows per insert (sqlite inserts at most 500 rows at once)
+BATCH_SIZE = 500
+
+
+def choose(rng: random.Random, weighted: List[Tuple[Any, int]]) -> Any:
+    return rng.choices([v for v, _ in weighted], weights=[w for _, w in weighted])[0]
+
+
+def generate_random_candidates(n: int, *, rng: random.Random) -> None:
+    # every random candidate has the same password (hashed once) and every stored file is one of the shared assets
+    for asset in [ASSET_SUBMISSION_FEEDBACK_HTML, ASSET_PAYMENT_PROOF_PNG, ASSET_STUDENT_ID_PNG]:
+        storage_cli.copy(asset)
+    password = make_password(RANDOM_PASSWORD)
+    now = datetime.now()
+
+    with transaction.atomic():
+        User.objects.bulk_create(
+            [
+                User(
+                    email=RANDOM_EMAIL.format(i=i),
+                    password=password,
+                    email_confirmed=True,
+                    code_of_conduct_accepted=True,
+                    applying_for_scholarship=rng.random() < 0.05,
+                )
+                for i in range(n)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        users = list(User.objects.filter(email__startswith="random_").order_by("id"))
+
+        # ~90% created a profile, ~80% of those started the coding test
+        users = [u for u in users if rng.random() < 0.9]
+        Profile.objects.bulk_create(
+            [
+                Profile(
+                    user=u,
+                    full_name=f"Random User {u.id}",
+                    profession=f"Random Profession {u.id}",
+                    gender=choose(rng, GENDERS),
+                    ticket_type=(
+                        ProfileTicketTypes.scholarship if u.applying_for_scholarship else choose(rng, TICKET_TYPES[:3])
+                    ),
+                )
+                for u in users
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        users = [u for u in users if rng.random() < 0.8]
+        Application.objects.bulk_create(
+            [
+                Application(user=u, coding_test_started_at=now - timedelta(minutes=rng.randrange(0, 60 * 24 * 30)))
+                for u in users
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        applications = Application.objects.filter(user__email__startswith="random_").select_related("user")
+
+        # 1 to 5 attempts per submission type, scores around 75 (the best one improving with the attempts)
+        submissions: List[Submission] = []
+        passed: List[User] = []
+        for application in applications.iterator():
+            best_scores = []
+            for submission_type in SUBMISSION_TYPES:
+                skill = rng.gauss(75, 15)
+                scores = [max(0, min(100, int(skill + rng.gauss(0, 8) + 3 * j))) for j in range(rng.randint(1, 5))]
+                best_scores.append(max(scores))
+                submissions.extend(
+                    Submission(
+                        application=application,
+                        submission_type=submission_type.uname,
+                        score=score,
+                        file_location="404",
+                        feedback_location=ASSET_SUBMISSION_FEEDBACK_HTML,
+                    )
+                    for score in scores
+                )
+            if min(best_scores) >= 65:
+                passed.append(application.user)
+        Submission.objects.bulk_create(submissions, batch_size=BATCH_SIZE)
+        # bulk inserts don't update the applications status counts
+        StatusCounts.rebuild()
+
+        # selections of the candidates that passed, documents for the ones that were selected
+        Selection.objects.bulk_create(
+            [
+                Selection(
+                    user=u,
+                    status=choose(rng, SELECTION_STATUSES),
+                    draw_rank=i,
+                    payment_value=250,
+                    payment_due_date=now + timedelta(days=7),
+                )
+                for i, u in enumerate(passed)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        documents = [
+            SelectionDocument(selection=selection, file_location=ASSET_PAYMENT_PROOF_PNG, doc_type="payment_proof")
+            for selection in Selection.objects.filter(
+                user__email__startswith="random_",
+                status__in=[SelectionStatus.TO_BE_ACCEPTED, SelectionStatus.ACCEPTED, SelectionStatus.REJECTED],
+            ).iterator()
+        ]
+        SelectionDocument.objects.bulk_create(documents, batch_size=BATCH_SIZE)
@@ -0,0 +1,81 @@
+import json
+import os
+import random
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, teardown_databases
+
+from benchmarks import compare, run_benchmark
+from benchmarks.suite import get_benchmarks, local_clients
+from common.management.commands.generate_fixtures import SIZES, generate_random_candidates
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(settings.BASE_DIR), "benchmarks", "baseline.json")
+
+
+class Command(BaseCommand):
+    help = "Benchmarks the domain functions on a test database with generated fixtures"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--size", type=str, default="small", help=f"random candidates: {' | '.join(SIZES)}")
+        parser.add_argument("--sample", type=int, default=100, help="candidates per benchmark")
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--only", type=str, default="", help="benchmarks whose name contains this")
+        parser.add_argument("--output", type=str, help="json results file")
+        parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE)
+        parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+        parser.add_argument("--tolerance", type=float, default=0.5, help="allowed wall time / memory increase")
+
+    def handle(self, *args, **options) -> None:
+        if options["size"] not in SIZES:
+            raise CommandError(f"invalid --size `{options['size']}`")
+        params = {"size": options["size"], "sample": options["sample"], "seed": options["seed"]}
+
+        # never on the configured database: fixtures are generated in a test database, dropped at the end
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            self.stdout.write(f"generating {SIZES[params['size']]} random candidates...")
+            generate_random_candidates(SIZES[params["size"]], rng=random.Random(params["seed"]))
+
+            results = {}
+            with local_clients():
+                for benchmark in get_benchmarks(params["sample"]):
+                    if options["only"] not in benchmark.name:
+                        continue
+                    result = run_benchmark(benchmark, repeat=options["repeat"])
+                    results[result.name] = result.as_dict()
+                    self.stdout.write(
+                        f"{result.name}: queries={result.queries}, wall_time={result.wall_time_ms:.1f} ms"
+                        f" (min {result.min_wall_time_ms:.1f} ms), peak_memory={result.peak_memory_kb:.0f} KB"
+                    )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        report = {**params, "results": results}
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+
+        if options["update_baseline"]:
+            with open(options["baseline"], "w") as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"baseline updated: {options['baseline']}"))
+            return
+
+        if not os.path.exists(options["baseline"]):
+            self.stdout.write(self.style.WARNING(f"no baseline to compare with: {options['baseline']}"))
+            return
+
+        with open(options["baseline"]) as f:
+            baseline = json.load(f)
+        baseline_params = {k: baseline.get(k) for k in params}
+        if baseline_params != params:
+            raise CommandError(f"the baseline was generated with different parameters: {baseline_params}")
+
+        regressions = compare(results, baseline["results"], tolerance=options["tolerance"])
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(f"regression: {regression}"))
+        if regressions:
+            raise CommandError(f"{len(regressions)} regressions")
+        self.stdout.write(self.style.SUCCESS("No regressions!"))
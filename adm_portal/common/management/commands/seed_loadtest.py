@@ -0,0 +1,113 @@
+import random
+from datetime import datetime, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from applications.models import Application, Submission, SubmissionTypes
+from applications.status_counts import StatusCounts
+from interface import interface
+from profiles.models import Profile, ProfileGenders, ProfileTicketTypes
+from selection.models import Selection
+from selection.status import SelectionStatus
+from users.models import User
+
+# accounts used by `loadtest.py`
+STAFF_EMAIL = "loadtest-staff@adm.com"
+CANDIDATE_EMAIL = "loadtest-candidate-{i}@adm.com"
+
+STATUSES = [
+    SelectionStatus.PASSED_TEST,
+    SelectionStatus.DRAWN,
+    SelectionStatus.INTERVIEW,
+    SelectionStatus.SELECTED,
+    SelectionStatus.TO_BE_ACCEPTED,
+    SelectionStatus.ACCEPTED,
+    SelectionStatus.REJECTED,
+    SelectionStatus.NOT_SELECTED,
+]
+
+
+class Command(BaseCommand):
+    help = "Seeds the accounts and data `loadtest.py` runs against (loadtest settings)"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--candidates", type=int, default=200, help="seeded candidates (with applications)")
+        parser.add_argument("--password", type=str, default="loadtest")
+
+    def handle(self, *args, **options) -> None:
+        if User.objects.filter(email=STAFF_EMAIL).exists():
+            raise CommandError("already seeded")
+
+        # signups and applications open for the whole test
+        ff = interface.feature_flag_client
+        ff.open_signups()
+        ff.set_applications_opening_date(datetime.now() - timedelta(days=1))
+        ff.set_applications_closing_date(datetime.now() + timedelta(days=30))
+        ff.set_coding_test_duration(60 * 24 * 7)  # uploads are accepted for the whole test
+        ff.open_payment_profs()
+
+        password = make_password(options["password"])
+        with transaction.atomic():
+            User.objects.create_staff_user(email=STAFF_EMAIL, password=options["password"])
+
+            # candidates with a profile and a started coding test, half of them through the selection
+            n = options["candidates"]
+            User.objects.bulk_create(
+                [
+                    User(
+                        email=CANDIDATE_EMAIL.format(i=i),
+                        password=password,
+                        email_confirmed=True,
+                        code_of_conduct_accepted=True,
+                        applying_for_scholarship=False,
+                    )
+                    for i in range(n)
+                ]
+            )
+            users = list(User.objects.filter(email__in=[CANDIDATE_EMAIL.format(i=i) for i in range(n)]))
+
+            Profile.objects.bulk_create(
+                [
+                    Profile(
+                        user=u,
+                        full_name=f"Load Test {u.id}",
+                        profession="Load Tester",
+                        gender=random.choice([ProfileGenders.female, ProfileGenders.male, ProfileGenders.other]),
+                        ticket_type=random.choice([ProfileTicketTypes.regular, ProfileTicketTypes.student]),
+                    )
+                    for u in users
+                ]
+            )
+            Application.objects.bulk_create(
+                [Application(user=u, coding_test_started_at=datetime.now() - timedelta(minutes=10)) for u in users]
+            )
+            Submission.objects.bulk_create(
+                [
+                    Submission(
+                        application=a,
+                        submission_type=submission_type.uname,
+                        score=random.randrange(60, 100),
+                        file_location="404",
+                        feedback_location="404",
+                    )
+                    for a in Application.objects.filter(user__in=users)
+                    for submission_type in [
+                        SubmissionTypes.coding_test,
+                        SubmissionTypes.slu01,
+                        SubmissionTypes.slu02,
+                        SubmissionTypes.slu03,
+                    ]
+                ]
+            )
+            Selection.objects.bulk_create(
+                [
+                    Selection(user=u, status=STATUSES[i % len(STATUSES)], draw_rank=i, payment_value=250)
+                    for i, u in enumerate(users[: n // 2])
+                ]
+            )
+            # bulk inserts don't update the applications status counts
+            StatusCounts.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(f"seeded {STAFF_EMAIL} and {n} candidates"))
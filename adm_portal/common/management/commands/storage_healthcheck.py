@@ -1,16 +1,17 @@
-import os
-
-import boto3
-from botocore.errorfactory import ClientError
 from django.core.management.base import BaseCommand, CommandError
 
-from applications.domain import Domain
+from common.storage_health import check_keys, get_expected_keys
+from storage_client import AWSS3StorageClient, LocalStorageClient, StorageClient
+from storage_client.content_addressed import ContentAddressedStorageClient
 
 
 class Command(BaseCommand):
     def add_arguments(self, parser) -> None:
         parser.add_argument("--bucket", type=str)
         parser.add_argument("--dir", type=str)
+        parser.add_argument("--workers", type=int, default=8, help="keys checked at a time")
+        parser.add_argument("--warm-urls", action="store_true", help="also generate the keys urls")
+        parser.add_argument("--verify-blobs", action="store_true", help="re-hash the content addressed storage blobs")
 
     def handle(self, *args, **options) -> None:
         bucket = options["bucket"]
@@ -19,45 +20,28 @@ class Command(BaseCommand):
         if bucket is None and directory is None:
             raise CommandError("you need to specify --bucket or --dir")
 
-        expected_keys = {
-            # "key": "description",
-            "public-assets/ldssa_logo.png": "this is LDSA Logo, displayed in the login/signup pages",
-            Domain.get_candidate_release_zip(
-                "coding_test"
-            ): "this is the candidate nbgrader `coding_test` release, the one candidates can donwload",
-            Domain.get_candidate_release_zip(
-                "slu01"
-            ): "this is the candidate nbgrader `slu01` release, the one candidates can donwload",
-            Domain.get_candidate_release_zip(
-                "slu02"
-            ): "this is the candidate nbgrader `slu02` release, the one candidates can donwload",
-            Domain.get_candidate_release_zip(
-                "slu03"
-            ): "this is the candidate nbgrader `slu03` release, the one candidates can donwload",
-        }
+        storage: StorageClient = AWSS3StorageClient(bucket) if bucket is not None else LocalStorageClient(directory)
 
         fail = False
-        if bucket is not None:
-            s3 = boto3.client("s3")
-
-            for k, d in expected_keys.items():
-                try:
-                    s3.head_object(Bucket=bucket, Key=k)
-                    self.stdout.write(f"{k} -> " + self.style.SUCCESS("found."))
-                except ClientError:
-                    self.stdout.write(f"{k} -> " + self.style.ERROR("not found."))
-                    fail = True
-
-        elif directory is not None:
-            for k, d in expected_keys.items():
-                if os.path.isfile(os.path.join(directory, k)):
-                    self.stdout.write(f"{k} -> " + self.style.SUCCESS("found."))
+        for h in check_keys(storage, get_expected_keys(), workers=options["workers"], warm_urls=options["warm_urls"]):
+            if h.info is not None:
+                self.stdout.write(
+                    f"{h.key} -> "
+                    + self.style.SUCCESS("found.")
+                    + f" (size={h.info.size}, etag={h.info.etag}, {h.latency * 1000:.1f} ms)"
+                )
+            else:
+                self.stdout.write(f"{h.key} -> " + self.style.ERROR(f"not found. {h.error or ''}"))
+                self.stdout.write(self.style.WARNING(h.description))
+                fail = True
+
+        if options["verify_blobs"]:
+            for checksum, ok in ContentAddressedStorageClient(storage).verify_blobs():
+                if ok:
+                    self.stdout.write(f"blob {checksum} -> " + self.style.SUCCESS("verified."))
                 else:
-                    self.stdout.write(f"{k} -> " + self.style.ERROR("not found."))
-                    self.stdout.write(self.style.WARNING(d))
+                    self.stdout.write(f"blob {checksum} -> " + self.style.ERROR("missing or corrupted."))
                     fail = True
-        else:
-            raise Exception
 
         if fail:
             raise CommandError("At least one key is missing...")
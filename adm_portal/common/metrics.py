@@ -0,0 +1,75 @@
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, List, Tuple
+
+# per process metrics of the `interface` clients calls (see `common.request_metrics.TimedClient`)
+# exposed in the prometheus text format by `/ops/metrics`
+
+# seconds
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+
+class _MethodMetrics:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        # calls per bucket (not cumulative), the last one is +Inf
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total_time = 0.0
+
+
+class ClientMetrics:
+    def __init__(self) -> None:
+        self._methods: Dict[Tuple[str, str], _MethodMetrics] = {}
+        self._lock = Lock()
+
+    def observe(self, client: str, method: str, duration: float, *, error: bool = False) -> None:
+        with self._lock:
+            m = self._methods.get((client, method))
+            if m is None:
+                m = self._methods[(client, method)] = _MethodMetrics()
+            m.calls += 1
+            m.errors += int(error)
+            m.buckets[bisect_left(LATENCY_BUCKETS, duration)] += 1
+            m.total_time += duration
+
+    def reset(self) -> None:
+        with self._lock:
+            self._methods = {}
+
+    def render(self) -> str:
+        # prometheus text exposition format (error rate: `adm_client_errors_total / adm_client_calls_total`)
+        with self._lock:
+            methods = sorted((k, (m.calls, m.errors, list(m.buckets), m.total_time)) for k, m in self._methods.items())
+
+        calls: List[str] = []
+        errors: List[str] = []
+        latency: List[str] = []
+        for (client, method), (n, n_errors, buckets, total_time) in methods:
+            labels = f'client="{client}",method="{method}"'
+            calls.append(f"adm_client_calls_total{{{labels}}} {n}")
+            errors.append(f"adm_client_errors_total{{{labels}}} {n_errors}")
+            cumulative = 0
+            for le, count in zip([*[str(b) for b in LATENCY_BUCKETS], "+Inf"], buckets):
+                cumulative += count
+                latency.append(f'adm_client_call_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            latency.append(f"adm_client_call_duration_seconds_sum{{{labels}}} {total_time}")
+            latency.append(f"adm_client_call_duration_seconds_count{{{labels}}} {n}")
+
+        return "\n".join(
+            [
+                "# HELP adm_client_calls_total Interface client calls.",
+                "# TYPE adm_client_calls_total counter",
+                *calls,
+                "# HELP adm_client_errors_total Interface client calls that raised.",
+                "# TYPE adm_client_errors_total counter",
+                *errors,
+                "# HELP adm_client_call_duration_seconds Interface client calls latency.",
+                "# TYPE adm_client_call_duration_seconds histogram",
+                *latency,
+                "",
+            ]
+        )
+
+
+client_metrics = ClientMetrics()
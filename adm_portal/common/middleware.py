@@ -0,0 +1,110 @@
+import asyncio
+import json
+import random
+from logging import getLogger
+from time import perf_counter
+from typing import Any, Callable
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+from interface import interface
+
+from .profiling import profiler, start_profile
+from .request_metrics import RequestMetrics, install_query_recorder, reset_request_metrics, set_request_metrics
+
+logger = getLogger(__name__)
+
+
+class SyncAndAsyncMiddleware:
+    # runs in the mode of the chain it's in: sync (wsgi) or async (asgi, so the async views aren't run
+    # in a thread), `__call__` returns a coroutine in the async mode
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)  # type: ignore
+
+
+class RequestMetricsMiddleware(SyncAndAsyncMiddleware):
+    # wall time, sql queries and `interface` clients time of every request (see `common.request_metrics`)
+    # logged as a json line (a warning when there are duplicate / repeated queries)
+    # and sent in the `Server-Timing` header to staff users (browser dev tools)
+    # first in `MIDDLEWARE`, so it measures the other middlewares too
+    def __call__(self, request: HttpRequest) -> Any:
+        if self.is_async:
+            return self.acall(request)
+
+        metrics = RequestMetrics()
+        token = set_request_metrics(metrics)
+        try:
+            install_query_recorder()
+            response = self.get_response(request)
+        finally:
+            reset_request_metrics(token)
+        metrics.stop()
+
+        return self.report(request, response, metrics)
+
+    async def acall(self, request: HttpRequest) -> HttpResponse:
+        metrics = RequestMetrics()
+        token = set_request_metrics(metrics)
+        try:
+            # the queries run in django's sync thread
+            await sync_to_async(install_query_recorder)()
+            response = await self.get_response(request)
+        finally:
+            reset_request_metrics(token)
+        metrics.stop()
+
+        # `request.user` may not be loaded yet
+        return await sync_to_async(self.report)(request, response, metrics)
+
+    @staticmethod
+    def report(request: HttpRequest, response: HttpResponse, metrics: RequestMetrics) -> HttpResponse:
+        data = {"method": request.method, "path": request.path, "status": response.status_code, **metrics.as_dict()}
+        if data["duplicate_queries"] or data["repeated_queries"]:
+            logger.warning(f"request metrics: {json.dumps(data)}")
+        else:
+            logger.info(f"request metrics: {json.dumps(data)}")
+
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated and user.is_staff:
+            response["Server-Timing"] = metrics.server_timing()
+
+        return response
+
+
+class ProfilingMiddleware(SyncAndAsyncMiddleware):
+    # cProfile of a `PROFILING_SAMPLE_RATE` fraction of the requests, and of staff requests with the
+    # `PROFILING_HEADER` header (written to the storage right away), aggregated per route (see `common.profiling`)
+    # after `AuthenticationMiddleware` in `MIDDLEWARE`
+    # wsgi only: cProfile follows one thread, an asgi request runs in the event loop and in django's sync thread
+    def __call__(self, request: HttpRequest) -> Any:
+        if self.is_async:
+            return self.get_response(request)
+
+        requested = bool(request.headers.get(settings.PROFILING_HEADER)) and request.user.is_staff
+        if not requested and random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+
+        profile = start_profile()
+        if profile is None:
+            return self.get_response(request)
+
+        start = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profile.disable()
+        duration = perf_counter() - start
+
+        match = request.resolver_match
+        route = match.route if match is not None else "<unresolved>"
+        profiler.add(interface.storage_client, route, profile, duration, flush=requested)
+
+        return response
@@ -0,0 +1,25 @@
+# Generated by Django 3.0.14 on 2026-10-19 17:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="RouteProfile",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("route", models.CharField(db_index=True, max_length=255)),
+                ("key", models.CharField(max_length=1024, unique=True)),
+                ("requests", models.IntegerField()),
+                ("total_time", models.FloatField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,14 @@
+from django.db import models
+
+
+class RouteProfile(models.Model):
+    # cProfile stats of the profiled requests of `route` in one server process (see `common.profiling`)
+    # the stats (pstats `dump_stats` format) are in the storage, at `key`
+    route = models.CharField(null=False, max_length=255, db_index=True)
+    key = models.CharField(null=False, max_length=1024, unique=True)
+    requests = models.IntegerField(null=False)
+    # seconds, wall time of the profiled requests
+    total_time = models.FloatField(null=False)
+
+    updated_at = models.DateTimeField(auto_now=True)
+    created_at = models.DateTimeField(auto_now_add=True)
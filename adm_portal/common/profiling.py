@@ -0,0 +1,145 @@
+import cProfile
+import marshal
+import os
+import pstats
+import re
+import socket
+from io import BytesIO
+from logging import getLogger
+from threading import Lock
+from time import monotonic
+from typing import Dict, List, NamedTuple, Optional
+
+from storage_client import StorageClient
+
+from .models import RouteProfile
+
+logger = getLogger(__name__)
+
+# aggregated cProfile stats of the profiled requests, per route, written to the storage by each server process
+# (`profiles/<route>/<host>-<pid>.prof`, indexed by `RouteProfile`)
+PROFILES_PREFIX = "profiles"
+
+
+class FunctionStats(NamedTuple):
+    function: str
+    calls: int
+    tottime: float  # seconds, in the function itself
+    cumtime: float  # seconds, including the functions it called
+
+
+def get_route_key(route: str, process: str) -> str:
+    slug = re.sub(r"[^a-zA-Z0-9_-]+", "-", route).strip("-") or "root"
+    return f"{PROFILES_PREFIX}/{slug}/{process}.prof"
+
+
+def load_stats(data: bytes) -> pstats.Stats:
+    stats = pstats.Stats()
+    stats.stats = marshal.loads(data)  # type: ignore
+    return stats
+
+
+def dump_stats(stats: pstats.Stats) -> bytes:
+    return marshal.dumps(stats.stats)  # type: ignore
+
+
+def get_top_functions(stats: pstats.Stats, n: int = 30) -> List[FunctionStats]:
+    # by own time (tottime)
+    functions = [
+        FunctionStats(
+            function=f"{name} ({os.sep.join(filename.split(os.sep)[-2:])}:{line})",
+            calls=nc,
+            tottime=tt,
+            cumtime=ct,
+        )
+        for (filename, line, name), (_, nc, tt, ct, _) in stats.stats.items()  # type: ignore
+    ]
+    return sorted(functions, key=lambda f: f.tottime, reverse=True)[:n]
+
+
+def load_route_stats(storage: StorageClient, route: str) -> Optional[pstats.Stats]:
+    # every process stats of `route`, merged
+    merged: Optional[pstats.Stats] = None
+    for route_profile in RouteProfile.objects.filter(route=route).order_by("id"):
+        try:
+            stats = load_stats(b"".join(storage.read_chunks(route_profile.key)))
+        except Exception as e:
+            logger.warning(f"can't load profile `{route_profile.key}`: {e}")
+            continue
+        if merged is None:
+            merged = stats
+        else:
+            merged.add(stats)
+    return merged
+
+
+class _RouteStats:
+    def __init__(self) -> None:
+        self.stats = pstats.Stats()
+        self.requests = 0
+        self.total_time = 0.0
+        self.pending = 0
+        self.flushed_at = monotonic()
+
+
+class Profiler:
+    # aggregates the requests profiles in memory, per route, since the process started
+    # a route is written to the storage every `flush_every` profiled requests or `flush_interval` seconds
+    def __init__(self, *, flush_every: int = 10, flush_interval: float = 60) -> None:
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._routes: Dict[str, _RouteStats] = {}
+        self._lock = Lock()
+
+    @property
+    def process(self) -> str:
+        # not computed once: the server may fork the process after the import
+        return f"{socket.gethostname()}-{os.getpid()}"
+
+    def add(
+        self, storage: StorageClient, route: str, profile: cProfile.Profile, duration: float, *, flush: bool = False
+    ) -> None:
+        with self._lock:
+            route_stats = self._routes.setdefault(route, _RouteStats())
+            route_stats.stats.add(profile)
+            route_stats.requests += 1
+            route_stats.total_time += duration
+            route_stats.pending += 1
+
+            flush = (
+                flush
+                or route_stats.pending >= self.flush_every
+                or monotonic() - route_stats.flushed_at >= self.flush_interval
+            )
+            if not flush:
+                return
+            data = dump_stats(route_stats.stats)
+            requests, total_time = route_stats.requests, route_stats.total_time
+            route_stats.pending = 0
+            route_stats.flushed_at = monotonic()
+
+        self.flush(storage, route, data, requests=requests, total_time=total_time)
+
+    def flush(self, storage: StorageClient, route: str, data: bytes, *, requests: int, total_time: float) -> None:
+        key = get_route_key(route, self.process)
+        try:
+            storage.save(key, BytesIO(data))
+            RouteProfile.objects.update_or_create(
+                key=key, defaults={"route": route, "requests": requests, "total_time": total_time}
+            )
+        except Exception as e:
+            # profiling must never break a request
+            logger.warning(f"can't save profile `{key}`: {e}")
+
+
+profiler = Profiler()
+
+
+def start_profile() -> Optional[cProfile.Profile]:
+    # None if another profiler is running
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        return None
+    return profile
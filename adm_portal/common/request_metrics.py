@@ -0,0 +1,171 @@
+import functools
+import inspect
+from collections import Counter
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from django.db import connection
+
+from .metrics import client_metrics
+
+# where the time of a request goes: sql queries and `interface` clients calls
+# collected by `common.middleware.RequestMetricsMiddleware` for the request being handled (if any)
+
+# statements (same sql, any params) executed at least this many times in a request are flagged as repeated (N+1)
+REPEATED_QUERY_THRESHOLD = 5
+SLOWEST_QUERIES = 3
+
+
+class QueryRecord(NamedTuple):
+    sql: str
+    params: str
+    duration: float
+
+
+class RequestMetrics:
+    def __init__(self) -> None:
+        self.start = perf_counter()
+        self.duration: Optional[float] = None
+        self.queries: List[QueryRecord] = []
+        self.clients: Dict[str, float] = {}
+
+    def stop(self) -> None:
+        self.duration = perf_counter() - self.start
+
+    def sql_wrapper(self, execute: Callable[..., Any], sql: str, params: Any, many: bool, context: Any) -> Any:
+        # `connection.execute_wrapper`
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(QueryRecord(sql, repr(params), perf_counter() - start))
+
+    def add_client_time(self, client: str, duration: float) -> None:
+        self.clients[client] = self.clients.get(client, 0) + duration
+
+    @property
+    def sql_time(self) -> float:
+        return sum(q.duration for q in self.queries)
+
+    def slowest_queries(self, n: int = SLOWEST_QUERIES) -> List[QueryRecord]:
+        return sorted(self.queries, key=lambda q: q.duration, reverse=True)[:n]
+
+    def duplicate_queries(self) -> Dict[str, int]:
+        # same sql and params, executed more than once
+        counts = Counter((q.sql, q.params) for q in self.queries)
+        return {sql: n for (sql, _), n in counts.items() if n > 1}
+
+    def repeated_queries(self) -> Dict[str, int]:
+        # same sql, different params (a query per row)
+        counts = Counter(q.sql for q in self.queries)
+        return {sql: n for sql, n in counts.items() if n >= REPEATED_QUERY_THRESHOLD}
+
+    def server_timing(self) -> str:
+        # `Server-Timing` header value (durations in ms)
+        timings: List[Tuple[str, float, str]] = [
+            ("total", self.duration or 0, ""),
+            ("sql", self.sql_time, f"{len(self.queries)} queries"),
+            *[(client, duration, "") for client, duration in sorted(self.clients.items())],
+        ]
+        return ", ".join(
+            f"{name};dur={duration * 1000:.1f}" + (f';desc="{desc}"' if desc else "")
+            for name, duration, desc in timings
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "duration_ms": round((self.duration or 0) * 1000, 1),
+            "queries": len(self.queries),
+            "sql_ms": round(self.sql_time * 1000, 1),
+            "slowest_queries": [
+                {"sql": q.sql[:300], "ms": round(q.duration * 1000, 1)} for q in self.slowest_queries()
+            ],
+            "duplicate_queries": self.duplicate_queries(),
+            "repeated_queries": self.repeated_queries(),
+            "clients_ms": {client: round(duration * 1000, 1) for client, duration in self.clients.items()},
+        }
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def get_request_metrics() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+def set_request_metrics(metrics: Optional[RequestMetrics]) -> Any:
+    # returns the token to `reset_request_metrics` with
+    return _current.set(metrics)
+
+
+def reset_request_metrics(token: Any) -> None:
+    _current.reset(token)
+
+
+def record_query(execute: Callable[..., Any], sql: str, params: Any, many: bool, context: Any) -> Any:
+    # `connection.execute_wrapper` of the request threads (see `install_query_recorder`):
+    # the query is added to the metrics of the request being handled, if any
+    metrics = get_request_metrics()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics.sql_wrapper(execute, sql, params, many, context)
+
+
+def install_query_recorder() -> None:
+    # on the connection of the calling thread, once
+    # (the asgi requests run their queries in django's sync thread, not in the thread of the middleware)
+    # first: the `connection.execute_wrapper` blocks remove their wrapper from the end
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+class TimedClient:
+    # proxy to `client`: the time spent in its methods is added to the current request metrics as `name`,
+    # and every public method call is counted / timed in `client_metrics` (per method, with errors)
+    def __init__(self, name: str, client: Any) -> None:
+        self._name = name
+        self._client = client
+
+    def __getattr__(self, attr: str) -> Any:
+        value = getattr(self._client, attr)
+        if not callable(value):
+            return value
+
+        if inspect.iscoroutinefunction(value):
+            # the async methods (`asave`, `agrade`, ...) are timed until they're done
+
+            @functools.wraps(value)
+            async def atimed(*args: Any, **kwargs: Any) -> Any:
+                start = perf_counter()
+                error = False
+                try:
+                    return await value(*args, **kwargs)
+                except BaseException:
+                    error = True
+                    raise
+                finally:
+                    self._observe(attr, perf_counter() - start, error)
+
+            return atimed
+
+        @functools.wraps(value)
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            start = perf_counter()
+            error = False
+            try:
+                return value(*args, **kwargs)
+            except BaseException:
+                error = True
+                raise
+            finally:
+                self._observe(attr, perf_counter() - start, error)
+
+        return timed
+
+    def _observe(self, attr: str, duration: float, error: bool) -> None:
+        if not attr.startswith("_"):
+            client_metrics.observe(self._name, attr, duration, error=error)
+        metrics = get_request_metrics()
+        if metrics is not None:
+            metrics.add_client_time(self._name, duration)
@@ -1,7 +1,42 @@
-from django.http import HttpRequest
+import asyncio
+import functools
+from typing import Any, Callable, List
+
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, HttpResponse, HttpResponseNotAllowed
+from django.utils.datastructures import MultiValueDict
+from django.utils.log import log_response
+from django.views.decorators import http
 
 
 def get_url(request: HttpRequest) -> str:
     scheme = "https" if request.is_secure() else "http"
     host = request.get_host()
     return f"{scheme}://{host}"
+
+
+async def aget_files(request: HttpRequest) -> MultiValueDict:
+    # `request.FILES` for the async views: the multipart body is parsed (the big files written to disk)
+    # in a worker thread
+    return await sync_to_async(lambda: request.FILES, thread_sensitive=False)()
+
+
+def require_http_methods(methods: List[str]) -> Callable[[Callable[..., Any]], Any]:
+    # django's `require_http_methods`, for the async views too
+    def decorator(f: Callable[..., Any]) -> Callable[..., Any]:
+        if not asyncio.iscoroutinefunction(f):
+            return http.require_http_methods(methods)(f)
+
+        @functools.wraps(f)
+        async def view(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+            if request.method not in methods:
+                response = HttpResponseNotAllowed(methods)
+                log_response(
+                    f"Method Not Allowed ({request.method}): {request.path}", response=response, request=request
+                )
+                return response
+            return await f(request, *args, **kwargs)
+
+        return view
+
+    return decorator
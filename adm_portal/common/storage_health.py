@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+from time import monotonic
+from typing import Dict, List, NamedTuple, Optional
+
+from django.db import connections
+
+from applications.domain import Domain
+from storage_client import StorageClient, StorageClientException, StorageKeyInfo
+
+
+class KeyHealth(NamedTuple):
+    key: str
+    description: str
+    info: Optional[StorageKeyInfo]  # None if the key is missing (or couldn't be checked, see `error`)
+    latency: float  # seconds
+    error: Optional[str] = None
+
+    @property
+    def found(self) -> bool:
+        return self.info is not None
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "key": self.key,
+            "found": self.found,
+            "size": self.info.size if self.info is not None else None,
+            "etag": self.info.etag if self.info is not None else None,
+            "latency_ms": round(self.latency * 1000, 1),
+            "error": self.error,
+        }
+
+
+def get_expected_keys() -> Dict[str, str]:
+    # "key": "description"
+    return {
+        "public-assets/ldssa_logo.png": "this is LDSA Logo, displayed in the login/signup pages",
+        **{
+            Domain.get_candidate_release_zip(
+                submission_type
+            ): f"this is the candidate nbgrader `{submission_type}` release, the one candidates can donwload"
+            for submission_type in ["coding_test", "slu01", "slu02", "slu03"]
+        },
+    }
+
+
+def check_key(storage: StorageClient, key: str, description: str, *, warm_urls: bool = False) -> KeyHealth:
+    # warm_urls: also generates the key url (presigned url cache, storage client connection)
+    start = monotonic()
+    try:
+        info = storage.head(key)
+        if info is not None and warm_urls:
+            storage.get_url(key)
+    except StorageClientException as e:
+        return KeyHealth(key=key, description=description, info=None, latency=monotonic() - start, error=str(e))
+    return KeyHealth(key=key, description=description, info=info, latency=monotonic() - start)
+
+
+def _check_key_in_thread(storage: StorageClient, key: str, description: str, *, warm_urls: bool) -> KeyHealth:
+    # a storage client can query the db (content addressed keys), the connections of the worker thread are closed
+    try:
+        return check_key(storage, key, description, warm_urls=warm_urls)
+    finally:
+        connections.close_all()
+
+
+def check_keys(
+    storage: StorageClient,
+    keys: Dict[str, str],
+    *,
+    workers: int = 8,
+    timeout: Optional[float] = None,
+    warm_urls: bool = False,
+) -> List[KeyHealth]:
+    # checks every key concurrently, keys not checked within `timeout` seconds are reported as not found
+    executor = ThreadPoolExecutor(max_workers=max(1, min(workers, len(keys))))
+    futures = {
+        executor.submit(_check_key_in_thread, storage, key, description, warm_urls=warm_urls): (key, description)
+        for key, description in keys.items()
+    }
+    done, _ = wait(futures, timeout=timeout)
+    # don't wait for the slow checks
+    executor.shutdown(wait=False)
+
+    return [
+        (
+            future.result()
+            if future in done
+            else KeyHealth(key=key, description=description, info=None, latency=timeout or 0, error="timeout")
+        )
+        for future, (key, description) in futures.items()
+    ]
@@ -0,0 +1,23 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase
+
+from common.cache import get_candidate_state_data, invalidate_candidate_state, set_candidate_state_data
+
+
+class TestCandidateStateCache(TransactionTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_invalidate_candidate_state(self) -> None:
+        set_candidate_state_data(1, "state")
+        invalidate_candidate_state(1)
+        self.assertIsNone(get_candidate_state_data(1))
+
+    def test_invalidate_candidate_state_on_commit(self) -> None:
+        set_candidate_state_data(1, "state")
+        with transaction.atomic():
+            invalidate_candidate_state(1)
+            # a concurrent request caching the state it read before the commit
+            set_candidate_state_data(1, "stale state")
+        self.assertIsNone(get_candidate_state_data(1))
@@ -0,0 +1,51 @@
+import random
+import tempfile
+
+from django.test import TestCase
+
+from applications.models import Submission
+from common.management.commands import generate_fixtures
+from profiles.models import Profile
+from selection.models import Selection
+from storage_client import LocalStorageClient
+from users.models import User
+
+
+class TestGenerateFixtures(TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage_cli = generate_fixtures.storage_cli
+        generate_fixtures.storage_cli = LocalStorageClient(self.tmp.name)
+
+    def tearDown(self) -> None:
+        generate_fixtures.storage_cli = self.storage_cli
+        self.tmp.cleanup()
+
+    def test_generate_random_candidates(self) -> None:
+        generate_fixtures.generate_random_candidates(200, rng=random.Random(1))
+
+        self.assertEqual(User.objects.count(), 200)
+        user = User.objects.get(email="random_0@adm.com")
+        self.assertTrue(user.check_password(generate_fixtures.RANDOM_PASSWORD))
+        # single password hash
+        self.assertEqual(User.objects.values("password").distinct().count(), 1)
+
+        self.assertGreater(Profile.objects.count(), 0)
+        self.assertGreater(Selection.objects.count(), 0)
+        self.assertEqual(
+            set(Submission.objects.values_list("feedback_location", flat=True)),
+            {generate_fixtures.ASSET_SUBMISSION_FEEDBACK_HTML},
+        )
+        self.assertIsNotNone(generate_fixtures.storage_cli.head(generate_fixtures.ASSET_PAYMENT_PROOF_PNG))
+
+    def test_generate_random_candidates_seed(self) -> None:
+        generate_fixtures.generate_random_candidates(50, rng=random.Random(7))
+        first = list(Profile.objects.order_by("user__email").values_list("gender", "ticket_type"))
+        User.objects.all().delete()
+
+        generate_fixtures.generate_random_candidates(50, rng=random.Random(7))
+        self.assertEqual(list(Profile.objects.order_by("user__email").values_list("gender", "ticket_type")), first)
+
+    def test_get_size(self) -> None:
+        self.assertEqual(generate_fixtures.Command.get_size("medium"), 5_000)
+        self.assertEqual(generate_fixtures.Command.get_size("42"), 42)
@@ -0,0 +1,68 @@
+from django.test import Client, TestCase, override_settings
+
+from common.metrics import ClientMetrics, client_metrics
+from common.request_metrics import TimedClient
+from users.models import User
+
+
+class Grader:
+    def grade(self, fail: bool = False) -> int:
+        if fail:
+            raise Exception("grader unavailable")
+        return 100
+
+
+class TestClientMetrics(TestCase):
+    def test_render(self) -> None:
+        metrics = ClientMetrics()
+        metrics.observe("grader", "grade", 0.02)
+        metrics.observe("grader", "grade", 0.3, error=True)
+        metrics.observe("email", "send_signup_email", 50)
+
+        text = metrics.render()
+        self.assertIn('adm_client_calls_total{client="grader",method="grade"} 2', text)
+        self.assertIn('adm_client_errors_total{client="grader",method="grade"} 1', text)
+        self.assertIn('adm_client_call_duration_seconds_bucket{client="grader",method="grade",le="0.01"} 0', text)
+        self.assertIn('adm_client_call_duration_seconds_bucket{client="grader",method="grade",le="0.025"} 1', text)
+        self.assertIn('adm_client_call_duration_seconds_bucket{client="grader",method="grade",le="+Inf"} 2', text)
+        self.assertIn('adm_client_call_duration_seconds_count{client="grader",method="grade"} 2', text)
+        self.assertIn(
+            'adm_client_call_duration_seconds_bucket{client="email",method="send_signup_email",le="30.0"} 0', text
+        )
+        self.assertIn(
+            'adm_client_call_duration_seconds_bucket{client="email",method="send_signup_email",le="+Inf"} 1', text
+        )
+
+    def test_timed_client(self) -> None:
+        client_metrics.reset()
+        grader = TimedClient("grader", Grader())
+
+        self.assertEqual(grader.grade(), 100)
+        with self.assertRaises(Exception):
+            grader.grade(fail=True)
+
+        text = client_metrics.render()
+        self.assertIn('adm_client_calls_total{client="grader",method="grade"} 2', text)
+        self.assertIn('adm_client_errors_total{client="grader",method="grade"} 1', text)
+
+
+class TestOpsMetricsView(TestCase):
+    def test_ops_metrics(self) -> None:
+        User.objects.create_staff_user(email="staff@adm.com", password="staff")
+        client_metrics.reset()
+        client_metrics.observe("grader", "grade", 0.1)
+
+        # anonymous
+        self.assertEqual(Client().get("/ops/metrics").status_code, 302)
+
+        client = Client()
+        client.login(email="staff@adm.com", password="staff")
+        response = client.get("/ops/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn(b'adm_client_calls_total{client="grader",method="grade"} 1', response.content)
+
+    @override_settings(OPS_TOKEN="secret")
+    def test_ops_metrics_token(self) -> None:
+        self.assertEqual(Client().get("/ops/metrics", HTTP_AUTHORIZATION="Bearer secret").status_code, 200)
+        self.assertEqual(Client().get("/ops/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code, 302)
@@ -0,0 +1,87 @@
+import cProfile
+import tempfile
+
+from django.test import Client, TestCase
+
+from common.models import RouteProfile
+from common.profiling import Profiler, get_route_key, get_top_functions, load_route_stats
+from interface import interface
+from storage_client import LocalStorageClient
+from users.models import User
+
+
+def hot_function() -> int:
+    return sum(i * i for i in range(20_000))
+
+
+class TestProfiler(TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = LocalStorageClient(self.tmp.name)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def profile(self) -> cProfile.Profile:
+        profile = cProfile.Profile()
+        profile.runcall(hot_function)
+        return profile
+
+    def test_profiler(self) -> None:
+        profiler = Profiler(flush_every=2)
+
+        profiler.add(self.storage, "staff/home", self.profile(), 0.1)
+        self.assertFalse(RouteProfile.objects.exists())
+
+        profiler.add(self.storage, "staff/home", self.profile(), 0.2)
+        route_profile = RouteProfile.objects.get()
+        self.assertEqual(route_profile.route, "staff/home")
+        self.assertEqual(route_profile.key, get_route_key("staff/home", profiler.process))
+        self.assertEqual(route_profile.requests, 2)
+        self.assertAlmostEqual(route_profile.total_time, 0.3)
+
+        # forced flush
+        profiler.add(self.storage, "staff/home", self.profile(), 0.1, flush=True)
+        self.assertEqual(RouteProfile.objects.get().requests, 3)
+
+        stats = load_route_stats(self.storage, "staff/home")
+        top = [f for f in get_top_functions(stats) if f.function.startswith("hot_function ")]  # type: ignore
+        self.assertEqual(len(top), 1)
+        self.assertEqual(top[0].calls, 3)
+
+    def test_get_route_key(self) -> None:
+        self.assertEqual(
+            get_route_key("staff/candidates/<int:user_id>/", "h-1"), "profiles/staff-candidates-int-user_id/h-1.prof"
+        )
+        self.assertEqual(get_route_key("", "h-1"), "profiles/root/h-1.prof")
+
+
+class TestProfilingMiddleware(TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage_client = interface._storage_client
+        interface._storage_client = LocalStorageClient(self.tmp.name)
+        User.objects.create_staff_user(email="staff@adm.com", password="staff")
+        User.objects.create_user(email="candidate@adm.com", password="candidate")
+
+    def tearDown(self) -> None:
+        interface._storage_client = self.storage_client
+        self.tmp.cleanup()
+
+    def test_profile_header(self) -> None:
+        client = Client()
+        client.login(email="candidate@adm.com", password="candidate")
+        client.get("/candidate/home", HTTP_X_PROFILE="1")
+        self.assertFalse(RouteProfile.objects.exists())
+
+        client = Client()
+        client.login(email="staff@adm.com", password="staff")
+        client.get("/staff/home")
+        self.assertFalse(RouteProfile.objects.exists())
+
+        client.get("/staff/home", HTTP_X_PROFILE="1")
+        self.assertEqual(RouteProfile.objects.get().route, "staff/home")
+
+        response = client.get("/staff/profiling", {"route": "staff/home"})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "<code>")
@@ -0,0 +1,97 @@
+from time import sleep
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncClient, Client, TestCase
+
+from common.metrics import client_metrics
+from common.request_metrics import QueryRecord, RequestMetrics, TimedClient, reset_request_metrics, set_request_metrics
+from users.models import User
+
+
+class SlowClient:
+    name = "slow"
+
+    def call(self) -> str:
+        sleep(0.01)
+        return "done"
+
+    async def acall(self) -> str:
+        return await sync_to_async(self.call, thread_sensitive=False)()
+
+
+class TestRequestMetrics(TestCase):
+    def test_queries(self) -> None:
+        metrics = RequestMetrics()
+        metrics.queries = [
+            QueryRecord("SELECT a WHERE id = %s", "(1,)", 0.001),
+            QueryRecord("SELECT a WHERE id = %s", "(1,)", 0.002),
+            *[QueryRecord("SELECT b WHERE id = %s", f"({i},)", 0.001) for i in range(5)],
+            QueryRecord("SELECT c", "()", 0.5),
+        ]
+        metrics.clients = {"storage": 0.02}
+        metrics.stop()
+
+        self.assertEqual(metrics.duplicate_queries(), {"SELECT a WHERE id = %s": 2})
+        self.assertEqual(metrics.repeated_queries(), {"SELECT b WHERE id = %s": 5})
+        self.assertEqual([q.sql for q in metrics.slowest_queries(2)], ["SELECT c", "SELECT a WHERE id = %s"])
+        self.assertIn('sql;dur=508.0;desc="8 queries", storage;dur=20.0', metrics.server_timing())
+
+    def test_timed_client(self) -> None:
+        client = TimedClient("slow", SlowClient())
+        self.assertEqual(client.name, "slow")
+        # no request
+        self.assertEqual(client.call(), "done")
+
+        metrics = RequestMetrics()
+        token = set_request_metrics(metrics)
+        try:
+            client.call()
+            client.call()
+        finally:
+            reset_request_metrics(token)
+
+        self.assertGreaterEqual(metrics.clients["slow"], 0.02)
+
+    def test_timed_client_async(self) -> None:
+        client_metrics.reset()
+        client = TimedClient("slow", SlowClient())
+
+        metrics = RequestMetrics()
+        token = set_request_metrics(metrics)
+        try:
+            self.assertEqual(async_to_sync(client.acall)(), "done")
+        finally:
+            reset_request_metrics(token)
+
+        self.assertGreaterEqual(metrics.clients["slow"], 0.01)
+        self.assertIn('adm_client_calls_total{client="slow",method="acall"} 1', client_metrics.render())
+        client_metrics.reset()
+
+    def test_middleware(self) -> None:
+        User.objects.create_staff_user(email="staff@adm.com", password="staff")
+        User.objects.create_user(email="candidate@adm.com", password="candidate")
+
+        client = Client()
+        client.login(email="staff@adm.com", password="staff")
+        with self.assertLogs("common.middleware", level="INFO") as logs:
+            response = client.get("/staff/home")
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response["Server-Timing"], r'^total;dur=[\d.]+, sql;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertIn('"path": "/staff/home"', logs.output[0])
+
+        client = Client()
+        client.login(email="candidate@adm.com", password="candidate")
+        response = client.get("/candidate/home")
+        self.assertNotIn("Server-Timing", response)
+
+    def test_middleware_async(self) -> None:
+        # asgi: the queries run in django's sync thread, not in the middleware's
+        User.objects.create_staff_user(email="staff@adm.com", password="staff")
+
+        client = AsyncClient()
+        client.force_login(User.objects.get(email="staff@adm.com"))
+        with self.assertLogs("common.middleware", level="INFO") as logs:
+            response = async_to_sync(client.get)("/staff/home")
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response["Server-Timing"], r'^total;dur=[\d.]+, sql;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertIn('"path": "/staff/home"', logs.output[0])
@@ -0,0 +1,52 @@
+import os
+import tempfile
+from time import monotonic, sleep
+from typing import Optional
+
+from django.test import TestCase
+
+from common.storage_health import check_keys, get_expected_keys
+from storage_client import LocalStorageClient, StorageKeyInfo
+
+
+class SlowStorageClient(LocalStorageClient):
+    def head(self, key: str) -> Optional[StorageKeyInfo]:
+        sleep(0.2 if key != "slow" else 5)
+        return super().head(key)
+
+
+class TestStorageHealth(TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = SlowStorageClient(self.tmp.name)
+        for key in ["a", "b", "c", "slow"]:
+            self.storage.save(key, key.encode())
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_check_keys(self) -> None:
+        start = monotonic()
+        health = check_keys(self.storage, {"a": "A", "b": "B", "c": "C", "missing": "M"}, workers=4)
+
+        # concurrently
+        self.assertLess(monotonic() - start, 0.6)
+        self.assertEqual([h.key for h in health], ["a", "b", "c", "missing"])
+        self.assertEqual([h.found for h in health], [True, True, True, False])
+        self.assertEqual(health[0].info.size, 1)  # type: ignore
+        self.assertEqual(health[0].info.etag, self.storage.head("a").etag)  # type: ignore
+        self.assertGreater(health[0].latency, 0.1)
+
+    def test_check_keys_timeout(self) -> None:
+        start = monotonic()
+        health = check_keys(self.storage, {"a": "A", "slow": "S"}, timeout=0.5)
+
+        self.assertLess(monotonic() - start, 1)
+        self.assertEqual([h.found for h in health], [True, False])
+        self.assertEqual(health[1].error, "timeout")
+
+    def test_expected_keys(self) -> None:
+        keys = get_expected_keys()
+        self.assertIn("public-assets/ldssa_logo.png", keys)
+        self.assertEqual(len(keys), 5)
+        self.assertFalse(any(os.path.isabs(k) for k in keys))
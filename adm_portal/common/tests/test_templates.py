@@ -0,0 +1,14 @@
+from django.template import engines
+from django.test import TestCase
+
+from common.templates import precompile_templates
+
+
+class TestTemplates(TestCase):
+    def test_precompile_templates(self) -> None:
+        # DEBUG = False: cached loader
+        self.assertGreater(precompile_templates(), 0)
+
+        loader = engines["django"].engine.template_loaders[0]  # type: ignore
+        self.assertIn("./staff_templates/applications.html", loader.get_template_cache)
+        self.assertIn("./candidate_templates/home.html", loader.get_template_cache)
@@ -1,3 +1,5 @@
-from .client import EmailClient
+from .client import BulkEmailRecipient, EmailClient, EmailClientException, EmailDeliveryException
 from .elastic import ElasticEmailClient
-from .local import LocalEmailClient
+from .local import LocalEmail, LocalEmailClient, LocalEmailClientModes
+
+# `OutboxEmailClient` (`.outbox`) depends on this app's models, import it from `email_client.outbox`
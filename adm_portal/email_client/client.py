@@ -1,8 +1,41 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from asgiref.sync import sync_to_async
+
+
+class BulkEmailRecipient(NamedTuple):
+    to_email: str
+    merge: Dict[str, Any]  # the template method kwargs, e.g. {"to_name": "..."}
+    # the event the email is about (e.g. `selection:<id>`), the email is sent once per business key (see `EmailLedger`)
+    business_key: Optional[str] = None
+
+
+# called by `EmailClient._send_bulk` with the recipients the provider accepted, as they are sent
+SentCallback = Callable[[List[BulkEmailRecipient]], None]
+
+
+class EmailClientException(Exception):
+    pass
+
+
+class EmailDeliveryException(EmailClientException):
+    # the provider didn't send the email, `retryable` errors (timeouts, throttling, provider errors) may succeed later
+    def __init__(self, msg: str, *, retryable: bool) -> None:
+        super().__init__(msg)
+        self.retryable = retryable
 
 
 class EmailClient(ABC):
+    # templates (`EmailClient` method names) that can be sent with `send_bulk`
+    bulk_templates = [
+        "send_application_is_over_passed",
+        "send_application_is_over_failed",
+        "send_selected_and_payment_details",
+        "send_selected_interview_details",
+        "send_admissions_are_over_not_selected",
+    ]
+
     # account
     @abstractmethod
     def send_signup_email(self, to_email: str, *, email_confirmation_url: str) -> None:
@@ -36,7 +69,36 @@ class EmailClient(ABC):
     def send_payment_refused_proof_email(self, to_email: str, to_name: str, *, message: str) -> None:
         pass
 
+    # emails guarded by the `EmailLedger`
+    # (recipients with a business key that were already sent `template` are skipped)
+    def send_bulk(self, template: str, recipients: List[BulkEmailRecipient]) -> None:
+        if template not in self.bulk_templates:
+            raise EmailClientException(f"`{template}` is not a bulk template")
+
+        # imported here, the ledger depends on this app's models
+        from .ledger import EmailLedger
+
+        # recorded as they are sent: a send that fails part way keeps the recipients already sent
+        unsent = EmailLedger.get_unsent(template, recipients)
+        self._send_bulk(template, unsent, on_sent=lambda sent: EmailLedger.record(template, sent))
+
+    async def asend(self, template: str, **kwargs: Any) -> None:
+        # async callers (asgi views), any template: `await client.asend("send_contact_us_email", from_email=..., ...)`
+        # the template method runs in a worker thread, the event loop doesn't wait on the provider
+        await sync_to_async(getattr(self, template), thread_sensitive=False)(**kwargs)
+
+    def _send_bulk(
+        self, template: str, recipients: List[BulkEmailRecipient], *, on_sent: Optional[SentCallback] = None
+    ) -> None:
+        # sends `template` to every recipient, clients override it to do it in as few calls as possible
+        # `on_sent` only gets the recipients that were sent (clients that don't raise on errors must override it)
+        for recipient in recipients:
+            getattr(self, template)(to_email=recipient.to_email, **recipient.merge)
+            if on_sent is not None:
+                on_sent([recipient])
+
     # bulk emails
+
     # application is over
     @abstractmethod
     def send_application_is_over_passed(self, to_email: str, to_name: str) -> None:
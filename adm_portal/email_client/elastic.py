@@ -1,9 +1,13 @@
+import csv
+import io
 from logging import getLogger
-from typing import Any, Dict, Optional
+from time import perf_counter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from .client import EmailClient
+from .client import BulkEmailRecipient, EmailClient, EmailDeliveryException, SentCallback
 
 logger = getLogger(__name__)
 
@@ -11,15 +15,63 @@ logger = getLogger(__name__)
 ELASTIC_EMAIL_URL = "https://api.elasticemail.com/v2/"
 
 
-class ElasticEmailException(Exception):
+class ElasticEmailException(EmailDeliveryException):
     pass
 
 
+class ElasticCallMetrics(NamedTuple):
+    template_id: int
+    recipients: int
+    # "ok", "error" (elastic `success: false`), "http_<status code>", "timeout" or "connection_error"
+    status: str
+    latency: float  # seconds
+
+
+ElasticMetricsHook = Callable[[ElasticCallMetrics], None]
+
+
+class ElasticTemplate(NamedTuple):
+    template_id: int
+    subject: str
+
+
+# `EmailClient.bulk_templates`
+ELASTIC_BULK_TEMPLATES = {
+    "send_application_is_over_passed": ElasticTemplate(template_id=2687, subject="Keep your fingers crossed!"),
+    "send_application_is_over_failed": ElasticTemplate(template_id=2745, subject="Sorry! Try again next year"),
+    "send_admissions_are_over_not_selected": ElasticTemplate(template_id=2867, subject="Sorry! Try again next year"),
+    "send_selected_and_payment_details": ElasticTemplate(template_id=2891, subject="You’re ALMOST IN!"),
+    "send_selected_interview_details": ElasticTemplate(
+        template_id=3765, subject="LDSSA scholarship interview details"
+    ),
+}
+
+# recipients per merge send (csv rows)
+ELASTIC_BULK_CHUNK_SIZE = 1000
+
+
 class ElasticEmailClient(EmailClient):
-    def __init__(self, api_key: str, sender: str) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        sender: str,
+        *,
+        raise_errors: bool = False,
+        pool_size: int = 10,
+        connect_timeout: float = 5,
+        read_timeout: float = 30,
+        metrics_hook: Optional[ElasticMetricsHook] = None,
+    ) -> None:
         self.api_key = api_key
         self.url = ELASTIC_EMAIL_URL
         self.sender = sender  # sender email address
+        self.raise_errors = raise_errors  # raise `ElasticEmailException` when an email is not sent (to be retried)
+        self.timeout = (connect_timeout, read_timeout)
+        self.metrics_hook = metrics_hook  # called after every api call
+
+        # keep-alive connections, shared by the threads sending emails (`pool_size` should be >= number of threads)
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
 
     def _send_email(
         self, receiver: str, template_id: int, subject: str, *, merge: Optional[Dict[str, Any]] = None
@@ -36,23 +88,104 @@ class ElasticEmailClient(EmailClient):
         if merge is not None:
             data = {**data, **{f"merge_{k}": v for k, v in merge.items()}}
 
-        resp = requests.post(f"{self.url}/email/send", data=data)
+        self._post_email(data, template_id=template_id, to_email=receiver)
+
+    def _post_email(
+        self, data: Dict[str, Any], *, template_id: int, to_email: str, recipients: int = 1, files: Any = None
+    ) -> bool:
+        # returns whether elastic accepted the email (when it doesn't raise, see `raise_errors`)
+        start = perf_counter()
+        try:
+            resp = self.session.post(f"{self.url}/email/send", data=data, files=files, timeout=self.timeout)
+        except requests.Timeout:
+            self._fail(template_id, to_email, recipients, start, "timeout", retryable=True)
+            return False
+        except requests.ConnectionError:
+            self._fail(template_id, to_email, recipients, start, "connection_error", retryable=True)
+            return False
 
         if not resp.ok:
-            logger.error(
-                f"email not sent, response not ok: "
-                f"template_id={template_id}, to_email={receiver}, status_code={resp.status_code}"
-            )
-            return
+            # throttled or provider errors may succeed later, other (4xx) errors won't
+            retryable = resp.status_code == 429 or resp.status_code >= 500
+            self._fail(template_id, to_email, recipients, start, f"http_{resp.status_code}", retryable=retryable)
+            return False
         resp_json = resp.json()
         if not resp_json["success"]:
-            logger.error(
-                f"email not sent, response error: "
-                f"template_id={template_id}, to_email={receiver}, error={resp_json['error']}"
-            )
+            self._fail(template_id, to_email, recipients, start, "error", retryable=False, error=resp_json["error"])
+            return False
+
+        self._record(template_id, recipients, start, "ok")
+        logger.info(f"email sent: template_id={template_id}, to_email={to_email}")
+        return True
+
+    def _fail(
+        self,
+        template_id: int,
+        to_email: str,
+        recipients: int,
+        start: float,
+        status: str,
+        *,
+        retryable: bool,
+        error: Optional[str] = None,
+    ) -> None:
+        self._record(template_id, recipients, start, status)
+        msg = f"status={status}, retryable={retryable}" + (f", error={error}" if error is not None else "")
+        logger.error(f"email not sent: template_id={template_id}, to_email={to_email}, {msg}")
+        if self.raise_errors:
+            raise ElasticEmailException(f"email not sent: {msg}", retryable=retryable)
+
+    def _record(self, template_id: int, recipients: int, start: float, status: str) -> None:
+        if self.metrics_hook is None:
             return
+        metrics = ElasticCallMetrics(
+            template_id=template_id, recipients=recipients, status=status, latency=perf_counter() - start
+        )
+        try:
+            self.metrics_hook(metrics)
+        except Exception:
+            logger.exception("elastic email metrics hook failed")
+
+    def _send_template(self, to_email: str, template: str, merge: Dict[str, Any]) -> None:
+        t = ELASTIC_BULK_TEMPLATES[template]
+        self._send_email(to_email, t.template_id, t.subject, merge=merge)
+
+    def _send_bulk(
+        self, template: str, recipients: List[BulkEmailRecipient], *, on_sent: Optional[SentCallback] = None
+    ) -> None:
+        # merge send: one request per `ELASTIC_BULK_CHUNK_SIZE` recipients, with their merge fields in a csv attachment
+        # (each recipient gets its own email, the `merge_<k>` fields of `_send_email` are the csv columns)
+        t = ELASTIC_BULK_TEMPLATES[template]
+
+        for i in range(0, len(recipients), ELASTIC_BULK_CHUNK_SIZE):
+            j = i + ELASTIC_BULK_CHUNK_SIZE
+            chunk = recipients[i:j]
+            fields = sorted({k for r in chunk for k in r.merge})
 
-        logger.info(f"email sent: template_id={template_id}, to_email={receiver}")
+            csv_file = io.StringIO()
+            writer = csv.writer(csv_file)
+            writer.writerow(["ToEmail", *fields])
+            for r in chunk:
+                writer.writerow([r.to_email, *[r.merge.get(k, "") for k in fields]])
+
+            data = {
+                "apikey": self.api_key,
+                "from": self.sender,
+                "subject": t.subject,
+                "template": t.template_id,
+                "mergesourcefilename": "recipients.csv",
+                # no `msgBcc`, the sender would get a copy per recipient
+            }
+            files = {"attachmentfiles": ("recipients.csv", csv_file.getvalue().encode("utf-8"), "text/csv")}
+            sent = self._post_email(
+                data,
+                template_id=t.template_id,
+                to_email=f"<{len(chunk)} recipients>",
+                recipients=len(chunk),
+                files=files,
+            )
+            if sent and on_sent is not None:
+                on_sent(chunk)
 
     def send_signup_email(self, to_email: str, *, email_confirmation_url: str) -> None:
         subject = "Action needed: Confirm your email address"
@@ -67,30 +200,22 @@ class ElasticEmailClient(EmailClient):
         self._send_email(to_email, template_id, subject, merge=merge)
 
     def send_application_is_over_passed(self, to_email: str, to_name: str) -> None:
-        subject = "Keep your fingers crossed!"
-        template_id = 2687
-        merge = {"to_name": to_name}
-        self._send_email(to_email, template_id, subject, merge=merge)
+        self._send_template(to_email, "send_application_is_over_passed", {"to_name": to_name})
 
     def send_application_is_over_failed(self, to_email: str, to_name: str) -> None:
-        subject = "Sorry! Try again next year"
-        template_id = 2745
-        merge = {"to_name": to_name}
-        self._send_email(to_email, template_id, subject, merge=merge)
+        self._send_template(to_email, "send_application_is_over_failed", {"to_name": to_name})
 
     def send_admissions_are_over_not_selected(self, to_email: str, to_name: str) -> None:
-        subject = "Sorry! Try again next year"
-        template_id = 2867
-        merge = {"to_name": to_name}
-        self._send_email(to_email, template_id, subject, merge=merge)
+        self._send_template(to_email, "send_admissions_are_over_not_selected", {"to_name": to_name})
 
     def send_selected_and_payment_details(
         self, to_email: str, to_name: str, *, payment_value: int, payment_due_date: str
     ) -> None:
-        subject = "You’re ALMOST IN!"
-        template_id = 2891
-        merge = {"to_name": to_name, "payment_value": payment_value, "payment_due_date": payment_due_date}
-        self._send_email(to_email, template_id, subject, merge=merge)
+        self._send_template(
+            to_email,
+            "send_selected_and_payment_details",
+            {"to_name": to_name, "payment_value": payment_value, "payment_due_date": payment_due_date},
+        )
 
     def send_payment_accepted_proof_email(self, to_email: str, to_name: str, *, message: Optional[str] = None) -> None:
         subject = "You’re IN!"
@@ -125,10 +250,7 @@ class ElasticEmailClient(EmailClient):
         self._send_email(to_email, template_id, subject, merge=merge)
 
     def send_selected_interview_details(self, to_email: str, to_name: str) -> None:
-        subject = "LDSSA scholarship interview details"
-        template_id = 3765
-        merge = {"to_name": to_name}
-        self._send_email(to_email, template_id, subject, merge=merge)
+        self._send_template(to_email, "send_selected_interview_details", {"to_name": to_name})
 
     def send_contact_us_email(self, from_email: str, user_name: str, user_url: str, message: str) -> None:
         subject = f"[Admissions Portal] Support request from {from_email}"
@@ -0,0 +1,55 @@
+from typing import List
+
+from .client import BulkEmailRecipient
+from .models import EmailLedgerEntry
+
+
+class EmailLedger:
+    # remembers the emails sent for a (recipient, template, business key), so re-running an event doesn't re-send them
+    # entries are only recorded once the client sent the emails (per provider call, see `EmailClient._send_bulk`):
+    # a failed send is sent again by the next run
+    # (two concurrent runs of the same event may both send it)
+
+    @staticmethod
+    def get_unsent(template: str, recipients: List[BulkEmailRecipient]) -> List[BulkEmailRecipient]:
+        # the recipients with a business key that weren't sent `template` yet for it (each once),
+        # plus the recipients without a business key (never deduplicated)
+        keyed = [r for r in recipients if r.business_key is not None]
+        if not keyed:
+            return recipients
+
+        sent = set(
+            EmailLedgerEntry.objects.filter(
+                template=template,
+                business_key__in={r.business_key for r in keyed},
+                to_email__in={r.to_email for r in keyed},
+            ).values_list("business_key", "to_email")
+        )
+
+        unsent = []
+        for r in recipients:
+            if r.business_key is not None:
+                if (r.business_key, r.to_email) in sent:
+                    continue
+                sent.add((r.business_key, r.to_email))
+            unsent.append(r)
+        return unsent
+
+    @staticmethod
+    def record(template: str, recipients: List[BulkEmailRecipient]) -> None:
+        # entries recorded in the meantime by a concurrent run are kept
+        EmailLedgerEntry.objects.bulk_create(
+            [
+                EmailLedgerEntry(to_email=r.to_email, template=template, business_key=r.business_key)
+                for r in recipients
+                if r.business_key is not None
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+    @staticmethod
+    def is_sent(template: str, to_email: str, business_key: str) -> bool:
+        return EmailLedgerEntry.objects.filter(
+            template=template, to_email=to_email, business_key=business_key
+        ).exists()
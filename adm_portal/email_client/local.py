@@ -1,24 +1,124 @@
+import atexit
 import json
 import os
+from collections import deque
 from datetime import datetime
-from typing import Any, Optional
+from threading import Lock
+from time import monotonic
+from typing import IO, Any, Deque, Dict, List, NamedTuple, Optional
 
-from .client import EmailClient
+from .client import BulkEmailRecipient, EmailClient, EmailClientException, SentCallback
+
+
+class LocalEmail(NamedTuple):
+    template: str  # `EmailClient` method
+    to_email: str
+    data: Dict[str, Any]  # every kwarg, `to_email` included
+    sent_at: datetime
+
+
+class LocalEmailClientModes:
+    FILES = "FILES"  # a pretty printed json file per email, under `<root>/<template>/`
+    JSONL = "JSONL"  # append only `<root>/<template>.<pid>.jsonl` files, buffered and flushed periodically
+    MEMORY = "MEMORY"  # nothing written, the last `buffer_size` emails are kept in memory (see `sent_emails`)
+
+    all = [FILES, JSONL, MEMORY]
 
 
 class LocalEmailClient(EmailClient):
-    def __init__(self, root: str, sender: str = "admin@admissions.org") -> None:
-        os.makedirs(root, exist_ok=True)
+    def __init__(
+        self,
+        root: str,
+        sender: str = "admin@admissions.org",
+        *,
+        mode: str = LocalEmailClientModes.FILES,
+        buffer_size: int = 10000,
+        flush_interval: float = 1,
+    ) -> None:
+        if mode not in LocalEmailClientModes.all:
+            raise EmailClientException(f"invalid LocalEmailClient mode `{mode}`")
+        if mode != LocalEmailClientModes.MEMORY:
+            os.makedirs(root, exist_ok=True)
         self.root = root
         self.sender = sender
+        self.mode = mode
+        self.flush_interval = flush_interval  # seconds (JSONL)
 
-    def _dump_locally(self, f_name: str, *, to_email: str, **kwargs: Any) -> None:
-        directory = os.path.join(self.root, f_name)
-        os.makedirs(directory, exist_ok=True)
-        filename = f"{to_email}_{datetime.now().strftime('%d@%H_%M_%S__%f')}"
+        self._lock = Lock()
+        self._emails: Deque[LocalEmail] = deque(maxlen=buffer_size)
+        self._sinks: Dict[str, IO[str]] = {}
+        self._sinks_pid = os.getpid()
+        self._last_flush = monotonic()
+        if mode == LocalEmailClientModes.JSONL:
+            atexit.register(self.flush)
 
-        with open(os.path.join(directory, filename), "w") as file:
-            json.dump({"to_email": to_email, **kwargs}, file, indent=4, separators=(",", ": "))
+    def _dump_locally(self, f_name: str, *, to_email: str, **kwargs: Any) -> None:
+        if self.mode == LocalEmailClientModes.FILES:
+            directory = os.path.join(self.root, f_name)
+            os.makedirs(directory, exist_ok=True)
+            filename = f"{to_email}_{datetime.now().strftime('%d@%H_%M_%S__%f')}"
+
+            with open(os.path.join(directory, filename), "w") as file:
+                json.dump({"to_email": to_email, **kwargs}, file, indent=4, separators=(",", ": "))
+        else:
+            self._append(f_name, [{"to_email": to_email, **kwargs}])
+
+    def _append(self, template: str, emails: List[Dict[str, Any]]) -> None:
+        now = datetime.now()
+        with self._lock:
+            if self.mode == LocalEmailClientModes.MEMORY:
+                self._emails.extend(LocalEmail(template, e["to_email"], e, now) for e in emails)
+                return
+
+            sink = self._get_sink(template)
+            sink.write("".join(json.dumps({**e, "sent_at": now.isoformat()}) + "\n" for e in emails))
+            if monotonic() - self._last_flush > self.flush_interval:
+                self._flush()
+
+    def _get_sink(self, template: str) -> IO[str]:
+        if self._sinks_pid != os.getpid():
+            # forked, the sinks belong to the parent process
+            self._sinks = {}
+            self._sinks_pid = os.getpid()
+
+        if template not in self._sinks:
+            path = os.path.join(self.root, f"{template}.{self._sinks_pid}.jsonl")
+            self._sinks[template] = open(path, "a", buffering=1 << 16)
+        return self._sinks[template]
+
+    def _flush(self) -> None:
+        for sink in self._sinks.values():
+            sink.flush()
+        self._last_flush = monotonic()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def sent_emails(self, *, template: Optional[str] = None, to_email: Optional[str] = None) -> List[LocalEmail]:
+        # MEMORY mode, oldest first
+        with self._lock:
+            emails = list(self._emails)
+        return [
+            e
+            for e in emails
+            if (template is None or e.template == template) and (to_email is None or e.to_email == to_email)
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._emails.clear()
+
+    def _send_bulk(
+        self, template: str, recipients: List[BulkEmailRecipient], *, on_sent: Optional[SentCallback] = None
+    ) -> None:
+        # a single write (JSONL / MEMORY) with every recipient, a file per recipient (FILES, as the other emails)
+        if self.mode == LocalEmailClientModes.FILES:
+            super()._send_bulk(template, recipients, on_sent=on_sent)
+        elif recipients:
+            self._append(template, [{"to_email": r.to_email, **r.merge} for r in recipients])
+            if on_sent is not None:
+                on_sent(recipients)
 
     def send_signup_email(self, to_email: str, *, email_confirmation_url: str) -> None:
         self._dump_locally("send_signup_email", to_email=to_email, email_confirmation_url=email_confirmation_url)
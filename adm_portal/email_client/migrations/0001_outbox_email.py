@@ -0,0 +1,34 @@
+# Generated by Django 3.0.14 on 2026-10-19 16:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxEmail",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("idempotency_key", models.CharField(editable=False, max_length=200, unique=True)),
+                ("method", models.CharField(editable=False, max_length=100)),
+                ("kwargs", models.TextField(editable=False)),
+                ("status", models.CharField(default="pending", max_length=20)),
+                ("attempts", models.IntegerField(default=0)),
+                ("next_attempt_at", models.DateTimeField()),
+                ("claimed_at", models.DateTimeField(default=None, null=True)),
+                ("sent_at", models.DateTimeField(default=None, null=True)),
+                ("last_error", models.TextField(default="")),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="outboxemail",
+            index=models.Index(fields=["status", "next_attempt_at"], name="outbox_email_due_idx"),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.0.14 on 2026-10-19 16:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("email_client", "0001_outbox_email")]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailLedgerEntry",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("to_email", models.CharField(editable=False, max_length=200)),
+                ("template", models.CharField(editable=False, max_length=100)),
+                ("business_key", models.CharField(editable=False, max_length=200)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="emailledgerentry",
+            constraint=models.UniqueConstraint(
+                fields=("business_key", "template", "to_email"), name="email_ledger_entry_unique"
+            ),
+        ),
+    ]
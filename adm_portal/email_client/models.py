@@ -0,0 +1,51 @@
+from typing import NewType
+
+from django.db import models
+
+OutboxEmailStatusType = NewType("OutboxEmailStatusType", str)
+
+
+class OutboxEmailStatus:
+    PENDING = OutboxEmailStatusType("pending")
+    SENDING = OutboxEmailStatusType("sending")  # claimed by a `deliver_emails` worker
+    SENT = OutboxEmailStatusType("sent")
+    FAILED = OutboxEmailStatusType("failed")  # gave up after `max_attempts`
+
+
+class OutboxEmail(models.Model):
+    # an email stored by the `OutboxEmailClient`, waiting to be delivered by the `deliver_emails` worker
+    idempotency_key = models.CharField(null=False, max_length=200, unique=True, editable=False)
+
+    method = models.CharField(null=False, max_length=100, editable=False)  # `EmailClient` method
+    kwargs = models.TextField(null=False, editable=False)  # json encoded `EmailClient` method kwargs
+
+    status = models.CharField(null=False, max_length=20, default=OutboxEmailStatus.PENDING)
+    attempts = models.IntegerField(null=False, default=0)
+    next_attempt_at = models.DateTimeField(null=False)
+    claimed_at = models.DateTimeField(null=True, default=None)
+    sent_at = models.DateTimeField(null=True, default=None)
+    last_error = models.TextField(null=False, default="")
+
+    updated_at = models.DateTimeField(auto_now=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = models.Manager()
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "next_attempt_at"], name="outbox_email_due_idx")]
+
+
+class EmailLedgerEntry(models.Model):
+    # an email (template) sent to a recipient for a business event (e.g. `application:<id>`), see `email_client.ledger`
+    to_email = models.CharField(null=False, max_length=200, editable=False)
+    template = models.CharField(null=False, max_length=100, editable=False)  # `EmailClient` method
+    business_key = models.CharField(null=False, max_length=200, editable=False)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["business_key", "template", "to_email"], name="email_ledger_entry_unique")
+        ]
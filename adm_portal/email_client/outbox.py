@@ -0,0 +1,323 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from hashlib import sha256
+from logging import getLogger
+from threading import Lock
+from time import monotonic, sleep, time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+
+from .client import BulkEmailRecipient, EmailClient, EmailClientException, SentCallback
+from .models import OutboxEmail, OutboxEmailStatus
+
+logger = getLogger(__name__)
+
+
+# emails without a business key are deduplicated within windows of this many seconds
+DEDUPE_WINDOW = 10 * 60
+
+
+def get_idempotency_key(template: str, recipient: BulkEmailRecipient) -> str:
+    # the same event email (template, business key, recipient) always gets the same key
+    if recipient.business_key is None:
+        return get_email_idempotency_key(template, {"to_email": recipient.to_email, **recipient.merge})
+    return sha256(f"{template}:{recipient.business_key}:{recipient.to_email}".encode()).hexdigest()
+
+
+def get_email_idempotency_key(method: str, kwargs: Dict[str, Any], *, now: Optional[float] = None) -> str:
+    # emails without a business key (signup, reset password, contact us, staff messages):
+    # the same email (method and arguments) enqueued again in the same `DEDUPE_WINDOW` (e.g. a retried request)
+    # is stored once, a later one is stored again (e.g. the signup email resent with the same confirmation url)
+    window = int((time() if now is None else now) // DEDUPE_WINDOW)
+    return sha256(json.dumps([method, kwargs, window], sort_keys=True).encode()).hexdigest()
+
+
+class OutboxEmailClient(EmailClient):
+    # doesn't send anything, the emails are stored in the outbox table (in the caller's transaction, if there is one)
+    # and delivered later by the `deliver_emails` worker (see `OutboxWorker`)
+
+    def enqueue(self, method: str, *, idempotency_key: Optional[str] = None, **kwargs: Any) -> bool:
+        # an email with an already known `idempotency_key` is not stored (nor sent) again, unless it failed
+        # returns whether it was queued
+        email, created = OutboxEmail.objects.get_or_create(
+            idempotency_key=idempotency_key or get_email_idempotency_key(method, kwargs),
+            defaults={"method": method, "kwargs": json.dumps(kwargs), "next_attempt_at": datetime.now()},
+        )
+        if created:
+            return True
+        return self._requeue_failed([email.idempotency_key]) > 0
+
+    async def asend(self, template: str, **kwargs: Any) -> None:
+        # a db write: in django's sync thread, with the other queries of the request
+        await sync_to_async(getattr(self, template))(**kwargs)
+
+    def send_bulk(self, template: str, recipients: List[BulkEmailRecipient]) -> None:
+        # no `EmailLedger`, the outbox deduplicates the event emails itself (see `get_idempotency_key`):
+        # an email only counts as sent once it was delivered, a failed one is queued again
+        if template not in self.bulk_templates:
+            raise EmailClientException(f"`{template}` is not a bulk template")
+        self._send_bulk(template, recipients)
+
+    def _send_bulk(
+        self, template: str, recipients: List[BulkEmailRecipient], *, on_sent: Optional[SentCallback] = None
+    ) -> None:
+        # single insert, the worker sends them back in bulk (see `OutboxWorker.get_jobs`)
+        # the emails already in the outbox (same idempotency key) are skipped, the failed ones are queued again
+        now = datetime.now()
+        emails = [
+            OutboxEmail(
+                idempotency_key=get_idempotency_key(template, r),
+                method=template,
+                kwargs=json.dumps({"to_email": r.to_email, **r.merge}),
+                next_attempt_at=now,
+            )
+            for r in recipients
+        ]
+        OutboxEmail.objects.bulk_create(emails, batch_size=1000, ignore_conflicts=True)
+        self._requeue_failed([email.idempotency_key for email in emails])
+        if on_sent is not None:
+            on_sent(recipients)
+
+    @staticmethod
+    def _requeue_failed(idempotency_keys: List[str]) -> int:
+        now = datetime.now()
+        return OutboxEmail.objects.filter(
+            idempotency_key__in=idempotency_keys, status=OutboxEmailStatus.FAILED
+        ).update(status=OutboxEmailStatus.PENDING, attempts=0, next_attempt_at=now, updated_at=now)
+
+    def send_signup_email(self, to_email: str, *, email_confirmation_url: str) -> None:
+        self.enqueue("send_signup_email", to_email=to_email, email_confirmation_url=email_confirmation_url)
+
+    def send_reset_password_email(self, to_email: str, *, reset_password_url: str) -> None:
+        self.enqueue("send_reset_password_email", to_email=to_email, reset_password_url=reset_password_url)
+
+    def send_interview_passed_email(
+        self, to_email: str, to_name: str, *, payment_value: int, payment_due_date: str
+    ) -> None:
+        self.enqueue(
+            "send_interview_passed_email",
+            to_email=to_email,
+            to_name=to_name,
+            payment_value=payment_value,
+            payment_due_date=payment_due_date,
+        )
+
+    def send_interview_failed_email(self, to_email: str, to_name: str, *, message: str) -> None:
+        self.enqueue("send_interview_failed_email", to_email=to_email, to_name=to_name, message=message)
+
+    def send_payment_accepted_proof_email(self, to_email: str, to_name: str, *, message: Optional[str] = None) -> None:
+        self.enqueue("send_payment_accepted_proof_email", to_email=to_email, to_name=to_name, message=message)
+
+    def send_payment_need_additional_proof_email(self, to_email: str, to_name: str, *, message: str) -> None:
+        self.enqueue("send_payment_need_additional_proof_email", to_email=to_email, to_name=to_name, message=message)
+
+    def send_payment_refused_proof_email(self, to_email: str, to_name: str, *, message: str) -> None:
+        self.enqueue("send_payment_refused_proof_email", to_email=to_email, to_name=to_name, message=message)
+
+    def send_application_is_over_passed(self, to_email: str, to_name: str) -> None:
+        self.enqueue("send_application_is_over_passed", to_email=to_email, to_name=to_name)
+
+    def send_application_is_over_failed(self, to_email: str, to_name: str) -> None:
+        self.enqueue("send_application_is_over_failed", to_email=to_email, to_name=to_name)
+
+    def send_selected_and_payment_details(
+        self, to_email: str, to_name: str, *, payment_value: int, payment_due_date: str
+    ) -> None:
+        self.enqueue(
+            "send_selected_and_payment_details",
+            to_email=to_email,
+            to_name=to_name,
+            payment_value=payment_value,
+            payment_due_date=payment_due_date,
+        )
+
+    def send_selected_interview_details(self, to_email: str, to_name: str) -> None:
+        self.enqueue("send_selected_interview_details", to_email=to_email, to_name=to_name)
+
+    def send_admissions_are_over_not_selected(self, to_email: str, to_name: str) -> None:
+        self.enqueue("send_admissions_are_over_not_selected", to_email=to_email, to_name=to_name)
+
+    def send_contact_us_email(self, from_email: str, user_name: str, user_url: str, message: str) -> None:
+        self.enqueue(
+            "send_contact_us_email", from_email=from_email, user_name=user_name, user_url=user_url, message=message
+        )
+
+
+class RateLimiter:
+    # token bucket shared by the delivery threads: `rate` emails per second, bursts of up to `burst` emails
+    # rate=None means no limit
+    def __init__(self, rate: Optional[float], *, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = monotonic()
+        self._lock = Lock()
+
+    def acquire(self, n: int = 1) -> None:
+        # `n` emails (a bulk job), more than `burst` waits for the missing tokens
+        if self.rate is None:
+            return
+
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(float(self.burst), self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # reserve the tokens, waiting for them (outside the lock) if the bucket doesn't have them
+            self._tokens -= n
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+
+        if wait > 0:
+            sleep(wait)
+
+
+class DeliveryReport(NamedTuple):
+    sent: int
+    retried: int
+    failed: int
+
+    @property
+    def total(self) -> int:
+        return self.sent + self.retried + self.failed
+
+
+class OutboxWorker:
+    # claims batches of due outbox emails and sends them with `client` on a pool of threads
+    # (one provider call per email, or per bulk template in the batch)
+    # the threads only talk to the email provider, the outbox table is only read / updated by the calling thread
+    def __init__(
+        self,
+        client: EmailClient,
+        *,
+        rate_limiter: Optional[RateLimiter] = None,
+        workers: int = 8,
+        batch_size: int = 200,
+        max_attempts: int = 6,
+        backoff: timedelta = timedelta(seconds=30),
+        max_backoff: timedelta = timedelta(hours=1),
+        claim_timeout: timedelta = timedelta(minutes=10),
+    ) -> None:
+        self.client = client
+        self.rate_limiter = rate_limiter or RateLimiter(None)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.claim_timeout = claim_timeout
+
+    def claim(self) -> List[OutboxEmail]:
+        # pending emails that are due and emails claimed by a worker that died (claim timed out)
+        now = datetime.now()
+        with transaction.atomic():
+            ids = list(
+                OutboxEmail.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(status=OutboxEmailStatus.PENDING, next_attempt_at__lte=now)
+                    | Q(status=OutboxEmailStatus.SENDING, claimed_at__lt=now - self.claim_timeout)
+                )
+                .order_by("next_attempt_at", "id")
+                .values_list("id", flat=True)[: self.batch_size]
+            )
+            OutboxEmail.objects.filter(id__in=ids).update(status=OutboxEmailStatus.SENDING, claimed_at=now)
+
+        return list(OutboxEmail.objects.filter(id__in=ids).order_by("next_attempt_at", "id"))
+
+    def get_jobs(self, emails: List[OutboxEmail]) -> List[List[OutboxEmail]]:
+        # bulk templates are grouped in a single `send_bulk` job, every other email is a job
+        jobs: List[List[OutboxEmail]] = []
+        bulk_jobs: Dict[str, List[OutboxEmail]] = {}
+        for email in emails:
+            if email.method in self.client.bulk_templates:
+                bulk_jobs.setdefault(email.method, []).append(email)
+            else:
+                jobs.append([email])
+        return [*bulk_jobs.values(), *jobs]
+
+    def send(self, job: List[OutboxEmail]) -> Optional[Exception]:
+        # returns the error, if any (a failed bulk job fails every email in it)
+        # the rate limit counts emails, a bulk job takes a token per recipient
+        self.rate_limiter.acquire(len(job))
+        try:
+            if len(job) == 1:
+                getattr(self.client, job[0].method)(**json.loads(job[0].kwargs))
+            else:
+                recipients = []
+                for email in job:
+                    kwargs = json.loads(email.kwargs)
+                    recipients.append(BulkEmailRecipient(to_email=kwargs.pop("to_email"), merge=kwargs))
+                self.client.send_bulk(job[0].method, recipients)
+        except Exception as e:
+            return e
+        return None
+
+    def get_backoff(self, attempts: int) -> timedelta:
+        return min(self.backoff * 2 ** (attempts - 1), self.max_backoff)
+
+    def deliver_batch(self, executor: ThreadPoolExecutor) -> DeliveryReport:
+        jobs = self.get_jobs(self.claim())
+        errors = list(executor.map(self.send, jobs))
+
+        sent_ids = []
+        retried = failed = 0
+        now = datetime.now()
+        for email, error in [(email, error) for job, error in zip(jobs, errors) for email in job]:
+            if error is None:
+                sent_ids.append(email.id)
+                continue
+
+            email.attempts += 1
+            email.last_error = f"{type(error).__name__}: {error}"
+            # errors are retryable unless the client says otherwise (`EmailDeliveryException.retryable`)
+            if email.attempts >= self.max_attempts or not getattr(error, "retryable", True):
+                email.status = OutboxEmailStatus.FAILED
+                failed += 1
+                logger.error(f"outbox email failed: id={email.id}, method={email.method}, error={email.last_error}")
+            else:
+                email.status = OutboxEmailStatus.PENDING
+                email.next_attempt_at = now + self.get_backoff(email.attempts)
+                retried += 1
+                logger.warning(
+                    f"outbox email will be retried: id={email.id}, method={email.method}, error={email.last_error}"
+                )
+            email.save(update_fields=["attempts", "last_error", "status", "next_attempt_at", "updated_at"])
+
+        OutboxEmail.objects.filter(id__in=sent_ids).update(
+            status=OutboxEmailStatus.SENT, sent_at=now, attempts=F("attempts") + 1, updated_at=now
+        )
+
+        return DeliveryReport(sent=len(sent_ids), retried=retried, failed=failed)
+
+    def run(self, *, once: bool = False, poll_interval: float = 5, max_error_interval: float = 300) -> DeliveryReport:
+        # once=True: deliver every due email and stop, otherwise poll the outbox forever
+        # a batch that fails (e.g. the database is unavailable) is logged and retried after a growing pause,
+        # its claimed emails are claimed again after `claim_timeout`
+        sent = retried = failed = 0
+        errors = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                try:
+                    report = self.deliver_batch(executor)
+                except Exception:
+                    if once:
+                        raise
+                    errors += 1
+                    logger.exception(f"outbox batch failed ({errors} in a row)")
+                    # drops the broken database connection, the next batch opens a new one
+                    close_old_connections()
+                    sleep(min(poll_interval * 2 ** (errors - 1), max_error_interval))
+                    continue
+
+                errors = 0
+                sent, retried, failed = sent + report.sent, retried + report.retried, failed + report.failed
+                if report.total > 0:
+                    logger.info(f"outbox batch delivered: {report}")
+                    continue
+                if once:
+                    break
+                sleep(poll_interval)
+
+        return DeliveryReport(sent=sent, retried=retried, failed=failed)
@@ -0,0 +1,125 @@
+import json
+from typing import Any, List, Optional
+
+import requests
+from django.test import TestCase
+from requests.adapters import BaseAdapter
+
+from email_client import BulkEmailRecipient, elastic
+from email_client.elastic import ElasticCallMetrics, ElasticEmailClient, ElasticEmailException
+from email_client.ledger import EmailLedger
+
+
+class FakeElasticAdapter(BaseAdapter):
+    # answers every request with `status_code` / `body`, or raises `error`
+    def __init__(self, status_code: int = 200, body: Any = None, error: Optional[Exception] = None) -> None:
+        super().__init__()
+        self.status_code = status_code
+        self.body = body if body is not None else {"success": True}
+        self.error = error
+        self.requests: List[requests.PreparedRequest] = []
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: Any = True,
+        cert: Any = None,
+        proxies: Any = None,
+    ) -> requests.Response:
+        self.requests.append(request)
+        if self.error is not None:
+            raise self.error
+        resp = requests.Response()
+        resp.status_code = self.status_code
+        resp._content = json.dumps(self.body).encode()
+        resp.request = request
+        return resp
+
+    def close(self) -> None:
+        pass
+
+
+class FailingAfterAdapter(FakeElasticAdapter):
+    # the first `ok` requests succeed, the next ones fail
+    def __init__(self, ok: int) -> None:
+        super().__init__()
+        self.ok = ok
+
+    def send(self, request: requests.PreparedRequest, *args: Any, **kwargs: Any) -> requests.Response:
+        self.status_code = 200 if len(self.requests) < self.ok else 503
+        return super().send(request, *args, **kwargs)
+
+
+class TestElasticEmailClient(TestCase):
+    def get_client(self, adapter: FakeElasticAdapter, metrics: List[ElasticCallMetrics]) -> ElasticEmailClient:
+        client = ElasticEmailClient("key", "sender@test.com", raise_errors=True, metrics_hook=metrics.append)
+        client.session.mount("https://", adapter)
+        return client
+
+    def test_send(self) -> None:
+        metrics: List[ElasticCallMetrics] = []
+        adapter = FakeElasticAdapter()
+        client = self.get_client(adapter, metrics)
+
+        client.send_signup_email("a@test.com", email_confirmation_url="http://confirm")
+        client.send_reset_password_email("a@test.com", reset_password_url="http://reset")
+
+        self.assertEqual(len(adapter.requests), 2)
+        self.assertEqual([m.status for m in metrics], ["ok", "ok"])
+        self.assertEqual(metrics[0].template_id, 2034)
+
+    def test_send_errors(self) -> None:
+        tt = [
+            (FakeElasticAdapter(status_code=503), "http_503", True),
+            (FakeElasticAdapter(status_code=429), "http_429", True),
+            (FakeElasticAdapter(status_code=400), "http_400", False),
+            (FakeElasticAdapter(body={"success": False, "error": "bad email"}), "error", False),
+            (FakeElasticAdapter(error=requests.ConnectTimeout()), "timeout", True),
+            (FakeElasticAdapter(error=requests.ConnectionError()), "connection_error", True),
+        ]
+
+        for adapter, expected_status, expected_retryable in tt:
+            metrics: List[ElasticCallMetrics] = []
+            client = self.get_client(adapter, metrics)
+
+            with self.assertRaises(ElasticEmailException) as ctx:
+                client.send_application_is_over_passed("a@test.com", "A")
+            self.assertEqual(ctx.exception.retryable, expected_retryable)
+            self.assertEqual([m.status for m in metrics], [expected_status])
+
+    def test_send_errors_not_raised(self) -> None:
+        client = ElasticEmailClient("key", "sender@test.com")
+        client.session.mount("https://", FakeElasticAdapter(status_code=503))
+
+        # only logged
+        client.send_application_is_over_passed("a@test.com", "A")
+
+    def test_send_bulk_failed_not_recorded(self) -> None:
+        client = ElasticEmailClient("key", "sender@test.com")
+        client.session.mount("https://", FakeElasticAdapter(status_code=503))
+        recipient = BulkEmailRecipient(to_email="a@test.com", merge={"to_name": "A"}, business_key="application:1")
+
+        # only logged, sent again by the next run
+        client.send_bulk("send_application_is_over_passed", [recipient])
+        self.assertFalse(EmailLedger.is_sent("send_application_is_over_passed", "a@test.com", "application:1"))
+
+    def test_send_bulk_recorded_per_chunk(self) -> None:
+        client = self.get_client(FailingAfterAdapter(ok=1), [])
+        recipients = [
+            BulkEmailRecipient(to_email=f"{i}@test.com", merge={"to_name": f"{i}"}, business_key=f"application:{i}")
+            for i in range(3)
+        ]
+
+        chunk_size = elastic.ELASTIC_BULK_CHUNK_SIZE
+        elastic.ELASTIC_BULK_CHUNK_SIZE = 2
+        try:
+            with self.assertRaises(ElasticEmailException):
+                client.send_bulk("send_application_is_over_passed", recipients)
+        finally:
+            elastic.ELASTIC_BULK_CHUNK_SIZE = chunk_size
+
+        template = "send_application_is_over_passed"
+        sent = [EmailLedger.is_sent(template, f"{i}@test.com", f"application:{i}") for i in range(3)]
+        self.assertEqual(sent, [True, True, False])
@@ -0,0 +1,70 @@
+from typing import Any, List
+
+from django.test import TestCase
+
+from email_client import BulkEmailRecipient, EmailClientException, LocalEmailClient, LocalEmailClientModes
+from email_client.ledger import EmailLedger
+from email_client.models import EmailLedgerEntry
+
+
+class TestEmailLedger(TestCase):
+    def setUp(self) -> None:
+        self.client = LocalEmailClient("unused", mode=LocalEmailClientModes.MEMORY)
+
+    def test_send_bulk(self) -> None:
+        recipients = [
+            BulkEmailRecipient(to_email=f"u{i}@test.com", merge={"to_name": f"U{i}"}, business_key=f"selection:{i}")
+            for i in range(5)
+        ]
+
+        self.client.send_bulk("send_selected_interview_details", recipients[:3])
+        self.assertEqual(len(self.client.sent_emails()), 3)
+
+        # re-run: only the new ones are sent
+        self.client.send_bulk("send_selected_interview_details", recipients)
+        self.assertEqual(len(self.client.sent_emails()), 5)
+        self.client.send_bulk("send_selected_interview_details", recipients)
+        self.assertEqual(len(self.client.sent_emails()), 5)
+
+        # other template / business key
+        self.client.send_bulk("send_admissions_are_over_not_selected", recipients[:1])
+        self.client.send_bulk("send_selected_interview_details", [recipients[0]._replace(business_key="selection:9")])
+        self.assertEqual(len(self.client.sent_emails()), 7)
+        self.assertEqual(EmailLedgerEntry.objects.count(), 7)
+
+    def test_send_bulk_without_business_key(self) -> None:
+        recipients = [BulkEmailRecipient(to_email="u@test.com", merge={"to_name": "U"})]
+
+        self.client.send_bulk("send_application_is_over_passed", recipients)
+        self.client.send_bulk("send_application_is_over_passed", recipients)
+
+        self.assertEqual(len(self.client.sent_emails()), 2)
+        self.assertEqual(EmailLedgerEntry.objects.count(), 0)
+
+    def test_send_bulk_failed(self) -> None:
+        class FailingClient(LocalEmailClient):
+            def _send_bulk(self, template: str, recipients: List[BulkEmailRecipient], **kwargs: Any) -> None:
+                raise EmailClientException("provider unavailable")
+
+        recipient = BulkEmailRecipient(to_email="u@test.com", merge={"to_name": "U"}, business_key="selection:1")
+        with self.assertRaises(EmailClientException):
+            FailingClient("unused", mode=LocalEmailClientModes.MEMORY).send_bulk(
+                "send_selected_interview_details", [recipient]
+            )
+        self.assertFalse(EmailLedger.is_sent("send_selected_interview_details", "u@test.com", "selection:1"))
+
+        # sent by the next run
+        self.client.send_bulk("send_selected_interview_details", [recipient])
+        self.assertEqual(len(self.client.sent_emails()), 1)
+        self.assertTrue(EmailLedger.is_sent("send_selected_interview_details", "u@test.com", "selection:1"))
+
+    def test_record_concurrent(self) -> None:
+        # both runs read the ledger before any of them recorded the email
+        recipient = BulkEmailRecipient(to_email="u@test.com", merge={"to_name": "U"}, business_key="selection:1")
+        self.assertEqual(EmailLedger.get_unsent("send_selected_interview_details", [recipient]), [recipient])
+        self.assertEqual(EmailLedger.get_unsent("send_selected_interview_details", [recipient]), [recipient])
+
+        EmailLedger.record("send_selected_interview_details", [recipient])
+        EmailLedger.record("send_selected_interview_details", [recipient])
+
+        self.assertEqual(EmailLedgerEntry.objects.count(), 1)
@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+
+from django.test import TestCase
+
+from email_client import BulkEmailRecipient, EmailClientException, LocalEmailClient, LocalEmailClientModes
+
+
+class TestLocalEmailClient(TestCase):
+    def test_memory(self) -> None:
+        client = LocalEmailClient("unused", mode=LocalEmailClientModes.MEMORY, buffer_size=3)
+        client.send_signup_email("a@test.com", email_confirmation_url="http://confirm")
+        client.send_bulk(
+            "send_application_is_over_failed",
+            [BulkEmailRecipient(to_email=f"u{i}@test.com", merge={"to_name": f"U{i}"}) for i in range(2)],
+        )
+
+        self.assertEqual(len(client.sent_emails()), 3)
+        (email,) = client.sent_emails(template="send_signup_email")
+        self.assertEqual(email.data, {"to_email": "a@test.com", "email_confirmation_url": "http://confirm"})
+        self.assertEqual(client.sent_emails(to_email="u1@test.com")[0].data["to_name"], "U1")
+
+        # ring buffer, the oldest email is dropped
+        client.send_selected_interview_details("b@test.com", "B")
+        self.assertEqual(client.sent_emails(template="send_signup_email"), [])
+        self.assertEqual(len(client.sent_emails()), 3)
+
+        client.clear()
+        self.assertEqual(client.sent_emails(), [])
+        self.assertFalse(os.path.exists("unused"))
+
+    def test_jsonl(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            client = LocalEmailClient(root, mode=LocalEmailClientModes.JSONL, flush_interval=60)
+            for i in range(5):
+                client.send_application_is_over_passed(f"u{i}@test.com", f"U{i}")
+            client.send_bulk(
+                "send_application_is_over_passed",
+                [BulkEmailRecipient(to_email="v@test.com", merge={"to_name": "V"})],
+            )
+            client.flush()
+
+            self.assertEqual(os.listdir(root), [f"send_application_is_over_passed.{os.getpid()}.jsonl"])
+            with open(os.path.join(root, os.listdir(root)[0])) as f:
+                lines = [json.loads(line) for line in f]
+            self.assertEqual([e["to_email"] for e in lines], [*[f"u{i}@test.com" for i in range(5)], "v@test.com"])
+
+    def test_files_bulk(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            client = LocalEmailClient(root, mode=LocalEmailClientModes.FILES)
+            client.send_bulk(
+                "send_application_is_over_passed",
+                [BulkEmailRecipient(to_email=f"u{i}@test.com", merge={"to_name": f"U{i}"}) for i in range(3)],
+            )
+
+            # a file per recipient
+            directory = os.path.join(root, "send_application_is_over_passed")
+            files = sorted(os.listdir(directory))
+            self.assertEqual([f.split("_")[0] for f in files], [f"u{i}@test.com" for i in range(3)])
+            with open(os.path.join(directory, files[0])) as f:
+                self.assertEqual(json.load(f), {"to_email": "u0@test.com", "to_name": "U0"})
+
+    def test_invalid_mode(self) -> None:
+        with self.assertRaises(EmailClientException):
+            LocalEmailClient("unused", mode="S3")
@@ -0,0 +1,293 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Lock
+from time import monotonic, time
+from typing import Any, Dict, List, Tuple
+
+from asgiref.sync import async_to_sync
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+
+from email_client import BulkEmailRecipient, EmailClientException, EmailDeliveryException
+from email_client.models import EmailLedgerEntry, OutboxEmail, OutboxEmailStatus
+from email_client.outbox import (
+    DEDUPE_WINDOW,
+    DeliveryReport,
+    OutboxEmailClient,
+    OutboxWorker,
+    RateLimiter,
+    get_email_idempotency_key,
+)
+
+
+class RecordingClient(OutboxEmailClient):
+    # records the "sent" emails instead of storing them, the first `fail_first` calls per recipient fail
+    def __init__(self, fail_first: int = 0) -> None:
+        self.fail_first = fail_first
+        self.calls: List[Tuple[str, Any]] = []
+        self.attempts: Dict[str, int] = {}
+        self.bulk_calls: List[Tuple[str, int]] = []
+        self._lock = Lock()
+
+    def enqueue(self, method: str, **kwargs: Any) -> bool:
+        with self._lock:
+            n = self.attempts.get(kwargs["to_email"], 0) + 1
+            self.attempts[kwargs["to_email"]] = n
+            if n <= self.fail_first:
+                raise Exception("provider unavailable")
+            self.calls.append((method, kwargs))
+        return True
+
+    def _send_bulk(self, template: str, recipients: List[BulkEmailRecipient], **kwargs: Any) -> None:
+        self.bulk_calls.append((template, len(recipients)))
+        for r in recipients:
+            self.enqueue(template, to_email=r.to_email, **r.merge)
+
+
+class TestOutboxEmailClient(TestCase):
+    def test_enqueue(self) -> None:
+        client = OutboxEmailClient()
+        client.send_signup_email("a@test.com", email_confirmation_url="http://confirm")
+        client.send_interview_failed_email("b@test.com", "B", message="sorry")
+
+        self.assertEqual(OutboxEmail.objects.count(), 2)
+        email = OutboxEmail.objects.get(method="send_interview_failed_email")
+        self.assertEqual(json.loads(email.kwargs), {"to_email": "b@test.com", "to_name": "B", "message": "sorry"})
+        self.assertEqual(email.status, OutboxEmailStatus.PENDING)
+
+    def test_enqueue_retried(self) -> None:
+        client = OutboxEmailClient()
+        for _ in range(2):
+            client.send_signup_email("a@test.com", email_confirmation_url="http://confirm")
+        client.send_signup_email("a@test.com", email_confirmation_url="http://confirm-other")
+
+        self.assertEqual(OutboxEmail.objects.count(), 2)
+
+        # the same email in the next window (resent) is stored again
+        kwargs = {"to_email": "a@test.com", "email_confirmation_url": "http://confirm"}
+        now = time()
+        self.assertEqual(
+            get_email_idempotency_key("send_signup_email", kwargs, now=now),
+            OutboxEmail.objects.get(kwargs=json.dumps(kwargs)).idempotency_key,
+        )
+        self.assertNotEqual(
+            get_email_idempotency_key("send_signup_email", kwargs, now=now),
+            get_email_idempotency_key("send_signup_email", kwargs, now=now + DEDUPE_WINDOW),
+        )
+
+    def test_asend(self) -> None:
+        # in django's sync thread: the email is stored in the test transaction
+        async_to_sync(OutboxEmailClient().asend)(
+            "send_contact_us_email", from_email="a@test.com", user_name="A", user_url="http://a", message="hi"
+        )
+        self.assertEqual(OutboxEmail.objects.get().method, "send_contact_us_email")
+
+    def test_enqueue_idempotency_key(self) -> None:
+        client = OutboxEmailClient()
+        for _ in range(3):
+            client.enqueue("send_selected_interview_details", idempotency_key="k", to_email="a@test.com", to_name="A")
+
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+    def test_event_emails_idempotency_key(self) -> None:
+        client = OutboxEmailClient()
+        recipients = [
+            BulkEmailRecipient(to_email=f"p{i}@test.com", merge={"to_name": f"P{i}"}, business_key="event:1")
+            for i in range(3)
+        ]
+        client.send_bulk("send_application_is_over_passed", recipients)
+        client.send_bulk("send_application_is_over_passed", recipients)
+        self.assertEqual(OutboxEmail.objects.count(), 3)
+        # the outbox doesn't use the ledger
+        self.assertEqual(EmailLedgerEntry.objects.count(), 0)
+
+        # without a business key, once per dedupe window (see `test_enqueue_retried`)
+        client.send_bulk("send_application_is_over_passed", [recipients[0]._replace(business_key=None)])
+        client.send_bulk("send_application_is_over_passed", [recipients[0]._replace(business_key=None)])
+        self.assertEqual(OutboxEmail.objects.count(), 4)
+
+    def test_event_emails_failed_queued_again(self) -> None:
+        client = OutboxEmailClient()
+        recipient = BulkEmailRecipient(to_email="a@test.com", merge={"to_name": "A"}, business_key="event:1")
+        client.send_bulk("send_application_is_over_passed", [recipient])
+        OutboxEmail.objects.update(status=OutboxEmailStatus.FAILED, attempts=6)
+
+        client.send_bulk("send_application_is_over_passed", [recipient])
+
+        email = OutboxEmail.objects.get()
+        self.assertEqual((email.status, email.attempts), (OutboxEmailStatus.PENDING, 0))
+
+    def test_enqueue_in_caller_transaction(self) -> None:
+        client = OutboxEmailClient()
+        try:
+            with transaction.atomic():
+                client.send_application_is_over_passed("a@test.com", "A")
+                raise Exception("rollback")
+        except Exception:
+            pass
+
+        self.assertEqual(OutboxEmail.objects.count(), 0)
+
+
+class TestOutboxWorker(TestCase):
+    def enqueue(self, n: int) -> None:
+        for i in range(n):
+            OutboxEmailClient().send_interview_failed_email(f"u{i}@test.com", f"U{i}", message="sorry")
+
+    def test_deliver(self) -> None:
+        self.enqueue(25)
+        client = RecordingClient()
+
+        report = OutboxWorker(client, workers=4, batch_size=10).run(once=True)
+
+        self.assertEqual(report.sent, 25)
+        self.assertEqual(len(client.calls), 25)
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmailStatus.SENT, attempts=1).count(), 25)
+
+        # sent emails are never sent again
+        self.assertEqual(OutboxWorker(client).run(once=True).total, 0)
+        self.assertEqual(len(client.calls), 25)
+
+    def test_deliver_bulk(self) -> None:
+        OutboxEmailClient().send_bulk(
+            "send_application_is_over_passed",
+            [BulkEmailRecipient(to_email=f"p{i}@test.com", merge={"to_name": f"P{i}"}) for i in range(30)],
+        )
+        OutboxEmailClient().send_bulk(
+            "send_application_is_over_failed",
+            [BulkEmailRecipient(to_email=f"f{i}@test.com", merge={"to_name": f"F{i}"}) for i in range(20)],
+        )
+        self.enqueue(2)
+        client = RecordingClient()
+
+        report = OutboxWorker(client, batch_size=100).run(once=True)
+
+        self.assertEqual(report.sent, 52)
+        self.assertEqual(
+            sorted(client.bulk_calls),
+            [("send_application_is_over_failed", 20), ("send_application_is_over_passed", 30)],
+        )
+        self.assertIn(("send_application_is_over_passed", {"to_email": "p3@test.com", "to_name": "P3"}), client.calls)
+
+    def test_send_bulk_not_bulk_template(self) -> None:
+        with self.assertRaises(EmailClientException):
+            OutboxEmailClient().send_bulk("send_signup_email", [])
+
+    def test_deliver_retry(self) -> None:
+        self.enqueue(3)
+        client = RecordingClient(fail_first=1)
+        worker = OutboxWorker(client, backoff=timedelta(minutes=1), max_attempts=3)
+
+        report = worker.run(once=True)
+        self.assertEqual(report.retried, 3)
+        email = OutboxEmail.objects.first()
+        self.assertEqual(email.status, OutboxEmailStatus.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertIn("provider unavailable", email.last_error)
+        self.assertGreater(email.next_attempt_at, datetime.now())
+
+        # not due yet
+        self.assertEqual(worker.run(once=True).total, 0)
+
+        OutboxEmail.objects.update(next_attempt_at=datetime.now())
+        report = worker.run(once=True)
+        self.assertEqual(report.sent, 3)
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmailStatus.SENT, attempts=2).count(), 3)
+
+    def test_deliver_max_attempts(self) -> None:
+        self.enqueue(1)
+        worker = OutboxWorker(RecordingClient(fail_first=10), max_attempts=2)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            self.assertEqual(worker.deliver_batch(executor).retried, 1)
+            OutboxEmail.objects.update(next_attempt_at=datetime.now())
+            self.assertEqual(worker.deliver_batch(executor).failed, 1)
+
+        self.assertEqual(OutboxEmail.objects.get().status, OutboxEmailStatus.FAILED)
+        self.assertEqual(worker.run(once=True).total, 0)
+
+    def test_deliver_not_retryable(self) -> None:
+        self.enqueue(1)
+
+        class RejectingClient(RecordingClient):
+            def enqueue(self, method: str, **kwargs: Any) -> bool:
+                raise EmailDeliveryException("invalid recipient", retryable=False)
+
+        report = OutboxWorker(RejectingClient(), max_attempts=5).run(once=True)
+
+        self.assertEqual(report.failed, 1)
+        self.assertEqual(OutboxEmail.objects.get().status, OutboxEmailStatus.FAILED)
+
+    def test_claim_timeout(self) -> None:
+        self.enqueue(2)
+        worker = OutboxWorker(RecordingClient(), claim_timeout=timedelta(minutes=10))
+
+        self.assertEqual(len(worker.claim()), 2)
+        self.assertEqual(len(worker.claim()), 0)
+
+        # the worker that claimed them died
+        OutboxEmail.objects.update(claimed_at=datetime.now() - timedelta(minutes=11))
+        self.assertEqual(len(worker.claim()), 2)
+
+    def test_backoff(self) -> None:
+        worker = OutboxWorker(RecordingClient(), backoff=timedelta(seconds=30), max_backoff=timedelta(minutes=5))
+        self.assertEqual(
+            [worker.get_backoff(a).total_seconds() for a in range(1, 6)], [30.0, 60.0, 120.0, 240.0, 300.0]
+        )
+
+
+class StopWorker(BaseException):
+    pass
+
+
+class FlakyWorker(OutboxWorker):
+    # each batch raises or returns the next item of `batches`, the worker is stopped when they run out
+    def __init__(self, batches: List[Any]) -> None:
+        super().__init__(RecordingClient())
+        self.batches = batches
+
+    def deliver_batch(self, executor: ThreadPoolExecutor) -> DeliveryReport:
+        if not self.batches:
+            raise StopWorker
+        batch = self.batches.pop(0)
+        if isinstance(batch, Exception):
+            raise batch
+        return batch
+
+
+class TestOutboxWorkerErrors(TransactionTestCase):
+    def test_batch_error(self) -> None:
+        worker = FlakyWorker([Exception("db down"), Exception("db down"), DeliveryReport(sent=3, retried=0, failed=0)])
+
+        with self.assertLogs("email_client.outbox", level="ERROR") as logs, self.assertRaises(StopWorker):
+            worker.run(poll_interval=0)
+
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(worker.batches, [])
+
+    def test_batch_error_once(self) -> None:
+        with self.assertRaises(Exception):
+            FlakyWorker([Exception("db down")]).run(once=True)
+
+
+class TestRateLimiter(TestCase):
+    def test_rate_limit(self) -> None:
+        limiter = RateLimiter(200, burst=2)
+
+        start = monotonic()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: limiter.acquire(), range(12)))
+
+        # 2 immediately (burst), the other 10 at 200/s
+        self.assertGreaterEqual(monotonic() - start, 10 / 200 * 0.9)
+
+    def test_rate_limit_bulk(self) -> None:
+        limiter = RateLimiter(200, burst=2)
+
+        start = monotonic()
+        limiter.acquire(2)
+        limiter.acquire(20)
+
+        # 2 immediately (burst), 20 emails at 200/s
+        self.assertGreaterEqual(monotonic() - start, 20 / 200 * 0.9)
@@ -1,3 +1,4 @@
+from common.cache import bump_data_version
 from feature_flags_client.db import GetSetFlagsInterface
 
 from .models import Flags
@@ -6,6 +7,8 @@ from .models import Flags
 class FlagsGetSet(GetSetFlagsInterface):
     def set(self, *, key: str, value: str, create_by: str = "") -> None:
         Flags.objects.create(key=key, value=value, created_by=create_by)
+        # the applications statuses depend on the flags (dates, coding test duration)
+        bump_data_version()
 
     def get(self, *, key: str) -> str:
         try:
@@ -4,6 +4,7 @@ from logging import getLogger
 from typing import NamedTuple
 
 import requests
+from asgiref.sync import sync_to_async
 
 logger = getLogger(__name__)
 
@@ -26,6 +27,14 @@ class GraderClient(ABC):
     ) -> SubmissionResult:
         pass
 
+    async def agrade(
+        self, assignment_id: str, user_uuid: str, submission_s3_bucket: str, submission_s3_key: str
+    ) -> SubmissionResult:
+        # async callers (asgi views): `grade` runs in a worker thread, the event loop doesn't wait on the grader
+        return await sync_to_async(self.grade, thread_sensitive=False)(
+            assignment_id, user_uuid, submission_s3_bucket, submission_s3_key
+        )
+
 
 class GraderClientHttp(GraderClient):
     def __init__(self, url: str, auth_token: str) -> None:
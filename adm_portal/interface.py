@@ -1,12 +1,24 @@
-from typing import Optional
+import json
+from logging import getLogger
+from threading import RLock
+from time import perf_counter
+from typing import Dict, Optional, TypeVar, cast
 
 from django.conf import settings
+from django.db import connections
 
+from common.metrics import client_metrics
+from common.request_metrics import TimedClient
 from email_client import ElasticEmailClient, EmailClient, LocalEmailClient
+from email_client.elastic import ElasticCallMetrics
+from email_client.outbox import OutboxEmailClient
 from feature_flags_client import DBFeatureFlagsClient, FeatureFlagsClient, MockFeatureFlagsClient
 from flags.domain import FlagsGetSet
 from grader_client import GraderClient, GraderClientFakeScores, GraderClientHttp
 from storage_client import AWSS3StorageClient, LocalStorageClient, LocalStorageClientWithServer, StorageClient
+from storage_client.content_addressed import ContentAddressedStorageClient
+
+logger = getLogger(__name__)
 
 
 class InterfaceException(Exception):
@@ -17,73 +29,170 @@ class InterfaceException(Exception):
         return self.msg
 
 
+T = TypeVar("T")
+
+
+def instrumented(name: str, client: T) -> T:
+    # calls counted / timed per method (`/ops/metrics`) and part of the request metrics (see `TimedClient`)
+    return cast(T, TimedClient(name, client))
+
+
+def elastic_metrics_hook(metrics: ElasticCallMetrics) -> None:
+    # per elastic api call (one per bulk chunk), by status (`/ops/metrics`): `client="elastic_api",method="<status>"`
+    client_metrics.observe("elastic_api", metrics.status, metrics.latency, error=metrics.status != "ok")
+
+
 class _Interface:
+    # the clients are built once per process, on first use or by `warmup`
+    # under a lock: the threads of a worker must not build them concurrently
+    # (e.g. `DBFeatureFlagsClient` writes the default flags, boto3 clients creation isn't thread safe)
     def __init__(self) -> None:
         self._storage_client: Optional[StorageClient] = None
         self._email_client: Optional[EmailClient] = None
         self._feature_flag_client: Optional[FeatureFlagsClient] = None
         self._grader_client: Optional[GraderClient] = None
+        self._lock = RLock()
+
+    def warmup(self) -> Dict[str, float]:
+        # builds every client (and the storage connections) ahead of the first request (wsgi / asgi entry points)
+        # a client that fails is logged and left to be built on first use
+        # returns the seconds each client took
+        timings: Dict[str, float] = {}
+        for name, build in [
+            ("storage", lambda: self.storage_client.warmup()),
+            ("email", lambda: self.email_client),
+            ("flags", lambda: self.feature_flag_client),
+            ("grader", lambda: self.grader_client),
+        ]:
+            start = perf_counter()
+            try:
+                build()
+            except Exception as e:
+                logger.error(f"interface warmup: can't build the {name} client: {e}")
+            timings[name] = perf_counter() - start
+
+        # the db connections of this (main) thread are not used by the request threads
+        for connection in connections.all():
+            if not connection.in_atomic_block:
+                connection.close()
+
+        report = {f"{name}_ms": round(t * 1000, 1) for name, t in timings.items()}
+        logger.info(f"interface warmup: {json.dumps({**report, 'total_ms': round(sum(timings.values()) * 1000, 1)})}")
+        return timings
 
     @staticmethod
     def new_storage_client(client_id: Optional[str] = None) -> StorageClient:
         client_id = client_id or settings.STORAGE_CLIENT
         if client_id == "S3":
-            return AWSS3StorageClient(bucket_name=settings.STORAGE_BUCKET)
+            return instrumented(
+                "storage",
+                AWSS3StorageClient(
+                    bucket_name=settings.STORAGE_BUCKET,
+                    part_size=settings.STORAGE_S3_PART_SIZE,
+                    max_concurrency=settings.STORAGE_S3_MAX_CONCURRENCY,
+                ),
+            )
         elif client_id == "LOCAL":
-            return LocalStorageClient(workspace=settings.STORAGE_LOCAL_DIR)
+            return instrumented("storage", LocalStorageClient(workspace=settings.STORAGE_LOCAL_DIR))
         elif client_id == "LOCALSERVER":
-            return LocalStorageClientWithServer(workspace=settings.STORAGE_LOCAL_DIR)
+            return instrumented("storage", LocalStorageClientWithServer(workspace=settings.STORAGE_LOCAL_DIR))
         raise InterfaceException(msg=f"No StorageClient implementation for `{client_id}`")
 
     @property
     def storage_client(self) -> StorageClient:
         if self._storage_client is None:
-            self._storage_client = self.new_storage_client()
+            with self._lock:
+                if self._storage_client is None:
+                    storage_client = self.new_storage_client()
+                    if settings.STORAGE_CONTENT_ADDRESSED:
+                        storage_client = ContentAddressedStorageClient(storage_client)
+                    self._storage_client = storage_client
         return self._storage_client
 
     @staticmethod
     def new_email_client(client_id: Optional[str] = None) -> EmailClient:
         client_id = client_id or settings.EMAIL_CLIENT
         if client_id == "ELASTIC":
-            return ElasticEmailClient(api_key=settings.ELASTIC_EMAIL_API_KEY, sender=settings.ELASTIC_EMAIL_SENDER)
+            return instrumented(
+                "email",
+                ElasticEmailClient(
+                    api_key=settings.ELASTIC_EMAIL_API_KEY,
+                    sender=settings.ELASTIC_EMAIL_SENDER,
+                    metrics_hook=elastic_metrics_hook,
+                ),
+            )
         elif client_id == "LOCAL":
-            return LocalEmailClient(root=settings.EMAIL_LOCAL_DIR)
+            return instrumented(
+                "email", LocalEmailClient(root=settings.EMAIL_LOCAL_DIR, mode=settings.EMAIL_LOCAL_MODE)
+            )
+        elif client_id == "OUTBOX":
+            return instrumented("email", OutboxEmailClient())
         raise InterfaceException(msg=f"No EmailClient implementation for `{client_id}`")
 
+    @staticmethod
+    def new_outbox_delivery_client(client_id: Optional[str] = None) -> EmailClient:
+        # the client the `deliver_emails` worker sends the outbox emails with (it must raise when an email is not sent)
+        client_id = client_id or settings.EMAIL_OUTBOX_DELIVERY_CLIENT
+        if client_id == "ELASTIC":
+            return instrumented(
+                "email",
+                ElasticEmailClient(
+                    api_key=settings.ELASTIC_EMAIL_API_KEY,
+                    sender=settings.ELASTIC_EMAIL_SENDER,
+                    raise_errors=True,
+                    pool_size=settings.EMAIL_OUTBOX_WORKERS,
+                    metrics_hook=elastic_metrics_hook,
+                ),
+            )
+        elif client_id == "LOCAL":
+            return instrumented(
+                "email", LocalEmailClient(root=settings.EMAIL_LOCAL_DIR, mode=settings.EMAIL_LOCAL_MODE)
+            )
+        raise InterfaceException(msg=f"No outbox delivery EmailClient implementation for `{client_id}`")
+
     @property
     def email_client(self) -> EmailClient:
         if self._email_client is None:
-            self._email_client = self.new_email_client()
+            with self._lock:
+                if self._email_client is None:
+                    self._email_client = self.new_email_client()
         return self._email_client
 
     @staticmethod
     def new_feature_flag_client(client_id: Optional[str] = None) -> FeatureFlagsClient:
         client_id = client_id or settings.FF_CLIENT
         if client_id == "DB":
-            return DBFeatureFlagsClient(FlagsGetSet())
+            return instrumented("flags", DBFeatureFlagsClient(FlagsGetSet()))
         elif client_id == "MOCK":
-            return MockFeatureFlagsClient()
+            return instrumented("flags", MockFeatureFlagsClient())
         raise InterfaceException(msg=f"No FeatureFlagsClient implementation for `{client_id}`")
 
     @property
     def feature_flag_client(self) -> FeatureFlagsClient:
         if self._feature_flag_client is None:
-            self._feature_flag_client = self.new_feature_flag_client()
+            with self._lock:
+                if self._feature_flag_client is None:
+                    self._feature_flag_client = self.new_feature_flag_client()
         return self._feature_flag_client
 
     @staticmethod
     def new_grader_client(client_id: Optional[str] = None) -> GraderClient:
         client_id = client_id or settings.GRADER_CLIENT
         if client_id == "HTTP":
-            return GraderClientHttp(url=settings.GRADER_CLIENT_URL, auth_token=settings.GRADER_CLIENT_AUTH_TOKEN)
+            return instrumented(
+                "grader",
+                GraderClientHttp(url=settings.GRADER_CLIENT_URL, auth_token=settings.GRADER_CLIENT_AUTH_TOKEN),
+            )
         if client_id == "FAKE":
-            return GraderClientFakeScores()
+            return instrumented("grader", GraderClientFakeScores())
         raise InterfaceException(msg=f"No GraderClient implementation for `{client_id}`")
 
     @property
     def grader_client(self) -> GraderClient:
         if self._grader_client is None:
-            self._grader_client = self.new_grader_client()
+            with self._lock:
+                if self._grader_client is None:
+                    self._grader_client = self.new_grader_client()
         return self._grader_client
 
 
@@ -1,5 +1,6 @@
 from typing import Optional
 
+from common.cache import bump_data_version, invalidate_candidate_state
 from users.models import User
 
 from .logs import SelectionEvent, log_selection_event
@@ -10,7 +11,10 @@ from .status import SelectionStatusType
 class SelectionDomain:
     @staticmethod
     def create(user: User) -> Selection:
-        return Selection.objects.create(user=user)
+        selection = Selection.objects.create(user=user)
+        invalidate_candidate_state(user.id)
+        bump_data_version()
+        return selection
 
     @staticmethod
     def get_status(selection: Selection) -> SelectionStatusType:
@@ -31,6 +35,8 @@ class SelectionDomain:
             selection.draw_rank = draw_rank
 
         selection.save()
+        invalidate_candidate_state(selection.user_id)
+        bump_data_version()
 
         log_selection_event(
             selection,
@@ -45,6 +51,8 @@ class SelectionDomain:
         selection.status = status
 
         selection.save()
+        invalidate_candidate_state(selection.user_id)
+        bump_data_version()
 
         log_selection_event(
             selection,
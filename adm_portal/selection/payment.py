@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 from logging import getLogger
 from typing import Optional
 
+from common.cache import bump_data_version
 from profiles.models import ProfileTicketTypes
 from users.models import User
 
@@ -37,6 +38,7 @@ def load_payment_data(selection: Selection, staff: Optional[User] = None) -> Non
     selection.payment_value = value
     selection.payment_due_date = datetime.now() + timedelta(hours=48)
     selection.save()
+    bump_data_version()
 
     log_selection_event(
         selection,
@@ -1,5 +1,8 @@
 from logging import getLogger
 
+from django.db import transaction
+
+from email_client import BulkEmailRecipient
 from interface import interface
 from profiles.models import ProfileTicketTypes
 
@@ -17,28 +20,43 @@ def requires_interview(selection: Selection) -> bool:
 
 
 def select() -> None:
-    for selection in SelectionQueries.filter_by_status_in([SelectionStatus.DRAWN]):
-        if requires_interview(selection):
-            to_interview(selection)
-        else:
-            to_selected(selection)
-
-
-def to_selected(selection: Selection) -> None:
+    # all or nothing: a candidate moved out of DRAWN (skipped by a re-run) always gets its email
+    selected = []
+    interview = []
+    with transaction.atomic():
+        drawn = SelectionQueries.filter_by_status_in([SelectionStatus.DRAWN]).select_related("user__profile")
+        for selection in drawn:
+            if requires_interview(selection):
+                interview.append(to_interview(selection))
+            else:
+                selected.append(to_selected(selection))
+
+        interface.email_client.send_bulk("send_selected_and_payment_details", selected)
+        interface.email_client.send_bulk("send_selected_interview_details", interview)
+
+
+def to_selected(selection: Selection) -> BulkEmailRecipient:
+    # returns the email to send
     SelectionDomain.update_status(selection, SelectionStatus.SELECTED)
     load_payment_data(selection)
 
     payment_due_date = selection.payment_due_date.strftime("%Y-%m-%d")
-    interface.email_client.send_selected_and_payment_details(
+    return BulkEmailRecipient(
         to_email=selection.user.email,
-        to_name=selection.user.profile.name,
-        payment_value=selection.payment_value,
-        payment_due_date=payment_due_date,
+        merge={
+            "to_name": selection.user.profile.name,
+            "payment_value": selection.payment_value,
+            "payment_due_date": payment_due_date,
+        },
+        business_key=f"selection:{selection.id}",
     )
 
 
-def to_interview(selection: Selection) -> None:
+def to_interview(selection: Selection) -> BulkEmailRecipient:
+    # returns the email to send
     SelectionDomain.update_status(selection, SelectionStatus.INTERVIEW)
-    interface.email_client.send_selected_interview_details(
-        to_email=selection.user.email, to_name=selection.user.profile.name
+    return BulkEmailRecipient(
+        to_email=selection.user.email,
+        merge={"to_name": selection.user.profile.name},
+        business_key=f"selection:{selection.id}",
     )
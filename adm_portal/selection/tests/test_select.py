@@ -1,5 +1,9 @@
+from typing import Any, List
+
 from django.test import TestCase
 
+from email_client import BulkEmailRecipient, EmailClientException, LocalEmailClient, LocalEmailClientModes
+from interface import interface
 from profiles.models import Profile, ProfileGenders, ProfileTicketTypes
 from users.models import User
 
@@ -28,6 +32,27 @@ class TestSelect(TestCase):
             self.assertEqual(selection.ticket_type, ProfileTicketTypes.regular)
             self.assertEqual(selection.payment_value, 250)
 
+    def test_select_send_failed(self) -> None:
+        class FailingClient(LocalEmailClient):
+            def _send_bulk(self, template: str, recipients: List[BulkEmailRecipient], **kwargs: Any) -> None:
+                raise EmailClientException("provider unavailable")
+
+        for i in range(3):
+            u = User.objects.create(email=f"drawn_female_user_{i}@amd.com")
+            Profile.objects.create(user=u, ticket_type=ProfileTicketTypes.regular, gender=ProfileGenders.female)
+            Selection.objects.create(user=u, status=SelectionStatus.DRAWN)
+
+        email_client = interface.email_client
+        interface._email_client = FailingClient("unused", mode=LocalEmailClientModes.MEMORY)
+        try:
+            with self.assertRaises(EmailClientException):
+                select()
+        finally:
+            interface._email_client = email_client
+
+        # selected (and emailed) by the next run
+        self.assertEqual(SelectionQueries.filter_by_status_in([SelectionStatus.DRAWN]).count(), 3)
+
     # def test_select_to_interview(self) -> None:
     #     for i in range(9):
     #         u = User.objects.create(email=f"female_user_{i}@amd.com")
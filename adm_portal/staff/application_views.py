@@ -1,63 +1,70 @@
-from typing import Any, Dict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
 
-from django.http import Http404, HttpRequest, HttpResponse, HttpResponseRedirect
+from django.http import Http404, HttpRequest, HttpResponse, HttpResponseBadRequest, HttpResponseRedirect
 from django.template import loader
+from django.utils.functional import SimpleLazyObject
 from django.views.decorators.http import require_http_methods
 
-from applications.domain import Domain, Status
-from applications.models import Application, Submission, SubmissionTypes
+from applications.domain import Status
+from applications.models import Submission, SubmissionTypes
+from applications.queries import (
+    ApplicationsQueries,
+    SubmissionsFilter,
+    SubmissionsQueries,
+    SubmissionsQueriesException,
+)
 from interface import interface
 
+from .cache import fragment_cache_context
+
 
 @require_http_methods(["GET"])
 def staff_applications_view(request: HttpRequest) -> HttpResponse:
-    query = Application.objects.all().order_by("user__email")
-
-    filter_by_application_status = request.GET.get("application_status")
-
-    applications = []
-    count_by_type: Dict[Any, Any] = {
-        "application": {
-            s: 0 for s in [Status.not_started.name, Status.ongoing.name, Status.passed.name, Status.failed.name]
-        },
-        SubmissionTypes.coding_test.uname: {
-            s: 0 for s in [Status.not_started.name, Status.ongoing.name, Status.passed.name, Status.failed.name]
-        },
-        SubmissionTypes.slu01.uname: {
-            s: 0 for s in [Status.not_started.name, Status.ongoing.name, Status.passed.name, Status.failed.name]
-        },
-        SubmissionTypes.slu02.uname: {
-            s: 0 for s in [Status.not_started.name, Status.ongoing.name, Status.passed.name, Status.failed.name]
-        },
-        SubmissionTypes.slu03.uname: {
-            s: 0 for s in [Status.not_started.name, Status.ongoing.name, Status.passed.name, Status.failed.name]
-        },
-    }
-    for a in query:
-        application_det_status = Domain.get_application_detailed_status(a)
-        for sub_type, sub_status in application_det_status.items():
-            count_by_type[sub_type][sub_status.name] += 1
-
-        if (
-            filter_by_application_status is not None
-            and application_det_status["application"].name != filter_by_application_status
-        ):
-            continue
-
-        applications.append(
+    filter_by_application_status = request.GET.get("application_status") or None
+    if filter_by_application_status is not None and filter_by_application_status not in Status.__members__:
+        return HttpResponseBadRequest(b"invalid application status")
+
+    cursor = request.GET.get("cursor") or None
+
+    # the queries run only if the template fragments aren't cached (see `staff.cache`)
+    page = SimpleLazyObject(lambda: ApplicationsQueries.browse(status=filter_by_application_status, cursor=cursor))
+    count_by_type = SimpleLazyObject(ApplicationsQueries.cohort_status_summary)
+
+    def get_applications() -> List[Dict[str, Any]]:
+        return [
             {
-                "ref": a,
+                "user_id": a["user__id"],
+                "user_email": a["user__email"],
                 "status_list": [
-                    application_det_status["application"],
-                    *[Domain.get_sub_type_status(a, sub_type) for sub_type in SubmissionTypes.all],
+                    Status[a["application_status"]],
+                    *[Status[a[ApplicationsQueries.status_annotation_key(t)]] for t in SubmissionTypes.all],
                 ],
             }
-        )
+            for a in page.applications
+        ]
+
+    def get_next_page_query() -> Optional[str]:
+        if page.next_cursor is None:
+            return None
+        next_page_params = request.GET.copy()
+        next_page_params["cursor"] = page.next_cursor
+        return next_page_params.urlencode()
 
-    status_enum = {
-        s.name: {"name": s.name, "value": s.value, "count": count_by_type["application"][s.name]} for s in Status
+    def get_status_enum() -> Dict[str, Dict[str, Any]]:
+        return {
+            s.name: {"name": s.name, "value": s.value, "count": count_by_type["application"][s.name]} for s in Status
+        }
+
+    ctx = {
+        **fragment_cache_context(),
+        "application_status": filter_by_application_status,
+        "cursor": cursor,
+        "status_enum": SimpleLazyObject(get_status_enum),
+        "applications": SimpleLazyObject(get_applications),
+        "summary": count_by_type,
+        "next_page_query": SimpleLazyObject(get_next_page_query),
     }
-    ctx = {"status_enum": status_enum, "applications": applications, "summary": count_by_type}
 
     template = loader.get_template("./staff_templates/applications.html")
     return HttpResponse(template.render(ctx, request))
@@ -65,24 +72,50 @@ def staff_applications_view(request: HttpRequest) -> HttpResponse:
 
 @require_http_methods(["GET"])
 def staff_submissions_view(request: HttpRequest) -> HttpResponse:
-    query = Submission.objects.all().order_by("-created_at")
+    try:
+        submissions_filter = _get_submissions_filter(request)
+        page = SubmissionsQueries.browse(submissions_filter, cursor=request.GET.get("cursor") or None)
+    except (ValueError, SubmissionsQueriesException):
+        return HttpResponseBadRequest(b"invalid submissions filter")
 
-    user_email = request.GET.get("user_email", None)
-    if user_email is not None:
-        query = query.filter(application__user__email__contains=user_email)
-    else:
-        query = query[:25]
+    next_page_query = None
+    if page.next_cursor is not None:
+        next_page_params = request.GET.copy()
+        next_page_params["cursor"] = page.next_cursor
+        next_page_query = next_page_params.urlencode()
 
     ctx = {
-        "submissions": query.values(
-            "id", "application__user__id", "application__user__email", "submission_type", "score"
-        )
+        "submissions": page.submissions,
+        "filter": submissions_filter,
+        "submission_types": SubmissionTypes.all,
+        "next_page_query": next_page_query,
     }
 
     template = loader.get_template("./staff_templates/submissions.html")
     return HttpResponse(template.render(ctx, request))
 
 
+def _get_submissions_filter(request: HttpRequest) -> SubmissionsFilter:
+    def get_param(key: str) -> Optional[str]:
+        return request.GET.get(key) or None
+
+    min_score = get_param("min_score")
+    max_score = get_param("max_score")
+    created_from = get_param("created_from")
+    created_to = get_param("created_to")
+
+    return SubmissionsFilter(
+        submission_type=get_param("submission_type"),
+        min_score=int(min_score) if min_score is not None else None,
+        max_score=int(max_score) if max_score is not None else None,
+        created_from=datetime.strptime(created_from, "%Y-%m-%d") if created_from is not None else None,
+        # inclusive day on the page, exclusive bound on the query
+        created_to=datetime.strptime(created_to, "%Y-%m-%d") + timedelta(days=1) if created_to is not None else None,
+        user_uuid=get_param("user_uuid"),
+        user_email=get_param("user_email"),
+    )
+
+
 @require_http_methods(["GET"])
 def staff_submission_download_view(request: HttpRequest, submission_id: int) -> HttpResponse:
     try:
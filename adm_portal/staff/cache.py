@@ -0,0 +1,12 @@
+from typing import Any, Dict
+
+from common.cache import get_data_version
+
+# the heavy staff tables template fragments are cached with the candidates data version in their keys
+# (`{% cache ... data_version %}`, bumped by the domain layer, see `common.cache`)
+# the applications statuses also change with time (coding test duration, closing date): short timeout
+STAFF_FRAGMENT_CACHE_TIMEOUT = 60
+
+
+def fragment_cache_context() -> Dict[str, Any]:
+    return {"data_version": get_data_version(), "fragment_cache_timeout": STAFF_FRAGMENT_CACHE_TIMEOUT}
@@ -2,40 +2,36 @@ from django.http import Http404, HttpRequest, HttpResponse
 from django.template import loader
 from django.views.decorators.http import require_http_methods
 
-from applications.domain import Domain as ApplicationDomain
-from applications.models import Application, Submission, SubmissionTypes
 from users.models import User
 
+from .queries import CandidateQueries
+
 
 @require_http_methods(["GET"])
 def staff_candidate_view(request: HttpRequest, user_id: int) -> HttpResponse:
     try:
-        user = User.objects.filter(is_staff=False).filter(is_admin=False).get(id=user_id)
+        candidate = CandidateQueries.get_candidate_detail(user_id)
     except User.DoesNotExist:
         raise Http404
 
-    try:
-        application = user.application
-        total_submissions = Submission.objects.filter(application=application).count()
-        application_best_scores = {
-            SubmissionTypes.coding_test.uname: ApplicationDomain.get_best_score(
-                application, SubmissionTypes.coding_test
-            ),
-            SubmissionTypes.slu01.uname: ApplicationDomain.get_best_score(application, SubmissionTypes.slu01),
-            SubmissionTypes.slu02.uname: ApplicationDomain.get_best_score(application, SubmissionTypes.slu02),
-            SubmissionTypes.slu03.uname: ApplicationDomain.get_best_score(application, SubmissionTypes.slu03),
-        }
-    except Application.DoesNotExist:
-        total_submissions = 0
-        application_best_scores = {}
-
-    ctx = {"user": user, "total_submissions": total_submissions, "application_best_scores": application_best_scores}
+    ctx = {
+        "user": candidate.user,
+        "profile": candidate.profile,
+        "selection": candidate.selection,
+        "total_submissions": candidate.total_submissions,
+        "application_best_scores": candidate.best_scores if candidate.application is not None else {},
+    }
     template = loader.get_template("./staff_templates/candidate.html")
     return HttpResponse(template.render(ctx, request))
 
 
 @require_http_methods(["GET"])
 def staff_candidates_view(request: HttpRequest) -> HttpResponse:
-    ctx = {"users": User.objects.filter(is_staff=False).filter(is_admin=False).order_by("email")}
+    ctx = {
+        "users": User.objects.filter(is_staff=False)
+        .filter(is_admin=False)
+        .select_related("profile", "selection")
+        .order_by("email")
+    }
     template = loader.get_template("./staff_templates/candidates.html")
     return HttpResponse(template.render(ctx, request))
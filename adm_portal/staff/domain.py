@@ -2,8 +2,8 @@ from datetime import datetime
 from logging import getLogger
 
 from applications.domain import Domain as ApplicationDomain
-from applications.domain import DomainException as ApplicationDomainException
 from applications.domain import DomainQueries as ApplicationDomainQueries
+from email_client import BulkEmailRecipient
 from interface import interface
 from selection.domain import SelectionDomain
 from selection.queries import SelectionQueries
@@ -31,18 +31,11 @@ class Events:
             logger.error("trying to trigger `applications over` event but applications are still open")
             raise EventsException("Can't trigger `applications over` event")
 
-        sent_count = 0
-        q = ApplicationDomainQueries.all()
-        for a in q:
-            try:
-                ApplicationDomain.application_over(a)
-                sent_count += 1
-            except ApplicationDomainException:
-                pass  # means that email was already sent
-
-            a.refresh_from_db()
-            if a.application_over_email_sent == "passed":
-                SelectionDomain.create(a.user)
+        q = ApplicationDomainQueries.all().select_related("user__profile")
+        sent_count = ApplicationDomain.applications_over(q)
+
+        for a in ApplicationDomainQueries.all().filter(application_over_email_sent="passed").select_related("user"):
+            SelectionDomain.create(a.user)
 
         logger.info(f"sent {sent_count} `application_over` emails")
 
@@ -74,15 +67,22 @@ class Events:
             )
 
         sent_count = 0
-        for selection in SelectionQueries.get_all():
+        recipients = []
+        for selection in SelectionQueries.get_all().select_related("user__profile"):
             selection_status = SelectionDomain.get_status(selection)
             if selection_status == SelectionStatus.PASSED_TEST:
                 # this user was never selected
                 SelectionDomain.update_status(selection, SelectionStatus.NOT_SELECTED)
-                interface.email_client.send_admissions_are_over_not_selected(
-                    to_email=selection.user.email, to_name=selection.user.profile.name
+                recipients.append(
+                    BulkEmailRecipient(
+                        to_email=selection.user.email,
+                        merge={"to_name": selection.user.profile.name},
+                        business_key=f"selection:{selection.id}",
+                    )
                 )
 
             sent_count += 1
 
+        interface.email_client.send_bulk("send_admissions_are_over_not_selected", recipients)
+
         logger.info(f"sent {sent_count} `admissions_over` emails")
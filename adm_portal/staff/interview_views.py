@@ -13,11 +13,13 @@ from selection.queries import SelectionQueries
 from selection.status import SelectionStatus
 from users.models import User
 
+from .queries import CandidateQueries
+
 
 @require_http_methods(["GET"])
 def staff_interviews_view(request: HttpRequest) -> HttpResponse:
     ctx = {
-        "selections": SelectionQueries.filter_by_status_in([SelectionStatus.INTERVIEW]),
+        "selections": SelectionQueries.filter_by_status_in([SelectionStatus.INTERVIEW]).select_related("user"),
         "selection_status": SelectionStatus,
     }
     template = loader.get_template("./staff_templates/interviews.html")
@@ -34,16 +36,14 @@ def staff_interview_view(request: HttpRequest, user_id: int) -> HttpResponse:
 
 def _get_user_selection(user_id: int) -> Tuple[User, Selection]:
     try:
-        candidate = User.objects.get(id=user_id)
+        candidate = CandidateQueries.get_candidate_detail(user_id, with_submissions=False)
     except User.DoesNotExist:
         raise Http404
 
-    try:
-        selection = Selection.objects.get(user=candidate)
-    except User.DoesNotExist:
+    if candidate.selection is None:
         raise Http404
 
-    return candidate, selection
+    return candidate.user, candidate.selection
 
 
 def _get_staff_interview_view(request: HttpRequest, selection: Selection, candidate_id: int) -> HttpResponse:
@@ -0,0 +1,39 @@
+from time import monotonic
+
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.views.decorators.http import require_http_methods
+
+from common.metrics import client_metrics
+from common.storage_health import check_keys, get_expected_keys
+from interface import interface
+
+# seconds, slower keys are reported as not found
+STORAGE_HEALTH_TIMEOUT = 0.8
+
+
+@require_http_methods(["GET"])
+def ops_storage_health_view(request: HttpRequest) -> HttpResponse:
+    # ?warm=1 also warms the storage urls (see `check_key`)
+    start = monotonic()
+    keys = check_keys(
+        interface.storage_client,
+        get_expected_keys(),
+        timeout=STORAGE_HEALTH_TIMEOUT,
+        warm_urls=request.GET.get("warm") == "1",
+    )
+    ok = all(k.found for k in keys)
+
+    return JsonResponse(
+        status=200 if ok else 503,
+        data={
+            "ok": ok,
+            "latency_ms": round((monotonic() - start) * 1000, 1),
+            "keys": [k.as_dict() for k in keys],
+        },
+    )
+
+
+@require_http_methods(["GET"])
+def ops_metrics_view(request: HttpRequest) -> HttpResponse:
+    # interface clients calls, errors and latency (of the server process that handles the request)
+    return HttpResponse(client_metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -13,10 +13,15 @@ from selection.queries import SelectionQueries
 from selection.status import SelectionStatus
 from users.models import User
 
+from .cache import fragment_cache_context
+from .queries import CandidateQueries
+
 
 @require_http_methods(["GET"])
 def staff_payments_view(request: HttpRequest) -> HttpResponse:
     ctx = {
+        **fragment_cache_context(),
+        # evaluated only if the table fragment isn't cached (see `staff.cache`)
         "selections": SelectionQueries.filter_by_status_in(
             [
                 SelectionStatus.SELECTED,
@@ -24,7 +29,7 @@ def staff_payments_view(request: HttpRequest) -> HttpResponse:
                 SelectionStatus.ACCEPTED,
                 SelectionStatus.REJECTED,
             ]
-        ),
+        ).select_related("user"),
         "selection_status": SelectionStatus,
     }
     template = loader.get_template("./staff_templates/payments.html")
@@ -53,16 +58,14 @@ def reset_payment_view(request: HttpRequest, user_id: int) -> HttpResponse:
 
 def _get_user_selection(user_id: int) -> Tuple[User, Selection]:
     try:
-        candidate = User.objects.get(id=user_id)
+        candidate = CandidateQueries.get_candidate_detail(user_id, with_submissions=False)
     except User.DoesNotExist:
         raise Http404
 
-    try:
-        selection = Selection.objects.get(user=candidate)
-    except User.DoesNotExist:
+    if candidate.selection is None:
         raise Http404
 
-    return candidate, selection
+    return candidate.user, candidate.selection
 
 
 def _get_staff_payment_view(request: HttpRequest, selection: Selection, candidate_id: int) -> HttpResponse:
@@ -0,0 +1,38 @@
+from django.db.models import Max, Sum
+from django.http import HttpRequest, HttpResponse
+from django.template import loader
+from django.views.decorators.http import require_http_methods
+
+from common.models import RouteProfile
+from common.profiling import get_top_functions, load_route_stats
+from interface import interface
+
+
+@require_http_methods(["GET"])
+def staff_profiling_view(request: HttpRequest) -> HttpResponse:
+    # profiled routes, and the top functions of `?route=` (see `common.middleware.ProfilingMiddleware`)
+    routes = (
+        RouteProfile.objects.values("route")
+        .annotate(requests=Sum("requests"), total_time=Sum("total_time"), updated_at=Max("updated_at"))
+        .order_by("-total_time")
+    )
+    for r in routes:
+        r["avg_time_ms"] = r["total_time"] / r["requests"] * 1000
+
+    route = request.GET.get("route")
+    functions = []
+    if route is not None:
+        stats = load_route_stats(interface.storage_client, route)
+        if stats is not None:
+            functions = [
+                {
+                    "function": f.function,
+                    "calls": f.calls,
+                    "tottime_ms": f.tottime * 1000,
+                    "cumtime_ms": f.cumtime * 1000,
+                }
+                for f in get_top_functions(stats)
+            ]
+
+    template = loader.get_template("./staff_templates/profiling.html")
+    return HttpResponse(template.render({"routes": routes, "route": route, "functions": functions}, request))
@@ -0,0 +1,72 @@
+from typing import Dict, NamedTuple, Optional
+
+from django.db.models import Count, Max
+
+from applications.models import Application, Submission, SubmissionTypes
+from profiles.models import Profile
+from selection.models import Selection
+from users.models import User
+
+
+class CandidateDetail(NamedTuple):
+    user: User
+    profile: Optional[Profile]
+    application: Optional[Application]
+    selection: Optional[Selection]
+    # per submission type uname
+    best_scores: Dict[str, Optional[int]]
+    submissions_count: Dict[str, int]
+
+    @property
+    def total_submissions(self) -> int:
+        return sum(self.submissions_count.values())
+
+
+class CandidateQueries:
+    @staticmethod
+    def get_candidate_detail(user_id: int, *, with_submissions: bool = True) -> CandidateDetail:
+        # 1st query: user + one-to-one relations (profile, application, selection)
+        # 2nd query (only if with_submissions and the candidate has an application): best score / count per type
+        user = (
+            User.objects.filter(is_staff=False)
+            .filter(is_admin=False)
+            .select_related("profile", "application", "selection")
+            .get(id=user_id)
+        )
+
+        try:
+            profile: Optional[Profile] = user.profile
+        except Profile.DoesNotExist:
+            profile = None
+
+        try:
+            application: Optional[Application] = user.application
+        except Application.DoesNotExist:
+            application = None
+
+        try:
+            selection: Optional[Selection] = user.selection
+        except Selection.DoesNotExist:
+            selection = None
+
+        best_scores: Dict[str, Optional[int]] = {sub_type.uname: None for sub_type in SubmissionTypes.all}
+        submissions_count: Dict[str, int] = {sub_type.uname: 0 for sub_type in SubmissionTypes.all}
+        if with_submissions and application is not None:
+            rows = (
+                Submission.objects.filter(application=application)
+                .values("submission_type")
+                .annotate(best_score=Max("score"), count=Count("id"))
+                .order_by()
+            )
+            for row in rows:
+                best_scores[row["submission_type"]] = row["best_score"]
+                submissions_count[row["submission_type"]] = row["count"]
+
+        return CandidateDetail(
+            user=user,
+            profile=profile,
+            application=application,
+            selection=selection,
+            best_scores=best_scores,
+            submissions_count=submissions_count,
+        )
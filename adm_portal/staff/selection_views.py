@@ -1,7 +1,11 @@
+from typing import Any, Dict
+
 from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
 from django.template import loader
+from django.utils.functional import SimpleLazyObject
 from django.views.decorators.http import require_http_methods
 
+from custom_typing.queryset import QuerySet
 from profiles.models import ProfileGenders, ProfileTicketTypes
 from selection.draw import default_draw_params, draw, reject_draw
 from selection.models import Selection
@@ -9,6 +13,8 @@ from selection.queries import SelectionQueries
 from selection.select import select
 from selection.status import SelectionStatus
 
+from .cache import fragment_cache_context
+
 
 @require_http_methods(["GET"])
 def staff_selection_candidates_view(request: HttpRequest) -> HttpResponse:
@@ -18,6 +24,20 @@ def staff_selection_candidates_view(request: HttpRequest) -> HttpResponse:
         [SelectionStatus.INTERVIEW, SelectionStatus.SELECTED, SelectionStatus.TO_BE_ACCEPTED, SelectionStatus.ACCEPTED]
     )
 
+    ctx = {
+        **fragment_cache_context(),
+        "first_table_candidates": all_after_draw.select_related("user__profile"),
+        "second_table_candidates": all_drawn.select_related("user__profile"),
+        # counted only if the summary fragment isn't cached (see `staff.cache`)
+        "summary": SimpleLazyObject(lambda: _get_selections_summary(all_passed_test, all_drawn, all_after_draw)),
+    }
+    template = loader.get_template("./staff_templates/selections.html")
+    return HttpResponse(template.render(ctx, request))
+
+
+def _get_selections_summary(
+    all_passed_test: QuerySet[Selection], all_drawn: QuerySet[Selection], all_after_draw: QuerySet[Selection]
+) -> Dict[str, Any]:
     # no scholarships
     passed_test_no_scholarships = SelectionQueries.no_scholarships(all_passed_test)
     drawn_no_scholarships = SelectionQueries.no_scholarships(all_drawn)
@@ -72,60 +92,54 @@ def staff_selection_candidates_view(request: HttpRequest) -> HttpResponse:
         user__profile__ticket_type=ProfileTicketTypes.company
     ).count()
 
-    ctx = {
-        "first_table_candidates": all_after_draw,
-        "second_table_candidates": all_drawn,
-        "summary": {
-            "no_scholarship": {
-                "drawn_candidates": drawn_candidates_no_scholarships,
-                "drawn_female": drawn_female_no_scholarships,
-                "drawn_company": drawn_company_no_scholarships,
-                "selected_accepted_candidates": selected_accepted_candidates_no_scholarships,
-                "selected_accepted_female": selected_accepted_female_no_scholarships,
-                "selected_accepted_company": selected_accepted_company_no_scholarships,
-                "total_candidates": drawn_candidates_no_scholarships + selected_accepted_candidates_no_scholarships,
-                "total_female": drawn_female_no_scholarships + selected_accepted_female_no_scholarships,
-                "total_company": drawn_company_no_scholarships + selected_accepted_company_no_scholarships,
-                "pct_candidates": (drawn_candidates_no_scholarships + selected_accepted_candidates_no_scholarships)
-                / default_draw_params.number_of_seats
-                * 100,
-                "pct_female": (drawn_female_no_scholarships + selected_accepted_female_no_scholarships)
-                / default_draw_params.number_of_seats
-                * 100,
-                "pct_company": (drawn_company_no_scholarships + selected_accepted_company_no_scholarships)
-                / default_draw_params.number_of_seats
-                * 100,
-                "left_out_candidates": left_out_candidates_no_scholarships,
-                "left_out_females": left_out_females_no_scholarships,
-                "left_out_non_company": left_out_non_company_no_scholarships,
-            },
-            "scholarship": {
-                "drawn_candidates": drawn_candidates_scholarships,
-                "drawn_female": drawn_female_scholarships,
-                "drawn_company": drawn_company_scholarships,
-                "selected_accepted_candidates": selected_accepted_candidates_scholarships,
-                "selected_accepted_female": selected_accepted_female_scholarships,
-                "selected_accepted_company": selected_accepted_company_scholarships,
-                "total_candidates": drawn_candidates_scholarships + selected_accepted_candidates_scholarships,
-                "total_female": drawn_female_scholarships + selected_accepted_female_scholarships,
-                "total_company": drawn_company_scholarships + selected_accepted_company_scholarships,
-                "pct_candidates": (drawn_candidates_scholarships + selected_accepted_candidates_scholarships)
-                / default_draw_params.number_of_seats
-                * 100,
-                "pct_female": (drawn_female_scholarships + selected_accepted_female_scholarships)
-                / default_draw_params.number_of_seats
-                * 100,
-                "pct_company": (drawn_company_scholarships + selected_accepted_company_scholarships)
-                / default_draw_params.number_of_seats
-                * 100,
-                "left_out_candidates": left_out_candidates_scholarships,
-                "left_out_females": left_out_females_scholarships,
-                "left_out_non_company": left_out_non_company_scholarships,
-            },
+    return {
+        "no_scholarship": {
+            "drawn_candidates": drawn_candidates_no_scholarships,
+            "drawn_female": drawn_female_no_scholarships,
+            "drawn_company": drawn_company_no_scholarships,
+            "selected_accepted_candidates": selected_accepted_candidates_no_scholarships,
+            "selected_accepted_female": selected_accepted_female_no_scholarships,
+            "selected_accepted_company": selected_accepted_company_no_scholarships,
+            "total_candidates": drawn_candidates_no_scholarships + selected_accepted_candidates_no_scholarships,
+            "total_female": drawn_female_no_scholarships + selected_accepted_female_no_scholarships,
+            "total_company": drawn_company_no_scholarships + selected_accepted_company_no_scholarships,
+            "pct_candidates": (drawn_candidates_no_scholarships + selected_accepted_candidates_no_scholarships)
+            / default_draw_params.number_of_seats
+            * 100,
+            "pct_female": (drawn_female_no_scholarships + selected_accepted_female_no_scholarships)
+            / default_draw_params.number_of_seats
+            * 100,
+            "pct_company": (drawn_company_no_scholarships + selected_accepted_company_no_scholarships)
+            / default_draw_params.number_of_seats
+            * 100,
+            "left_out_candidates": left_out_candidates_no_scholarships,
+            "left_out_females": left_out_females_no_scholarships,
+            "left_out_non_company": left_out_non_company_no_scholarships,
+        },
+        "scholarship": {
+            "drawn_candidates": drawn_candidates_scholarships,
+            "drawn_female": drawn_female_scholarships,
+            "drawn_company": drawn_company_scholarships,
+            "selected_accepted_candidates": selected_accepted_candidates_scholarships,
+            "selected_accepted_female": selected_accepted_female_scholarships,
+            "selected_accepted_company": selected_accepted_company_scholarships,
+            "total_candidates": drawn_candidates_scholarships + selected_accepted_candidates_scholarships,
+            "total_female": drawn_female_scholarships + selected_accepted_female_scholarships,
+            "total_company": drawn_company_scholarships + selected_accepted_company_scholarships,
+            "pct_candidates": (drawn_candidates_scholarships + selected_accepted_candidates_scholarships)
+            / default_draw_params.number_of_seats
+            * 100,
+            "pct_female": (drawn_female_scholarships + selected_accepted_female_scholarships)
+            / default_draw_params.number_of_seats
+            * 100,
+            "pct_company": (drawn_company_scholarships + selected_accepted_company_scholarships)
+            / default_draw_params.number_of_seats
+            * 100,
+            "left_out_candidates": left_out_candidates_scholarships,
+            "left_out_females": left_out_females_scholarships,
+            "left_out_non_company": left_out_non_company_scholarships,
         },
     }
-    template = loader.get_template("./staff_templates/selections.html")
-    return HttpResponse(template.render(ctx, request))
 
 
 @require_http_methods(["POST"])
@@ -0,0 +1,42 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+
+from common.cache import bump_data_version, get_data_version
+from selection.domain import SelectionDomain
+from selection.models import Selection
+from selection.status import SelectionStatus
+from users.models import User
+
+
+class TestStaffCache(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_data_version(self) -> None:
+        version = get_data_version()
+        self.assertEqual(get_data_version(), version)
+
+        bump_data_version()
+        self.assertGreater(get_data_version(), version)
+
+    def test_payments_fragment(self) -> None:
+        User.objects.create_staff_user(email="staff@adm.com", password="staff")
+        candidate = User.objects.create_user(email="candidate@adm.com", password="candidate")
+        selection = SelectionDomain.create(candidate)
+        SelectionDomain.update_status(selection, SelectionStatus.SELECTED)
+
+        client = Client()
+        client.login(email="staff@adm.com", password="staff")
+        self.assertContains(client.get("/staff/payments"), SelectionStatus.SELECTED)
+
+        # not through the domain: the cached table is served
+        Selection.objects.filter(id=selection.id).update(status=SelectionStatus.TO_BE_ACCEPTED)
+        with self.assertNumQueries(2):  # session, user
+            response = client.get("/staff/payments")
+        self.assertContains(response, SelectionStatus.SELECTED)
+
+        selection.refresh_from_db()
+        SelectionDomain.manual_update_status(selection, SelectionStatus.ACCEPTED, candidate)
+        response = client.get("/staff/payments")
+        self.assertContains(response, SelectionStatus.ACCEPTED)
+        self.assertNotContains(response, SelectionStatus.SELECTED)
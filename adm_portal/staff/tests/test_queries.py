@@ -0,0 +1,77 @@
+from django.test import TestCase
+
+from applications.models import Application, Submission, SubmissionTypes
+from profiles.models import Profile
+from selection.models import Selection
+from staff.queries import CandidateQueries
+from users.models import User
+
+
+class TestCandidateQueries(TestCase):
+    def test_get_candidate_detail_empty(self) -> None:
+        u = User.objects.create(email="u@test.com")
+
+        with self.assertNumQueries(1):
+            candidate = CandidateQueries.get_candidate_detail(u.id)
+
+        self.assertEqual(candidate.user, u)
+        self.assertIsNone(candidate.profile)
+        self.assertIsNone(candidate.application)
+        self.assertIsNone(candidate.selection)
+        self.assertEqual(candidate.best_scores, {s.uname: None for s in SubmissionTypes.all})
+        self.assertEqual(candidate.total_submissions, 0)
+
+    def test_get_candidate_detail(self) -> None:
+        u = User.objects.create(email="u@test.com")
+        Profile.objects.create(user=u, full_name="Candidate Name")
+        a = Application.objects.create(user=u)
+        Selection.objects.create(user=u)
+        Submission.objects.create(application=a, score=10, submission_type=SubmissionTypes.coding_test.uname)
+        Submission.objects.create(application=a, score=18, submission_type=SubmissionTypes.coding_test.uname)
+        Submission.objects.create(application=a, score=12, submission_type=SubmissionTypes.slu02.uname)
+
+        other_a = Application.objects.create(user=User.objects.create(email="other@test.com"))
+        Submission.objects.create(application=other_a, score=20, submission_type=SubmissionTypes.slu02.uname)
+
+        with self.assertNumQueries(2):
+            candidate = CandidateQueries.get_candidate_detail(u.id)
+            self.assertEqual(candidate.profile, candidate.user.profile)
+            self.assertEqual(candidate.user.profile.full_name, "Candidate Name")
+            self.assertEqual(candidate.application, a)
+            self.assertEqual(candidate.selection, candidate.user.selection)
+            self.assertEqual(candidate.user.selection.user.profile.full_name, "Candidate Name")
+
+        self.assertEqual(
+            candidate.best_scores,
+            {
+                SubmissionTypes.coding_test.uname: 18,
+                SubmissionTypes.slu01.uname: None,
+                SubmissionTypes.slu02.uname: 12,
+                SubmissionTypes.slu03.uname: None,
+            },
+        )
+        self.assertEqual(
+            candidate.submissions_count,
+            {
+                SubmissionTypes.coding_test.uname: 2,
+                SubmissionTypes.slu01.uname: 0,
+                SubmissionTypes.slu02.uname: 1,
+                SubmissionTypes.slu03.uname: 0,
+            },
+        )
+        self.assertEqual(candidate.total_submissions, 3)
+
+    def test_get_candidate_detail_without_submissions(self) -> None:
+        u = User.objects.create(email="u@test.com")
+        a = Application.objects.create(user=u)
+        Submission.objects.create(application=a, score=10, submission_type=SubmissionTypes.coding_test.uname)
+
+        with self.assertNumQueries(1):
+            candidate = CandidateQueries.get_candidate_detail(u.id, with_submissions=False)
+        self.assertEqual(candidate.total_submissions, 0)
+
+    def test_get_candidate_detail_staff(self) -> None:
+        staff = User.objects.create_staff_user(email="staff@test.com", password="pw")
+
+        with self.assertRaises(User.DoesNotExist):
+            CandidateQueries.get_candidate_detail(staff.id)
@@ -1,3 +1,3 @@
 from .aws_s3 import AWSS3StorageClient
-from .client import StorageClient, StorageClientException
+from .client import HashingChunksReader, StorageClient, StorageClientException, StorageKeyInfo
 from .local import LocalStorageClient, LocalStorageClientWithServer
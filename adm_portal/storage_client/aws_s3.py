@@ -1,33 +1,98 @@
 import logging
-from typing import Any, Optional
+from threading import Lock
+from time import monotonic
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 import boto3
 from boto3.exceptions import Boto3Error
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 
-from .client import StorageClient, StorageClientException
+from .client import DEFAULT_CHUNK_SIZE, HashingChunksReader, StorageClient, StorageClientException, StorageKeyInfo
 
 logger = logging.getLogger(__name__)
 
+MB = 1024 * 1024
+
 
 class AWSS3StorageClient(StorageClient):
-    def __init__(self, bucket_name: str) -> None:
+    # presigned urls are valid for `url_expires_in` seconds, the same url is handed out for `url_cache_ttl` seconds
+    url_expires_in = 30
+    url_cache_ttl = 15
+    url_cache_size = 1024
+
+    def __init__(
+        self, bucket_name: str, *, part_size: int = 8 * MB, max_concurrency: int = 4, max_pool_connections: int = 10
+    ) -> None:
         self.bucket_name = bucket_name
+        # uploads bigger than `part_size` are multipart uploads, `max_concurrency` parts are uploaded at a time
+        # (parts are read from the stream as they are uploaded, at most ~`part_size * max_concurrency` in memory)
+        self.transfer_config = TransferConfig(
+            multipart_threshold=part_size, multipart_chunksize=part_size, max_concurrency=max_concurrency
+        )
+        self.max_pool_connections = max(max_pool_connections, max_concurrency)
+        self._s3 = None
+        self._s3_lock = Lock()
+        self._url_cache: Dict[Tuple[Tuple[str, str], ...], Tuple[str, float]] = {}
+
+    @property
+    def s3(self) -> Any:
+        # boto3 clients are thread safe, a single one keeps a pool of connections
+        # (creating one isn't: the threads of a worker must not create it concurrently)
+        if self._s3 is None:
+            with self._s3_lock:
+                if self._s3 is None:
+                    self._s3 = boto3.client("s3", config=Config(max_pool_connections=self.max_pool_connections))
+        return self._s3
+
+    def warmup(self) -> None:
+        _ = self.s3
 
-    def save(self, key: str, file: Any) -> None:
-        s3 = boto3.resource("s3")
+    def save(self, key: str, file: Any) -> str:
+        reader = HashingChunksReader(self.iter_chunks(file))
         try:
-            s3_obj = s3.Bucket(self.bucket_name).put_object(Key=key, Body=file)
-            logger.info(f"s3 upload success: {s3_obj.bucket_name}/{s3_obj.key}")
-        except Boto3Error as e:
+            # S3 checks the sha256 of the object (of each part, for multipart uploads) and rejects a corrupted upload
+            self.s3.upload_fileobj(
+                reader,
+                self.bucket_name,
+                key,
+                ExtraArgs={"ChecksumAlgorithm": "SHA256"},
+                Config=self.transfer_config,
+            )
+        except (Boto3Error, BotoCoreError, ClientError) as e:
             logger.error(f"s3 upload error: {e}")
             raise StorageClientException(e)
 
+        checksum = reader.hexdigest()
+        logger.info(f"s3 upload success: {self.bucket_name}/{key} (size={reader.size}, sha256={checksum})")
+        return checksum
+
+    def head(self, key: str) -> Optional[StorageKeyInfo]:
+        try:
+            resp = self.s3.head_object(Bucket=self.bucket_name, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ["404", "NoSuchKey", "NotFound"]:
+                return None
+            raise StorageClientException(e)
+        except (Boto3Error, BotoCoreError) as e:
+            raise StorageClientException(e)
+        return StorageKeyInfo(size=resp["ContentLength"], etag=resp["ETag"])
+
+    def read_chunks(self, key: str) -> Iterator[bytes]:
+        try:
+            body = self.s3.get_object(Bucket=self.bucket_name, Key=key)["Body"]
+            yield from body.iter_chunks(DEFAULT_CHUNK_SIZE)
+        except (Boto3Error, BotoCoreError, ClientError) as e:
+            logger.error(f"s3 download error: {e}")
+            raise StorageClientException(e)
+
     def get_url(self, key: str, *, content_type: Optional[str] = None) -> str:
         params = {"Bucket": self.bucket_name, "Key": key}
         if content_type is not None:
             params["ResponseContentType"] = content_type
         try:
-            return boto3.client("s3").generate_presigned_url(ClientMethod="get_object", Params=params, ExpiresIn=30)
+            return self._get_presigned_url(params)
         except Boto3Error as e:
             logger.error(f"s3 url gen error: {e}")
             raise StorageClientException(e)
@@ -38,16 +103,27 @@ class AWSS3StorageClient(StorageClient):
         content_type = content_type or "application/octet-stream"
 
         try:
-            return boto3.client("s3").generate_presigned_url(
-                ClientMethod="get_object",
-                Params={
+            return self._get_presigned_url(
+                {
                     "Bucket": self.bucket_name,
                     "Key": key,
-                    "ResponseContentDisposition": f"attachment; filename={filename or key}",
+                    "ResponseContentDisposition": self.content_disposition("attachment", filename or key),
                     "ResponseContentType": content_type,
-                },
-                ExpiresIn=30,
+                }
             )
         except Boto3Error as e:
             logger.error(f"s3 url gen error: {e}")
             raise e
+
+    def _get_presigned_url(self, params: Dict[str, str]) -> str:
+        cache_key = tuple(sorted(params.items()))
+        now = monotonic()
+        cached = self._url_cache.get(cache_key)
+        if cached is not None and now - cached[1] < self.url_cache_ttl:
+            return cached[0]
+
+        url = self.s3.generate_presigned_url(ClientMethod="get_object", Params=params, ExpiresIn=self.url_expires_in)
+        if len(self._url_cache) >= self.url_cache_size:
+            self._url_cache.clear()
+        self._url_cache[cache_key] = (url, now)
+        return url
@@ -1,7 +1,14 @@
+import hashlib
 import os
 import uuid
 from abc import ABC, abstractmethod
-from typing import Any, Optional
+from typing import Any, Iterable, Iterator, NamedTuple, Optional
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+
+# read size for files without `.chunks()`
+DEFAULT_CHUNK_SIZE = 1024 * 1024
 
 
 class StorageClientException(Exception):
@@ -12,14 +19,50 @@ class StorageClientException(Exception):
         return str(self.e)
 
 
+class StorageKeyInfo(NamedTuple):
+    size: int
+    etag: str
+
+
 class StorageClient(ABC):
     @staticmethod
     def key_append_uuid(key: str) -> str:
         key_basename, key_ext = os.path.splitext(key)
         return f"{key_basename}_{uuid.uuid4().hex}{key_ext}"
 
+    @staticmethod
+    def content_disposition(disposition: str, filename: str) -> str:
+        # quoted ascii `filename` (the characters it can't hold replaced by `_`) and the RFC 5987 utf-8 `filename*`
+        fallback = "".join(c if 32 <= ord(c) < 127 and c not in '"\\' else "_" for c in filename)
+        return f"{disposition}; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+    @staticmethod
+    def iter_chunks(file: Any) -> Iterator[bytes]:
+        # `file` can be a django `File` / `UploadedFile` (`.chunks()`), a binary file object, bytes
+        # or any iterable of byte chunks
+        if isinstance(file, (bytes, bytearray)):
+            yield bytes(file)
+        elif hasattr(file, "chunks"):
+            yield from file.chunks()
+        elif hasattr(file, "read"):
+            yield from iter(lambda: file.read(DEFAULT_CHUNK_SIZE), b"")
+        else:
+            yield from file
+
+    @abstractmethod
+    def save(self, key: str, file: Any) -> str:
+        # `file`: anything `iter_chunks` accepts
+        # returns the sha256 (hex) of the saved content
+        pass
+
+    @abstractmethod
+    def head(self, key: str) -> Optional[StorageKeyInfo]:
+        # None if there is no `key`
+        pass
+
     @abstractmethod
-    def save(self, key: str, file: Any) -> None:
+    def read_chunks(self, key: str) -> Iterator[bytes]:
+        # the content saved in `key`, in chunks of (at most) `DEFAULT_CHUNK_SIZE` bytes
         pass
 
     @abstractmethod
@@ -31,3 +74,50 @@ class StorageClient(ABC):
         self, key: str, *, content_type: Optional[str] = None, filename: Optional[str] = None
     ) -> str:
         pass
+
+    # async callers (asgi views): the sync methods run in a worker thread, the event loop doesn't wait on the storage
+    async def asave(self, key: str, file: Any) -> str:
+        return await sync_to_async(self.save, thread_sensitive=False)(key, file)
+
+    async def ahead(self, key: str) -> Optional[StorageKeyInfo]:
+        return await sync_to_async(self.head, thread_sensitive=False)(key)
+
+    async def aget_url(self, key: str, *, content_type: Optional[str] = None) -> str:
+        return await sync_to_async(self.get_url, thread_sensitive=False)(key, content_type=content_type)
+
+    async def aget_attachment_url(
+        self, key: str, *, content_type: Optional[str] = None, filename: Optional[str] = None
+    ) -> str:
+        return await sync_to_async(self.get_attachment_url, thread_sensitive=False)(
+            key, content_type=content_type, filename=filename
+        )
+
+    def warmup(self) -> None:
+        # creates the connections / sdk clients ahead of the first request (see `interface.warmup`)
+        pass
+
+
+class HashingChunksReader:
+    # file like (read only, not seekable) view of a chunks iterable, hashing (sha256) the content as it is read
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._buffer = bytearray()
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def read(self, n: int = -1) -> bytes:
+        while n < 0 or len(self._buffer) < n:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+
+        data = bytes(self._buffer if n < 0 else self._buffer[:n])
+        del self._buffer[: len(data)]
+
+        self._hash.update(data)
+        self.size += len(data)
+        return data
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
@@ -0,0 +1,154 @@
+import hashlib
+import logging
+import os
+from tempfile import SpooledTemporaryFile
+from typing import Any, Iterator, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+
+from .client import StorageClient, StorageClientException, StorageKeyInfo
+from .models import StorageObject
+
+logger = logging.getLogger(__name__)
+
+# uploads that can't be read twice are buffered in memory up to this size (then in a temporary file)
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+class ContentAddressedStorageClient(StorageClient):
+    # stores every content once, as the `storage` blob `blobs/sha256/<sha256>`
+    # the saved keys are mapped to their blob in the `StorageObject` table (saving a known content is a db write only)
+    # keys that were not saved through it (public assets, releases, older uploads) are read from `storage` as they are
+    blobs_prefix = "blobs/sha256"
+
+    def __init__(self, storage: StorageClient) -> None:
+        self.storage = storage
+
+    def warmup(self) -> None:
+        self.storage.warmup()
+
+    @classmethod
+    def get_blob_key(cls, checksum: str) -> str:
+        return f"{cls.blobs_prefix}/{checksum[:2]}/{checksum}"
+
+    def save(self, key: str, file: Any) -> str:
+        # the content is read twice: once to hash it, once to save the blob (if it's a new one)
+        spool = None
+        if not self._is_seekable(file):
+            spool = file = self._spool(file)
+
+        try:
+            blob_checksum, size = self._hash(file)
+            if self._is_saved(blob_checksum):
+                logger.info(f"storage dedupe: {key} -> {blob_checksum}")
+            elif self.storage.save(self.get_blob_key(blob_checksum), file) != blob_checksum:
+                raise StorageClientException(Exception(f"`{key}` content changed while it was saved"))
+        finally:
+            if spool is not None:
+                spool.close()
+
+        self._save_key(key, blob_checksum, size)
+        return blob_checksum
+
+    async def asave(self, key: str, file: Any) -> str:
+        # `save`, with the content read / saved in worker threads
+        # and the `StorageObject` queries in django's sync thread (with the other queries of the request)
+        spool = None
+        if not self._is_seekable(file):
+            spool = file = await sync_to_async(self._spool, thread_sensitive=False)(file)
+
+        try:
+            blob_checksum, size = await sync_to_async(self._hash, thread_sensitive=False)(file)
+            if await sync_to_async(self._is_saved)(blob_checksum):
+                logger.info(f"storage dedupe: {key} -> {blob_checksum}")
+            elif await self.storage.asave(self.get_blob_key(blob_checksum), file) != blob_checksum:
+                raise StorageClientException(Exception(f"`{key}` content changed while it was saved"))
+        finally:
+            if spool is not None:
+                spool.close()
+
+        await sync_to_async(self._save_key)(key, blob_checksum, size)
+        return blob_checksum
+
+    def resolve(self, key: str) -> str:
+        # the `storage` key with the content of `key`
+        checksum = StorageObject.objects.filter(key=key).values_list("sha256", flat=True).first()
+        return key if checksum is None else self.get_blob_key(checksum)
+
+    def head(self, key: str) -> Optional[StorageKeyInfo]:
+        return self.storage.head(self.resolve(key))
+
+    def read_chunks(self, key: str) -> Iterator[bytes]:
+        return self.storage.read_chunks(self.resolve(key))
+
+    def get_url(self, key: str, *, content_type: Optional[str] = None) -> str:
+        return self.storage.get_url(self.resolve(key), content_type=content_type)
+
+    def get_attachment_url(
+        self, key: str, *, content_type: Optional[str] = None, filename: Optional[str] = None
+    ) -> str:
+        # the blob key is a hash, download it with the key's name
+        return self.storage.get_attachment_url(
+            self.resolve(key), content_type=content_type, filename=filename or os.path.basename(key)
+        )
+
+    async def ahead(self, key: str) -> Optional[StorageKeyInfo]:
+        return await self.storage.ahead(await sync_to_async(self.resolve)(key))
+
+    async def aget_url(self, key: str, *, content_type: Optional[str] = None) -> str:
+        return await self.storage.aget_url(await sync_to_async(self.resolve)(key), content_type=content_type)
+
+    async def aget_attachment_url(
+        self, key: str, *, content_type: Optional[str] = None, filename: Optional[str] = None
+    ) -> str:
+        return await self.storage.aget_attachment_url(
+            await sync_to_async(self.resolve)(key),
+            content_type=content_type,
+            filename=filename or os.path.basename(key),
+        )
+
+    def verify(self, checksum: str) -> bool:
+        # re-hashes the blob of `checksum`
+        blob_checksum = hashlib.sha256()
+        try:
+            for chunk in self.storage.read_chunks(self.get_blob_key(checksum)):
+                blob_checksum.update(chunk)
+        except StorageClientException as e:
+            logger.error(f"storage blob {checksum} unreadable: {e}")
+            return False
+        return blob_checksum.hexdigest() == checksum
+
+    def verify_blobs(self) -> List[Tuple[str, bool]]:
+        checksums = StorageObject.objects.order_by("sha256").values_list("sha256", flat=True).distinct()
+        return [(checksum, self.verify(checksum)) for checksum in checksums]
+
+    @staticmethod
+    def _is_seekable(file: Any) -> bool:
+        return isinstance(file, (bytes, bytearray)) or hasattr(file, "seek")
+
+    def _hash(self, file: Any) -> Tuple[str, int]:
+        # sha256 and size of the content, a seekable `file` is read back to where it was
+        start = file.tell() if hasattr(file, "seek") else 0
+        checksum = hashlib.sha256()
+        size = 0
+        for chunk in self.iter_chunks(file):
+            checksum.update(chunk)
+            size += len(chunk)
+        if hasattr(file, "seek"):
+            file.seek(start)
+        return checksum.hexdigest(), size
+
+    @staticmethod
+    def _is_saved(checksum: str) -> bool:
+        return StorageObject.objects.filter(sha256=checksum).exists()
+
+    @staticmethod
+    def _save_key(key: str, checksum: str, size: int) -> None:
+        StorageObject.objects.update_or_create(key=key, defaults={"sha256": checksum, "size": size})
+
+    def _spool(self, file: Any) -> "SpooledTemporaryFile[bytes]":
+        spool = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        for chunk in self.iter_chunks(file):
+            spool.write(chunk)
+        spool.seek(0)
+        return spool
@@ -1,12 +1,20 @@
+import hashlib
 import logging
+import mimetypes
 import os
 import pathlib
-from http.server import HTTPServer, SimpleHTTPRequestHandler
-from shutil import copyfile
+import re
+import shutil
+import stat
+import uuid
+from email.utils import formatdate
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from threading import Thread
-from typing import Any, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, quote, unquote, urlencode, urlsplit
 
-from .client import StorageClient, StorageClientException
+from .client import DEFAULT_CHUNK_SIZE, StorageClient, StorageClientException, StorageKeyInfo
 
 logger = logging.getLogger(__name__)
 
@@ -15,32 +23,291 @@ class LocalStorageClient(StorageClient):
     ip = "0.0.0.0"
     port = 8001
 
+    # saved files with the same content are hardlinks of the same `<workspace>/.blobs/<sha256>` file
+    blobs_dir = ".blobs"
+
     def __init__(self, workspace: str) -> None:
         self.workspace = workspace
 
-    def save(self, key: str, file: Any) -> None:
+    def save(self, key: str, file: Any) -> str:
+        # atomic: readers see either the previous file or the whole new one
         full_path = os.path.join(self.workspace, key)
         pathlib.Path(full_path).parent.mkdir(parents=True, exist_ok=True)
 
+        checksum = hashlib.sha256()
+        tmp_path = self._tmp_path(full_path)
         try:
-            with open(full_path, "wb+") as destination:
-                for chunk in file.chunks():
+            with open(tmp_path, "wb") as destination:
+                for chunk in self.iter_chunks(file):
+                    checksum.update(chunk)
                     destination.write(chunk)
-        except StorageClientException as e:
+            self._dedupe(tmp_path, checksum.hexdigest())
+            os.replace(tmp_path, full_path)
+        except OSError as e:
+            self._remove(tmp_path)
+            raise StorageClientException(e)
+        return checksum.hexdigest()
+
+    def copy(self, src: str) -> None:
+        # copies the local file `src` to the `src` key
+        # hardlinks it when possible, otherwise it's a kernel side copy (`copy_file_range` / `sendfile`)
+        dest_path = os.path.join(self.workspace, src)
+        if os.path.exists(dest_path) and os.path.samefile(src, dest_path):
+            return
+        pathlib.Path(dest_path).parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = self._tmp_path(dest_path)
+        try:
+            try:
+                os.link(src, tmp_path)
+            except OSError:
+                # other device / file system without hardlinks
+                copy_file(src, tmp_path)
+            os.replace(tmp_path, dest_path)
+        except OSError as e:
+            self._remove(tmp_path)
+            raise StorageClientException(e)
+
+    def head(self, key: str) -> Optional[StorageKeyInfo]:
+        try:
+            key_stat = os.stat(os.path.join(self.workspace, key))
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            raise StorageClientException(e)
+        if not stat.S_ISREG(key_stat.st_mode):
+            return None
+        return StorageKeyInfo(size=key_stat.st_size, etag=get_etag(key_stat))
+
+    def read_chunks(self, key: str) -> Iterator[bytes]:
+        try:
+            f = open(os.path.join(self.workspace, key), "rb")
+        except OSError as e:
             raise StorageClientException(e)
+        with f:
+            yield from iter(lambda: f.read(DEFAULT_CHUNK_SIZE), b"")
+
+    def _dedupe(self, path: str, checksum: str) -> None:
+        # replaces `path` by a hardlink of the blob with the same content (or makes it that blob)
+        blob_path = os.path.join(self.workspace, self.blobs_dir, checksum[:2], checksum)
+        pathlib.Path(blob_path).parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(path, blob_path)
+            return  # new content
+        except FileExistsError:
+            pass
+        except OSError:
+            return  # no hardlinks, no dedupe
+
+        blob_tmp_path = self._tmp_path(path)
+        try:
+            os.link(blob_path, blob_tmp_path)
+            os.replace(blob_tmp_path, path)
+        except OSError:
+            self._remove(blob_tmp_path)
+
+    @staticmethod
+    def _tmp_path(path: str) -> str:
+        return f"{path}.{uuid.uuid4().hex}.tmp"
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
 
     def get_url(self, key: str, *, content_type: Optional[str] = None) -> str:
-        return f"http://{self.ip}:{self.port}/{key}"
+        return self._get_url(key, {"content_type": content_type})
 
     def get_attachment_url(
         self, key: str, *, content_type: Optional[str] = None, filename: Optional[str] = None
     ) -> str:
-        return self.get_url(key=key, content_type=content_type)
+        # same response headers as the s3 presigned urls (see `LocalStorageHTTPRequestHandler`)
+        return self._get_url(
+            key,
+            {
+                "content_type": content_type or "application/octet-stream",
+                "filename": filename or key,
+                "attachment": "1",
+            },
+        )
 
-    def copy(self, src: str) -> None:
-        dest_path = os.path.join(self.workspace, src)
-        pathlib.Path(dest_path).parent.mkdir(parents=True, exist_ok=True)
-        copyfile(src, dest_path)
+    def _get_url(self, key: str, params: Dict[str, Optional[str]]) -> str:
+        query = urlencode({k: v for k, v in params.items() if v is not None})
+        return f"http://{self.ip}:{self.port}/{quote(key)}" + (f"?{query}" if query else "")
+
+
+def get_etag(file_stat: os.stat_result) -> str:
+    # changes whenever the file is replaced (every write is a replace, see `LocalStorageClient.save`)
+    return f'"{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}"'
+
+
+def copy_file(src: str, dest: str) -> None:
+    # file to file copy in the kernel (no user space buffers), `shutil.copyfile` where not available
+    with open(src, "rb") as f_src, open(dest, "wb") as f_dest:
+        in_fd, out_fd = f_src.fileno(), f_dest.fileno()
+        size = os.fstat(in_fd).st_size
+        copiers: List[Callable[[int, int], int]] = []
+        if hasattr(os, "copy_file_range"):
+            copiers.append(lambda offset, count: os.copy_file_range(in_fd, out_fd, count, offset, offset))
+        if hasattr(os, "sendfile"):
+            copiers.append(lambda offset, count: os.sendfile(out_fd, in_fd, offset, count))
+
+        for copier in copiers:
+            offset = 0
+            try:
+                while offset < size:
+                    copied = copier(offset, size - offset)
+                    if copied == 0:
+                        break
+                    offset += copied
+                return
+            except OSError:
+                continue  # not supported for these files, try the next one
+
+    shutil.copyfile(src, dest)
+
+
+class LocalStorageHTTPRequestHandler(BaseHTTPRequestHandler):
+    # serves the keys under `directory` like the s3 presigned urls do:
+    # `content_type`, `filename` and `attachment` query params, single Range requests and ETag / If-None-Match
+    # the files are sent with `sendfile` (zero copy) when available
+    directory = "."
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self._serve(send_body=True)
+
+    def do_HEAD(self) -> None:
+        self._serve(send_body=False)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"local storage http server: {format % args}")
+
+    def _serve(self, *, send_body: bool) -> None:
+        url = urlsplit(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        path = self._get_path(unquote(url.path))
+        if path is None:
+            self._send_empty(HTTPStatus.NOT_FOUND)
+            return
+
+        with open(path, "rb") as f:
+            file_stat = os.fstat(f.fileno())
+            size = file_stat.st_size
+            etag = get_etag(file_stat)
+
+            headers = {
+                "ETag": etag,
+                "Last-Modified": formatdate(file_stat.st_mtime, usegmt=True),
+                "Accept-Ranges": "bytes",
+                "Content-Type": params.get("content_type")
+                or mimetypes.guess_type(path)[0]
+                or "application/octet-stream",
+            }
+            if "filename" in params or "attachment" in params:
+                disposition = "attachment" if "attachment" in params else "inline"
+                filename = params.get("filename") or os.path.basename(path)
+                headers["Content-Disposition"] = StorageClient.content_disposition(disposition, filename)
+
+            if self.headers.get("If-None-Match") in [etag, "*"]:
+                self._send_empty(HTTPStatus.NOT_MODIFIED, headers)
+                return
+
+            status = HTTPStatus.OK
+            start, end = 0, size - 1
+            byte_range = self.headers.get("Range")
+            if byte_range is not None and self.headers.get("If-Range", etag) == etag:
+                parsed = self._parse_range(byte_range, size)
+                if parsed is None:
+                    self._send_empty(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, {"Content-Range": f"bytes */{size}"})
+                    return
+                start, end = parsed
+                status = HTTPStatus.PARTIAL_CONTENT
+                headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+            self.send_response(status)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(end - start + 1))
+            self.end_headers()
+
+            if send_body:
+                self._send_file(f, start, end - start + 1)
+
+    def _get_path(self, url_path: str) -> Optional[str]:
+        # no directory traversal, no directory listing, no dedupe blobs (only the keys are served)
+        root = os.path.realpath(self.directory)
+        path = os.path.realpath(os.path.join(root, url_path.lstrip("/")))
+        if not path.startswith(root + os.sep) or not os.path.isfile(path):
+            return None
+        if os.path.relpath(path, root).split(os.sep)[0] == LocalStorageClient.blobs_dir:
+            return None
+        return path
+
+    @staticmethod
+    def _parse_range(byte_range: str, size: int) -> Optional[Tuple[int, int]]:
+        # single range only, `bytes=<start>-<end>`, `bytes=<start>-` or `bytes=-<suffix length>`
+        match = re.fullmatch(r"bytes=(\d*)-(\d*)", byte_range.strip())
+        if match is None or match.group(1) == match.group(2) == "":
+            return None
+
+        if match.group(1) == "":
+            start, end = max(0, size - int(match.group(2))), size - 1
+        else:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), size - 1) if match.group(2) != "" else size - 1
+        if start > end or start >= size:
+            return None
+        return start, end
+
+    def _send_file(self, f: Any, offset: int, count: int) -> None:
+        self.wfile.flush()
+        try:
+            while count > 0:
+                sent = os.sendfile(self.connection.fileno(), f.fileno(), offset, count)
+                if sent == 0:
+                    break
+                offset += sent
+                count -= sent
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client went away
+        except (AttributeError, OSError):
+            # no sendfile (platform / socket type), fall back to a buffered copy of what is left
+            f.seek(offset)
+            shutil.copyfileobj(_LimitedReader(f, count), self.wfile)
+
+    def _send_empty(self, status: HTTPStatus, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class _LimitedReader:
+    def __init__(self, f: Any, limit: int) -> None:
+        self.f = f
+        self.limit = limit
+
+    def read(self, n: int = -1) -> bytes:
+        if self.limit <= 0:
+            return b""
+        data = self.f.read(self.limit if n < 0 else min(n, self.limit))
+        self.limit -= len(data)
+        return data
+
+
+def make_local_storage_server(ip: str, port: int, directory: str) -> ThreadingHTTPServer:
+    class Handler(LocalStorageHTTPRequestHandler):
+        pass
+
+    Handler.directory = directory
+    server = ThreadingHTTPServer((ip, port), Handler)
+    server.daemon_threads = True
+    return server
 
 
 class LocalStorageHttpServerThread(Thread):
@@ -51,12 +318,8 @@ class LocalStorageHttpServerThread(Thread):
         self._directory = directory
 
     def run(self) -> None:
-        class LocalStorageHTTPRequestHandler(SimpleHTTPRequestHandler):
-            def __init__(self_, *args: Any, **kwargs: Any) -> None:
-                super().__init__(*args, directory=self._directory, **kwargs)  # type: ignore
-
         logger.debug(f"running local storage http server @ {self._ip}:{self._port}")
-        HTTPServer((self._ip, self._port), LocalStorageHTTPRequestHandler).serve_forever()
+        make_local_storage_server(self._ip, self._port, self._directory).serve_forever()
 
 
 class LocalStorageClientWithServer(LocalStorageClient):
@@ -0,0 +1,11 @@
+from django.db import models
+
+
+class StorageObject(models.Model):
+    # a key saved by the `ContentAddressedStorageClient`, its content is the blob of `sha256`
+    key = models.CharField(null=False, max_length=1024, unique=True)
+    sha256 = models.CharField(null=False, max_length=64, db_index=True)
+    size = models.BigIntegerField(null=False)
+
+    updated_at = models.DateTimeField(auto_now=True)
+    created_at = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,46 @@
+import hashlib
+from typing import Any, List
+
+from django.test import TestCase
+
+from storage_client import AWSS3StorageClient
+
+
+class FakeS3:
+    def __init__(self) -> None:
+        self.presigned: List[Any] = []
+        self.uploads: List[Any] = []
+
+    def upload_fileobj(self, fileobj: Any, bucket: str, key: str, *, ExtraArgs: Any, Config: Any) -> None:
+        self.uploads.append((bucket, key, fileobj.read(), ExtraArgs))
+
+    def generate_presigned_url(self, *, ClientMethod: str, Params: Any, ExpiresIn: int) -> str:
+        self.presigned.append(Params)
+        return f"https://s3/{Params['Key']}?n={len(self.presigned)}"
+
+
+class TestAWSS3StorageClient(TestCase):
+    def test_presigned_url_cache(self) -> None:
+        client = AWSS3StorageClient("bucket")
+        client._s3 = FakeS3()  # type: ignore
+
+        url = client.get_url("public-assets/logo.png")
+        self.assertEqual(client.get_url("public-assets/logo.png"), url)
+        self.assertNotEqual(client.get_url("public-assets/logo.png", content_type="image"), url)
+        self.assertNotEqual(client.get_attachment_url("public-assets/logo.png"), url)
+        self.assertEqual(len(client._s3.presigned), 3)  # type: ignore
+
+        client.url_cache_ttl = 0
+        self.assertNotEqual(client.get_url("public-assets/logo.png"), url)
+
+    def test_save_checksum(self) -> None:
+        client = AWSS3StorageClient("bucket")
+        client._s3 = FakeS3()  # type: ignore
+
+        checksum = client.save("submissions/a.ipynb", b"content")
+
+        self.assertEqual(checksum, hashlib.sha256(b"content").hexdigest())
+        self.assertEqual(
+            client._s3.uploads,  # type: ignore
+            [("bucket", "submissions/a.ipynb", b"content", {"ChecksumAlgorithm": "SHA256"})],
+        )
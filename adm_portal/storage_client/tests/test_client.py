@@ -0,0 +1,64 @@
+import hashlib
+import io
+import os
+import tempfile
+from typing import Iterator
+
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+
+from storage_client import HashingChunksReader, LocalStorageClient, StorageClient
+
+
+def chunked(content: bytes, size: int) -> Iterator[bytes]:
+    for i in range(0, len(content), size):
+        yield content[slice(i, i + size)]
+
+
+class TestStorageClient(TestCase):
+    def test_iter_chunks(self) -> None:
+        content = b"0123456789" * 1000
+
+        tt = [
+            content,
+            io.BytesIO(content),
+            SimpleUploadedFile("f.txt", content),
+            chunked(content, 7),
+        ]
+        for file in tt:
+            self.assertEqual(b"".join(StorageClient.iter_chunks(file)), content)
+
+    def test_hashing_chunks_reader(self) -> None:
+        content = os.urandom(100_000)
+        reader = HashingChunksReader(chunked(content, 3000))
+
+        parts = []
+        while True:
+            part = reader.read(8192)
+            if not part:
+                break
+            self.assertLessEqual(len(part), 8192)
+            parts.append(part)
+
+        self.assertEqual(b"".join(parts), content)
+        self.assertEqual(reader.size, len(content))
+        self.assertEqual(reader.hexdigest(), hashlib.sha256(content).hexdigest())
+
+    def test_local_save(self) -> None:
+        content = os.urandom(10_000)
+        with tempfile.TemporaryDirectory() as workspace:
+            checksum = LocalStorageClient(workspace).save("a/b/c.bin", SimpleUploadedFile("c.bin", content))
+
+            self.assertEqual(checksum, hashlib.sha256(content).hexdigest())
+            with open(os.path.join(workspace, "a/b/c.bin"), "rb") as f:
+                self.assertEqual(f.read(), content)
+
+    def test_local_asave(self) -> None:
+        content = os.urandom(10_000)
+        with tempfile.TemporaryDirectory() as workspace:
+            client = LocalStorageClient(workspace)
+            checksum = async_to_sync(client.asave)("a/b/c.bin", content)
+
+            self.assertEqual(checksum, hashlib.sha256(content).hexdigest())
+            self.assertEqual(async_to_sync(client.ahead)("a/b/c.bin"), client.head("a/b/c.bin"))
@@ -0,0 +1,99 @@
+import hashlib
+import io
+import os
+import tempfile
+from typing import Any, List
+
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+
+from storage_client import LocalStorageClient
+from storage_client.content_addressed import ContentAddressedStorageClient
+from storage_client.models import StorageObject
+
+
+class CountingStorageClient(LocalStorageClient):
+    def __init__(self, workspace: str) -> None:
+        super().__init__(workspace)
+        self.saved: List[str] = []
+
+    def save(self, key: str, file: Any) -> str:
+        self.saved.append(key)
+        return super().save(key, file)
+
+
+class TestContentAddressedStorageClient(TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = CountingStorageClient(self.tmp.name)
+        self.client = ContentAddressedStorageClient(self.storage)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def read(self, key: str) -> bytes:
+        return b"".join(self.client.read_chunks(key))
+
+    def test_save_dedupe(self) -> None:
+        content = b"notebook" * 1000
+        checksum = hashlib.sha256(content).hexdigest()
+
+        files = [
+            SimpleUploadedFile("a.ipynb", content),
+            io.BytesIO(content),
+            content,
+            iter([content[:100], content[100:]]),  # can't be read twice
+        ]
+        for i, f in enumerate(files):
+            self.assertEqual(self.client.save(f"submissions/{i}.ipynb", f), checksum)
+
+        self.assertEqual(self.storage.saved, [ContentAddressedStorageClient.get_blob_key(checksum)])
+        self.assertEqual(StorageObject.objects.filter(sha256=checksum, size=len(content)).count(), 4)
+        for i in range(4):
+            self.assertEqual(self.read(f"submissions/{i}.ipynb"), content)
+
+    def test_asave_dedupe(self) -> None:
+        content = b"notebook" * 1000
+        checksum = hashlib.sha256(content).hexdigest()
+        files = [SimpleUploadedFile("a.ipynb", content), iter([content[:100], content[100:]])]
+        for i, f in enumerate(files):
+            self.assertEqual(async_to_sync(self.client.asave)(f"submissions/{i}.ipynb", f), checksum)
+
+        self.assertEqual(self.storage.saved, [ContentAddressedStorageClient.get_blob_key(checksum)])
+        self.assertEqual(StorageObject.objects.filter(sha256=checksum, size=len(content)).count(), 2)
+        self.assertEqual(
+            async_to_sync(self.client.aget_attachment_url)("submissions/1.ipynb"),
+            self.client.get_attachment_url("submissions/1.ipynb"),
+        )
+
+    def test_save_overwrite(self) -> None:
+        self.client.save("payments/proof.png", b"old")
+        self.client.save("payments/proof.png", b"new")
+
+        self.assertEqual(self.read("payments/proof.png"), b"new")
+        self.assertEqual(StorageObject.objects.count(), 1)
+        self.assertEqual(len(self.storage.saved), 2)
+
+    def test_urls(self) -> None:
+        checksum = self.client.save("submissions/a.ipynb", b"content")
+        blob_key = ContentAddressedStorageClient.get_blob_key(checksum)
+
+        self.assertEqual(self.client.get_url("submissions/a.ipynb"), self.storage.get_url(blob_key))
+        self.assertEqual(
+            self.client.get_attachment_url("submissions/a.ipynb"),
+            self.storage.get_attachment_url(blob_key, filename="a.ipynb"),
+        )
+        # not saved through the content addressed client
+        self.assertEqual(self.client.get_url("public-assets/logo.png"), self.storage.get_url("public-assets/logo.png"))
+
+    def test_verify_blobs(self) -> None:
+        ok = self.client.save("a", b"a")
+        corrupted = self.client.save("b", b"b")
+        missing = self.client.save("c", b"c")
+
+        with open(os.path.join(self.tmp.name, ContentAddressedStorageClient.get_blob_key(corrupted)), "wb") as f:
+            f.write(b"x")
+        os.remove(os.path.join(self.tmp.name, ContentAddressedStorageClient.get_blob_key(missing)))
+
+        self.assertEqual(dict(self.client.verify_blobs()), {ok: True, corrupted: False, missing: False})
@@ -0,0 +1,183 @@
+import os
+import tempfile
+from http.client import HTTPConnection, HTTPResponse
+from threading import Thread
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from django.test import TestCase
+
+from storage_client import StorageClientException
+from storage_client.local import LocalStorageClient, copy_file, make_local_storage_server
+
+
+class TestLocalStorageServer(TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.tmp.name, "sub"))
+        self.content = bytes(range(256)) * 40
+        with open(os.path.join(self.tmp.name, "sub", "file@1.bin"), "wb") as f:
+            f.write(self.content)
+
+        self.server = make_local_storage_server("127.0.0.1", 0, self.tmp.name)
+        Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+        self.client = LocalStorageClient(self.tmp.name)
+        self.client.ip, self.client.port = "127.0.0.1", self.server.server_address[1]
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def request(self, url: str, headers: Optional[Dict[str, str]] = None, method: str = "GET") -> HTTPResponse:
+        parts = urlsplit(url)
+        conn = HTTPConnection(parts.netloc, timeout=5)
+        conn.request(method, parts.path + (f"?{parts.query}" if parts.query else ""), headers=headers or {})
+        return conn.getresponse()
+
+    def test_get(self) -> None:
+        resp = self.request(self.client.get_url("sub/file@1.bin", content_type="image"))
+
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(resp.read(), self.content)
+        self.assertEqual(resp.getheader("Content-Type"), "image")
+        self.assertIsNone(resp.getheader("Content-Disposition"))
+        self.assertIsNotNone(resp.getheader("ETag"))
+
+    def test_get_attachment(self) -> None:
+        resp = self.request(self.client.get_attachment_url("sub/file@1.bin", filename="notebook.ipynb"))
+
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(resp.getheader("Content-Type"), "application/octet-stream")
+        self.assertEqual(
+            resp.getheader("Content-Disposition"),
+            'attachment; filename="notebook.ipynb"; filename*=UTF-8\'\'notebook.ipynb',
+        )
+
+        resp = self.request(self.client.get_attachment_url("sub/file@1.bin", filename='my "nb"; ç.ipynb'))
+        self.assertEqual(
+            resp.getheader("Content-Disposition"),
+            'attachment; filename="my _nb_; _.ipynb"; filename*=UTF-8\'\'my%20%22nb%22%3B%20%C3%A7.ipynb',
+        )
+
+    def test_range(self) -> None:
+        url = self.client.get_url("sub/file@1.bin")
+        size = len(self.content)
+
+        tt = [
+            ("bytes=0-99", 0, 99),
+            ("bytes=100-", 100, size - 1),
+            ("bytes=-10", size - 10, size - 1),
+            (f"bytes=5000-{size * 2}", 5000, size - 1),
+        ]
+        for byte_range, start, end in tt:
+            resp = self.request(url, {"Range": byte_range})
+            self.assertEqual(resp.status, 206)
+            self.assertEqual(resp.getheader("Content-Range"), f"bytes {start}-{end}/{size}")
+            self.assertEqual(resp.read(), self.content[slice(start, end + 1)])
+
+        resp = self.request(url, {"Range": f"bytes={size}-"})
+        self.assertEqual(resp.status, 416)
+
+    def test_etag(self) -> None:
+        url = self.client.get_url("sub/file@1.bin")
+        etag = self.request(url, method="HEAD").getheader("ETag", "")
+
+        resp = self.request(url, {"If-None-Match": etag})
+        self.assertEqual(resp.status, 304)
+        self.assertEqual(resp.read(), b"")
+
+        resp = self.request(url, {"If-None-Match": '"other"'})
+        self.assertEqual(resp.status, 200)
+
+    def test_not_found(self) -> None:
+        self.assertEqual(self.request(self.client.get_url("sub/missing")).status, 404)
+        self.assertEqual(self.request(self.client.get_url("sub")).status, 404)
+        self.assertEqual(self.request(self.client.get_url("../etc/passwd")).status, 404)
+
+    def test_blobs_not_served(self) -> None:
+        checksum = self.client.save("sub/saved.bin", b"content")
+        self.assertEqual(self.request(self.client.get_url("sub/saved.bin")).status, 200)
+        self.assertTrue(os.path.isfile(os.path.join(self.tmp.name, ".blobs", checksum[:2], checksum)))
+        self.assertEqual(self.request(self.client.get_url(f".blobs/{checksum[:2]}/{checksum}")).status, 404)
+
+
+class TestLocalStorageClient(TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = LocalStorageClient(os.path.join(self.tmp.name, "workspace"))
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.tmp.name, "workspace", key)
+
+    def test_save_dedupe(self) -> None:
+        checksum = self.client.save("a/1.txt", b"same")
+        self.client.save("b/2.txt", b"same")
+        self.client.save("c/3.txt", b"other")
+
+        self.assertTrue(os.path.samefile(self.path("a/1.txt"), self.path("b/2.txt")))
+        self.assertFalse(os.path.samefile(self.path("a/1.txt"), self.path("c/3.txt")))
+        self.assertTrue(os.path.isfile(self.path(f".blobs/{checksum[:2]}/{checksum}")))
+
+        # overwriting a key doesn't change the files it was linked to
+        self.client.save("a/1.txt", b"new")
+        with open(self.path("b/2.txt"), "rb") as f:
+            self.assertEqual(f.read(), b"same")
+
+    def test_save_atomic(self) -> None:
+        self.client.save("a/1.txt", b"old")
+
+        def chunks():  # type: ignore
+            yield b"partial"
+            raise OSError("disk full")
+
+        with self.assertRaises(StorageClientException):
+            self.client.save("a/1.txt", chunks())
+
+        with open(self.path("a/1.txt"), "rb") as f:
+            self.assertEqual(f.read(), b"old")
+        self.assertEqual(os.listdir(self.path("a")), ["1.txt"])
+
+    def test_copy(self) -> None:
+        src = os.path.join(self.tmp.name, "assets", "file.txt")
+        os.makedirs(os.path.dirname(src))
+        with open(src, "wb") as f:
+            f.write(b"content")
+
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        try:
+            self.client.copy("assets/file.txt")
+            self.client.copy("assets/file.txt")
+        finally:
+            os.chdir(cwd)
+
+        self.assertTrue(os.path.samefile(src, self.path("assets/file.txt")))
+        self.assertEqual(os.listdir(self.path("assets")), ["file.txt"])
+
+    def test_head(self) -> None:
+        self.client.save("a/1.txt", b"content")
+
+        info = self.client.head("a/1.txt")
+        self.assertEqual(info.size, 7)  # type: ignore
+        self.assertIsNone(self.client.head("a/missing.txt"))
+        self.assertIsNone(self.client.head("a"))
+
+        self.client.save("a/1.txt", b"CONTENT")
+        self.assertNotEqual(self.client.head("a/1.txt").etag, info.etag)  # type: ignore
+
+    def test_copy_file(self) -> None:
+        src, dest = os.path.join(self.tmp.name, "src.bin"), os.path.join(self.tmp.name, "dest.bin")
+        content = os.urandom(300_000)
+        with open(src, "wb") as f:
+            f.write(content)
+
+        copy_file(src, dest)
+
+        with open(dest, "rb") as f:
+            self.assertEqual(f.read(), content)
+        self.assertFalse(os.path.samefile(src, dest))
@@ -22,7 +22,8 @@ class EmailModelBackend:
         return user
 
     def get_user(self, user_id: int) -> Any:
+        # request.user: load the one-to-one relations used by every candidate page in the same query
         try:
-            return User.objects.get(pk=user_id)
+            return User.objects.select_related("profile", "selection", "application").get(pk=user_id)
         except User.DoesNotExist:
             return None
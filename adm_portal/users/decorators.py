@@ -1,6 +1,13 @@
+import asyncio
+import functools
+import hmac
 from typing import Any, Callable
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.decorators import user_passes_test
+from django.contrib.auth.views import redirect_to_login
+from django.http import HttpRequest, HttpResponse
 
 
 def is_staff_or_admin(u: Any) -> bool:
@@ -27,47 +34,67 @@ def u_has_profile(u: Any) -> bool:
     return u_decided_scholarship(u) and getattr(u, "profile", None) is not None
 
 
+def _user_passes_test(test: Callable[[Any], bool], login_url: str) -> Callable[[Callable[..., Any]], Any]:
+    # django's `user_passes_test`, for the async views too (the user is loaded in django's sync thread)
+    def decorator(f: Callable[..., Any]) -> Callable[..., Any]:
+        if not asyncio.iscoroutinefunction(f):
+            return user_passes_test(test, redirect_field_name=None, login_url=login_url)(f)
+
+        @functools.wraps(f)
+        async def view(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+            if await sync_to_async(test)(request.user):
+                return await f(request, *args, **kwargs)
+            return redirect_to_login(request.get_full_path(), login_url, None)
+
+        return view
+
+    return decorator
+
+
 def requires_candidate_login(f: Callable[..., Any]) -> Callable[..., Any]:
-    return user_passes_test(
+    return _user_passes_test(
         lambda u: u_is_authenticated(u) and not is_staff_or_admin(u),
-        redirect_field_name=None,
         login_url="/account/login",
     )(f)
 
 
 def requires_candidate_confirmed(f: Callable[..., Any]) -> Callable[..., Any]:
-    return user_passes_test(
-        lambda u: u_confirmed_email(u) and not is_staff_or_admin(u),
-        redirect_field_name=None,
-        login_url="/candidate/home#next",
+    return _user_passes_test(
+        lambda u: u_confirmed_email(u) and not is_staff_or_admin(u), login_url="/candidate/home#next"
     )(f)
 
 
 def requires_candidate_coc(f: Callable[..., Any]) -> Callable[..., Any]:
-    return user_passes_test(
-        lambda u: u_accepted_coc(u) and not is_staff_or_admin(u),
-        redirect_field_name=None,
-        login_url="/candidate/home#next",
+    return _user_passes_test(
+        lambda u: u_accepted_coc(u) and not is_staff_or_admin(u), login_url="/candidate/home#next"
     )(f)
 
 
 def requires_scholarship_decision(f: Callable[..., Any]) -> Callable[..., Any]:
-    return user_passes_test(
-        lambda u: u_decided_scholarship(u) and not is_staff_or_admin(u),
-        redirect_field_name=None,
-        login_url="/candidate/home#next",
+    return _user_passes_test(
+        lambda u: u_decided_scholarship(u) and not is_staff_or_admin(u), login_url="/candidate/home#next"
     )(f)
 
 
 def requires_candidate_profile(f: Callable[..., Any]) -> Callable[..., Any]:
-    return user_passes_test(
-        lambda u: u_has_profile(u) and not is_staff_or_admin(u),
-        redirect_field_name=None,
-        login_url="/candidate/home#next",
+    return _user_passes_test(
+        lambda u: u_has_profile(u) and not is_staff_or_admin(u), login_url="/candidate/home#next"
     )(f)
 
 
 def requires_staff_login(f: Callable[..., Any]) -> Callable[..., Any]:
-    return user_passes_test(
-        lambda u: u_is_authenticated(u) and is_staff_or_admin(u), redirect_field_name=None, login_url="/account/login"
-    )(f)
+    return _user_passes_test(lambda u: u_is_authenticated(u) and is_staff_or_admin(u), login_url="/account/login")(f)
+
+
+def requires_staff_login_or_ops_token(f: Callable[..., Any]) -> Callable[..., Any]:
+    # monitoring (e.g. prometheus) can't log in: it sends the `OPS_TOKEN` as a bearer token instead
+    staff_view = requires_staff_login(f)
+
+    @functools.wraps(f)
+    def view(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        token = settings.OPS_TOKEN
+        if token and hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            return f(request, *args, **kwargs)
+        return staff_view(request, *args, **kwargs)
+
+    return view
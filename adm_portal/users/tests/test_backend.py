@@ -1,6 +1,10 @@
 from django.contrib.auth import authenticate
 from django.test import TestCase
 
+from applications.models import Application
+from profiles.models import Profile
+from selection.models import Selection
+from users.backends import EmailModelBackend
 from users.models import User
 
 
@@ -19,3 +23,27 @@ class TestUserBackend(TestCase):
 
     def test_authenticate_success(self) -> None:
         self.assertIsNotNone(authenticate(email="chi@adm.com", password="pw"))
+
+    def test_get_user(self) -> None:
+        u = User.objects.get(email="chi@adm.com")
+        Profile.objects.create(user=u)
+        Application.objects.create(user=u)
+        Selection.objects.create(user=u)
+
+        with self.assertNumQueries(1):
+            user = EmailModelBackend().get_user(u.id)
+            self.assertIsNotNone(user.profile)
+            self.assertIsNotNone(user.application)
+            self.assertIsNotNone(user.selection)
+
+    def test_get_user_no_relations(self) -> None:
+        u = User.objects.get(email="chi@adm.com")
+
+        with self.assertNumQueries(1):
+            user = EmailModelBackend().get_user(u.id)
+            self.assertIsNone(getattr(user, "profile", None))
+            self.assertIsNone(getattr(user, "application", None))
+            self.assertIsNone(getattr(user, "selection", None))
+
+    def test_get_user_not_found(self) -> None:
+        self.assertIsNone(EmailModelBackend().get_user(-1))
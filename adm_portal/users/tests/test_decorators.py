@@ -0,0 +1,40 @@
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, Client, TestCase
+
+from users.models import User
+
+
+class TestAsyncViewsDecorators(TestCase):
+    # `/candidate/contact-us` is an async view
+    def setUp(self) -> None:
+        self.candidate = User.objects.create_user(email="candidate@adm.com", password="candidate")
+        self.staff = User.objects.create_staff_user(email="staff@adm.com", password="staff")
+
+    def test_requires_candidate_login(self) -> None:
+        client = AsyncClient()
+        response = async_to_sync(client.get)("/candidate/contact-us")
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, "/account/login")
+
+        client.force_login(self.staff)
+        response = async_to_sync(client.get)("/candidate/contact-us")
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, "/account/login")
+
+        client.force_login(self.candidate)
+        response = async_to_sync(client.get)("/candidate/contact-us")
+        self.assertEqual(response.status_code, 200)
+
+    def test_require_http_methods(self) -> None:
+        client = AsyncClient()
+        client.force_login(self.candidate)
+        response = async_to_sync(client.put)("/candidate/contact-us")
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response["Allow"], "GET, POST")
+
+    def test_post_contact_us(self) -> None:
+        # the async views run under wsgi too
+        client = Client()
+        client.force_login(self.candidate)
+        response = client.post("/candidate/contact-us", {"message": "hi"})
+        self.assertEqual(response.status_code, 200)
@@ -1,34 +1,183 @@
+import glob
+import json
 import os
+import random
+import re
+import time
+import uuid
+from urllib.parse import urlsplit
 
-from locust import HttpUser, TaskSet, task, between
+from locust import HttpUser, TaskSet, between, task
 
+# load test of the real candidate / staff flows, per endpoint percentiles in the locust report (and `--csv` files)
+#
+# server (FAKE grader, LOCAL email and LOCALSERVER storage clients, see `adm_portal/settings/loadtest.py`):
+#   cd adm_portal && export DJANGO_SETTINGS_MODULE=adm_portal.settings.loadtest
+#   python manage.py migrate && python manage.py seed_loadtest --candidates 200
+#   gunicorn --workers=2 --threads=4 --worker-class=gthread --bind 0.0.0.0:8000 adm_portal.wsgi:application
+#
+# load test (same host, the signup flow reads the confirmation emails from the local mailbox):
+#   locust -f loadtest.py
 
-# locust -f loadtest.py
+HOST = os.environ.get("ADM_LOADTEST_HOST", "http://0.0.0.0:8000")
+MAILBOX = os.environ.get(
+    "ADM_LOADTEST_MAILBOX", os.path.join(os.path.dirname(os.path.abspath(__file__)), "adm_portal", ".loadtest-mailbox")
+)
+PASSWORD = os.environ.get("ADM_LOADTEST_PASSWORD", "loadtest")
+SEEDED_CANDIDATES = int(os.environ.get("ADM_LOADTEST_CANDIDATES", "200"))
 
-EMAIL = os.environ["ADM_LOAD_TEST_EMAIL"]
-PASSWORD = os.environ["ADM_LOAD_TEST_PASSWORD"]
+# seeded by `python manage.py seed_loadtest`
+STAFF_EMAIL = "loadtest-staff@adm.com"
+CANDIDATE_EMAIL = "loadtest-candidate-{i}@adm.com"
 
+NOTEBOOK = json.dumps({"cells": [], "metadata": {}, "nbformat": 4, "nbformat_minor": 4}).encode() * 200
 
-class LoadTestTasks(TaskSet):
-    @task(1)
-    def sleep_long(self):
-        payload = {
-            "email": EMAIL,
-            "password": PASSWORD,
-            "duration": 11,
-        }
-        self.client.post("/loadtest/sleep/12", json=payload)
+
+def post_form(client, url, data=None, files=None, name=None):
+    # django forms need the csrf token (the csrf cookie is set by the form page)
+    data = {**(data or {}), "csrfmiddlewaretoken": client.cookies.get("csrftoken", "")}
+    return client.post(url, data=data, files=files, name=name or url)
+
+
+def read_confirmation_url(email, timeout=10):
+    # the signup email, dumped by the LOCAL email client (`EMAIL_LOCAL_MODE = "FILES"`)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        for path in glob.glob(os.path.join(MAILBOX, "send_signup_email", f"{email}_*")):
+            with open(path) as f:
+                url = urlsplit(json.load(f)["email_confirmation_url"])
+            return f"{url.path}?{url.query}"
+        time.sleep(0.2)
+    return None
+
+
+class CandidateTasks(TaskSet):
+    @task(4)
+    def coding_test(self):
+        self.client.get("/candidate/coding-test")
+
+    @task(3)
+    def upload_coding_test(self):
+        self.client.get("/candidate/coding-test")
+        post_form(
+            self.client,
+            "/candidate/submissions/upload/coding_test",
+            files={"file": ("coding_test.ipynb", NOTEBOOK)},
+        )
+
+    @task(2)
+    def upload_slu(self):
+        slu = random.choice(["slu01", "slu02", "slu03"])
+        self.client.get(f"/candidate/slu/{slu}", name="/candidate/slu/[slu]")
+        post_form(
+            self.client,
+            f"/candidate/submissions/upload/{slu}",
+            files={"file": (f"{slu}.ipynb", NOTEBOOK)},
+            name="/candidate/submissions/upload/[slu]",
+        )
+
+    @task(2)
+    def home(self):
+        self.client.get("/candidate/home")
+
+
+class NewCandidate(HttpUser):
+    # signup -> confirm email -> code of conduct -> scholarship -> profile -> coding test -> uploads
+    host = HOST
+    wait_time = between(2, 10)
+    tasks = [CandidateTasks]
+    weight = 1
+
+    def on_start(self):
+        email = f"loadtest-{uuid.uuid4().hex}@adm.com"
+
+        self.client.get("/account/signup")
+        post_form(self.client, "/account/signup", {"email": email, "password": PASSWORD})
+
+        confirmation_url = read_confirmation_url(email)
+        if confirmation_url is None:
+            raise Exception(f"no confirmation email for {email} in {MAILBOX}")
+        self.client.get(confirmation_url, name="/account/confirm-email")
+
+        self.client.get("/candidate/code-of-conduct")
+        post_form(self.client, "/candidate/code-of-conduct")
+
+        self.client.get("/candidate/scholarship")
+        post_form(self.client, "/candidate/scholarship", {"decision": "no"})
+
+        # the form values are the `ProfileGenders` / `ProfileTicketTypes` values (this runs outside django)
+        self.client.get("/candidate/profile")
+        post_form(
+            self.client,
+            "/candidate/profile",
+            {
+                "full_name": "Load Test",
+                "profession": "Load Tester",
+                "gender": "Other/Prefer not to say",
+                "ticket_type": "Regular",
+                "company": "",
+            },
+        )
+
+        self.client.get("/candidate/before-coding-test")
+        post_form(self.client, "/candidate/before-coding-test")
+
+
+class ReturningCandidate(HttpUser):
+    # seeded candidates, in the middle of the coding test
+    host = HOST
+    wait_time = between(2, 10)
+    tasks = [CandidateTasks]
+    weight = 3
+
+    def on_start(self):
+        email = CANDIDATE_EMAIL.format(i=random.randrange(SEEDED_CANDIDATES))
+        self.client.get("/account/login")
+        post_form(self.client, "/account/login", {"email": email, "password": PASSWORD})
+
+
+class StaffTasks(TaskSet):
+    def on_start(self):
+        self.candidate_ids = []
 
     @task(3)
-    def sleep_short(self):
-        payload = {
-            "email": EMAIL,
-            "password": PASSWORD,
-        }
-        self.client.post("/loadtest/sleep/1", json=payload)
+    def applications(self):
+        self.client.get("/staff/applications")
 
+    @task(2)
+    def submissions(self):
+        self.client.get("/staff/submissions")
 
-class LoadTestUser(HttpUser):
-    host = "http://0.0.0.0:8000"
+    @task(2)
+    def selections(self):
+        self.client.get("/staff/selections/")
+
+    @task(2)
+    def payments(self):
+        resp = self.client.get("/staff/payments")
+        self.candidate_ids = re.findall(r"/staff/payments/(\d+)", resp.text) or self.candidate_ids
+
+    @task(2)
+    def payment(self):
+        if self.candidate_ids:
+            self.client.get(f"/staff/payments/{random.choice(self.candidate_ids)}", name="/staff/payments/[id]")
+
+    @task(1)
+    def candidates(self):
+        self.client.get("/staff/candidates")
+
+    @task(2)
+    def candidate(self):
+        if self.candidate_ids:
+            self.client.get(f"/staff/candidates/{random.choice(self.candidate_ids)}/", name="/staff/candidates/[id]")
+
+
+class Staff(HttpUser):
+    host = HOST
     wait_time = between(5, 15)
-    tasks = [LoadTestTasks]
+    tasks = [StaffTasks]
+    weight = 1
+
+    def on_start(self):
+        self.client.get("/account/login")
+        post_form(self.client, "/account/login", {"email": STAFF_EMAIL, "password": PASSWORD})
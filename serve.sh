@@ -1,5 +1,26 @@
 #!/bin/sh
 
+# ADM_SERVER=gthread (default): wsgi, 2 workers x 4 threads
+# ADM_SERVER=uvicorn: asgi, the request bodies (uploads) are read by each worker event loop,
+# the async views (uploads, contact us) call the clients in a pool of ASGI_THREADS threads
+ADM_SERVER="${ADM_SERVER:-gthread}"
+export ASGI_THREADS="${ASGI_THREADS:-32}"
+
+# the outbox worker (EMAIL_CLIENT=OUTBOX) is restarted whenever it exits
+supervise_deliver_emails() {
+    while true; do
+        python manage.py deliver_emails
+        echo "deliver_emails exited with status $?, restarting in 5s" >&2
+        sleep 5
+    done
+}
+
 cd adm_portal && \
 python manage.py migrate && \
-gunicorn --workers=2 --threads=4 --worker-class=gthread --bind 0.0.0.0:8000 --access-logfile - adm_portal.wsgi:application
+python manage.py createcachetable && \
+{ supervise_deliver_emails & } && \
+if [ "$ADM_SERVER" = "uvicorn" ]; then
+    gunicorn --workers=2 --worker-class=uvicorn.workers.UvicornWorker --bind 0.0.0.0:8000 --access-logfile - adm_portal.asgi:application
+else
+    gunicorn --workers=2 --threads=4 --worker-class=gthread --bind 0.0.0.0:8000 --access-logfile - adm_portal.wsgi:application
+fi